@@ -0,0 +1,10 @@
+from whylog.benchmarks.generators import SyntheticLogGenerator, SyntheticRulesGenerator
+from whylog.benchmarks.measurement import BenchmarkResult, run_benchmark
+from whylog.benchmarks.suite import BenchmarkSuite, BenchmarkWorkload
+
+assert SyntheticLogGenerator
+assert SyntheticRulesGenerator
+assert BenchmarkResult
+assert run_benchmark
+assert BenchmarkSuite
+assert BenchmarkWorkload
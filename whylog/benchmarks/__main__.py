@@ -0,0 +1,74 @@
+"""
+Runs benchmarks on synthetic workload, e.g.:
+    python -m whylog.benchmarks --lines-count 1000000 --json results.json
+"""
+import argparse
+import json
+import shutil
+import tempfile
+
+from whylog.benchmarks import (
+    BenchmarkSuite, BenchmarkWorkload, SyntheticLogGenerator, SyntheticRulesGenerator
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="whylog benchmarks on synthetic logs")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--lines-count', type=int, default=100000)
+    parser.add_argument('--lines-per-second', type=float, default=100)
+    parser.add_argument('--hit-ratio', type=float, default=0.01)
+    parser.add_argument('--effect-ratio', type=float, default=0.001)
+    parser.add_argument('--causes-count', type=int, default=4)
+    parser.add_argument('--mean-line-length', type=int, default=100)
+    parser.add_argument('--line-length-deviation', type=int, default=30)
+    parser.add_argument('--max-delta', type=int, default=10)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--investigations-count', type=int, default=20)
+    parser.add_argument('--json', help="path of file, to which results are dumped")
+    return parser.parse_args()
+
+
+def format_result(result):
+    return "%-40s %10s items/s %12s B/s  p50 %.6fs  p90 %.6fs  p99 %.6fs  peak %s B" % (
+        result.name, _format_number(result.items_per_second),
+        _format_number(result.bytes_per_second), result.get_latency_percentile(50) or 0,
+        result.get_latency_percentile(90) or 0, result.get_latency_percentile(99) or 0,
+        result.peak_memory
+    )
+
+
+def _format_number(number):
+    return '-' if not number else '%.0f' % (number, )
+
+
+def main():
+    args = parse_args()
+    log_generator = SyntheticLogGenerator(
+        seed=args.seed,
+        lines_count=args.lines_count,
+        lines_per_second=args.lines_per_second,
+        hit_ratio=args.hit_ratio,
+        effect_ratio=args.effect_ratio,
+        causes_count=args.causes_count,
+        mean_line_length=args.mean_line_length,
+        line_length_deviation=args.line_length_deviation
+    )
+    rules_generator = SyntheticRulesGenerator(args.causes_count, args.max_delta)
+    directory = tempfile.mkdtemp()
+    try:
+        workload = BenchmarkWorkload(directory, log_generator, rules_generator)
+        results = BenchmarkSuite(
+            workload, args.rounds, args.investigations_count, args.seed
+        ).run_all()
+    finally:
+        shutil.rmtree(directory)
+    for result in results:
+        print(format_result(result))
+    if args.json:
+        with open(args.json, 'w') as json_file:
+            json.dump([result.serialize() for result in results], json_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+from __future__ import division
+
+import os.path
+import random
+from datetime import datetime, timedelta
+
+import six
+import yaml
+
+from whylog.config.consts import YamlFileNames
+
+DATE_REGEX = "\\d\\d\\d\\d-\\d\\d-\\d\\d \\d\\d:\\d\\d:\\d\\d"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+LOG_TYPE_NAME = 'synthetic'
+# words of lines which are not matched by parsers, they do not contain literals of parsers
+NOISE_WORDS = (
+    'request', 'served', 'session', 'user', 'query', 'cache', 'handler', 'status', 'ok', 'GET',
+    'POST', 'index', 'latency', 'ms', 'bytes', 'worker', 'started', 'finished', 'queue', 'job'
+)  # yapf: disable
+
+
+class SyntheticLogGenerator(object):
+    """
+    Generates large time-ordered log, which lines are the same for the same parameters.
+    Lines begin with date. Some of them are matched by cause parsers or by effect parser
+    of SyntheticRulesGenerator, the rest of them contains random words.
+    """
+
+    def __init__(
+        self,
+        seed=0,
+        lines_count=100000,
+        lines_per_second=100,
+        hit_ratio=0.01,
+        effect_ratio=0.001,
+        causes_count=4,
+        mean_line_length=100,
+        line_length_deviation=30,
+        start_time=datetime(2016, 1, 1)
+    ):
+        """
+        :param lines_per_second: number of lines logged in every second
+        :param hit_ratio: fraction of lines matched by cause parsers
+        :param effect_ratio: fraction of lines matched by effect parser
+        :param mean_line_length: lengths of lines have normal distribution with this mean
+            and line_length_deviation, but they are not shorter than their matched part
+        """
+        self.seed = seed
+        self.lines_count = lines_count
+        self.lines_per_second = lines_per_second
+        self.hit_ratio = hit_ratio
+        self.effect_ratio = effect_ratio
+        self.causes_count = causes_count
+        self.mean_line_length = mean_line_length
+        self.line_length_deviation = line_length_deviation
+        self.start_time = start_time
+
+    def iter_lines(self):
+        """
+        yields pairs of line without line separator and flag, which is True for effect lines
+        """
+        rng = random.Random(self.seed)
+        for line_number in six.moves.range(self.lines_count):
+            line_time = self.start_time + timedelta(
+                seconds=int(line_number / self.lines_per_second)
+            )
+            prefix = line_time.strftime(DATE_FORMAT)
+            draw = rng.random()
+            if draw < self.effect_ratio:
+                content, is_effect = "effect observed %d" % (rng.randint(0, 999), ), True
+            elif draw < self.effect_ratio + self.hit_ratio:
+                content, is_effect = "cause_%d failure %d on node%d" % (
+                    rng.randrange(self.causes_count), rng.randint(0, 999), rng.randint(0, 99)
+                ), False
+            else:
+                content, is_effect = rng.choice(NOISE_WORDS), False
+            yield self._pad_line(rng, "%s %s" % (prefix, content)), is_effect
+
+    def _pad_line(self, rng, line):
+        length = int(rng.gauss(self.mean_line_length, self.line_length_deviation))
+        words = [line]
+        padded_length = len(line)
+        while True:
+            word = rng.choice(NOISE_WORDS)
+            padded_length += len(word) + 1
+            if padded_length > length:
+                return ' '.join(words)
+            words.append(word)
+
+    def write(self, file_path):
+        """
+        writes log to file
+        :return: offsets and contents of effect lines
+        """
+        effects = []
+        offset = 0
+        with open(file_path, 'wb') as log_file:
+            for line, is_effect in self.iter_lines():
+                encoded_line = line.encode('utf-8') + b'\n'
+                if is_effect:
+                    effects.append((offset, line))
+                log_file.write(encoded_line)
+                offset += len(encoded_line)
+        return effects
+
+
+class SyntheticRulesGenerator(object):
+    """
+    Generates parsers, rules and log type matching logs of SyntheticLogGenerator:
+    effect line is caused by any cause line logged at most max_delta seconds before it.
+    """
+
+    def __init__(self, causes_count=4, max_delta=10):
+        self.causes_count = causes_count
+        self.max_delta = max_delta
+
+    @classmethod
+    def _parser_definition(cls, name, content_regex, line_content):
+        return {
+            'name': name,
+            'regex_str': "^(%s) %s( .*)?$" % (DATE_REGEX, content_regex),
+            'primary_key_groups': [1],
+            'log_type': LOG_TYPE_NAME,
+            'convertions': {1: 'date', 2: 'int'},
+            'line_content': "2016-01-01 00:00:00 %s" % (line_content, ),
+        }
+
+    def get_parsers_definitions(self):
+        causes = [
+            self._parser_definition(
+                'cause_%d' % (cause_number, ),
+                "cause_%d failure (\\d+) on (\\w+)" % (cause_number, ),
+                "cause_%d failure 1 on node1" % (cause_number, )
+            ) for cause_number in range(self.causes_count)
+        ]  # yapf: disable
+        return causes + [
+            self._parser_definition('effect', "effect observed (\\d+)", "effect observed 1")
+        ]
+
+    def get_rules_definitions(self):
+        return [
+            {
+                'causes': ['cause_%d' % (cause_number, )],
+                'effect': 'effect',
+                'constraints': [
+                    {
+                        'clues_groups': [[1, 1], [0, 1]],
+                        'name': 'time_delta',
+                        'params': {'max_delta': self.max_delta},
+                    }
+                ],
+                'linkage': 'AND',
+            } for cause_number in range(self.causes_count)
+        ]  # yapf: disable
+
+    def get_log_types_definitions(self, path_pattern):
+        return [
+            {
+                'log_type_name': LOG_TYPE_NAME,
+                'matcher_class_name': 'WildCardFilenameMatcher',
+                'host_pattern': 'localhost',
+                'path_pattern': path_pattern,
+                'super_parser': {
+                    'regex_str': "^(%s).*" % (DATE_REGEX, ),
+                    'group_order': [1],
+                    'convertions': {1: 'date'},
+                },
+            }
+        ]  # yapf: disable
+
+    def write(self, directory, path_pattern):
+        """
+        writes YAML config files to directory
+        :return: paths of parsers, rules and log types files
+        """
+        documents = [
+            (YamlFileNames.parsers, self.get_parsers_definitions()),
+            (YamlFileNames.rules, self.get_rules_definitions()),
+            (YamlFileNames.default_log_types, self.get_log_types_definitions(path_pattern)),
+        ]
+        paths = []
+        for file_name, definitions in documents:
+            path = os.path.join(directory, file_name)
+            with open(path, 'w') as config_file:
+                yaml.safe_dump_all(definitions, config_file, explicit_start=True)
+            paths.append(path)
+        return paths
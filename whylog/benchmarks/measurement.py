@@ -0,0 +1,108 @@
+from __future__ import division
+
+import math
+from timeit import default_timer
+
+try:
+    import tracemalloc
+except ImportError:
+    # not available in python 2, peak memory is not measured then
+    tracemalloc = None
+
+
+class BenchmarkResult(object):
+    """
+    Latencies of all calls of benchmarked function and the amount of work done by one
+    round of calls, e.g. number of processed lines and bytes.
+    """
+
+    def __init__(self, name, latencies, rounds, items_count, bytes_count, peak_memory):
+        """
+        :param peak_memory: the highest number of bytes allocated by python during one round,
+            or None if it was not measured
+        """
+        self.name = name
+        self.latencies = latencies
+        self.rounds = rounds
+        self.items_count = items_count
+        self.bytes_count = bytes_count
+        self.peak_memory = peak_memory
+
+    @property
+    def total_time(self):
+        return sum(self.latencies)
+
+    @property
+    def items_per_second(self):
+        return self._get_throughput(self.items_count)
+
+    @property
+    def bytes_per_second(self):
+        return self._get_throughput(self.bytes_count)
+
+    def _get_throughput(self, count):
+        if not count or not self.total_time:
+            return None
+        return count * self.rounds / self.total_time
+
+    def get_latency_percentile(self, percent):
+        """
+        returns the latency, which is not exceeded by given percent of calls
+        """
+        if not self.latencies:
+            return None
+        sorted_latencies = sorted(self.latencies)
+        rank = int(math.ceil(percent / 100 * len(sorted_latencies)))
+        return sorted_latencies[min(max(rank, 1), len(sorted_latencies)) - 1]
+
+    def serialize(self):
+        return {
+            'name': self.name,
+            'calls': len(self.latencies),
+            'total_time': self.total_time,
+            'items_per_second': self.items_per_second,
+            'bytes_per_second': self.bytes_per_second,
+            'latency_p50': self.get_latency_percentile(50),
+            'latency_p90': self.get_latency_percentile(90),
+            'latency_p99': self.get_latency_percentile(99),
+            'peak_memory': self.peak_memory,
+        }
+
+    def __repr__(self):
+        return "(BenchmarkResult: %s, %s calls, p50 %s s, p99 %s s)" % (
+            self.name, len(self.latencies), self.get_latency_percentile(50),
+            self.get_latency_percentile(99)
+        )
+
+
+def run_benchmark(name, function, arguments, rounds=5, items_count=0, bytes_count=0):
+    """
+    calls function with every argument in every round and measures the latency of every call.
+    The first round is repeated once more with tracing of memory allocations,
+    which slows calls down, so latencies are not measured in it.
+    :param items_count: number of items processed by one round
+    :param bytes_count: number of bytes processed by one round
+    """
+    arguments = list(arguments)
+    latencies = []
+    for _ in range(rounds):
+        for argument in arguments:
+            start_time = default_timer()
+            function(argument)
+            latencies.append(default_timer() - start_time)
+    return BenchmarkResult(
+        name, latencies, rounds, items_count, bytes_count,
+        _measure_peak_memory(function, arguments)
+    )
+
+
+def _measure_peak_memory(function, arguments):
+    if tracemalloc is None or tracemalloc.is_tracing():
+        return None
+    tracemalloc.start()
+    try:
+        for argument in arguments:
+            function(argument)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
@@ -0,0 +1,188 @@
+import os.path
+import random
+from datetime import datetime, timedelta
+
+from whylog.benchmarks.generators import (
+    LOG_TYPE_NAME, SyntheticLogGenerator, SyntheticRulesGenerator
+)
+from whylog.benchmarks.measurement import run_benchmark
+from whylog.config import YamlConfig
+from whylog.config.investigation_plan import Clue, LineSource
+from whylog.config.parser_subset import ConcatenatedRegexParser
+from whylog.constraints.constraint_manager import ConstraintManager
+from whylog.constraints.verifier import Verifier
+from whylog.front.utils import FrontInput
+from whylog.log_reader import LogReader
+from whylog.log_reader.block_cache import BlockCache
+from whylog.log_reader.file_metadata import FileMetadataCache
+from whylog.log_reader.read_utils import ReadUtils
+from whylog.log_reader.searchers import BacktrackSearcher
+
+
+class BenchmarkWorkload(object):
+    """
+    Synthetic log and config matching it, written to given directory.
+    """
+
+    LOG_FILE_NAME = 'synthetic.log'
+
+    def __init__(self, directory, log_generator=None, rules_generator=None):
+        self.log_generator = log_generator or SyntheticLogGenerator()
+        self.rules_generator = rules_generator or SyntheticRulesGenerator(
+            self.log_generator.causes_count
+        )
+        self.log_path = os.path.join(directory, self.LOG_FILE_NAME)
+        effects = self.log_generator.write(self.log_path)
+        self.effect_front_inputs = [
+            FrontInput(offset, line, LineSource('localhost', self.log_path))
+            for offset, line in effects
+        ]
+        self.config = YamlConfig(*self.rules_generator.write(directory, self.log_path))
+
+    @property
+    def log_size(self):
+        return os.path.getsize(self.log_path)
+
+    def read_lines(self):
+        with open(self.log_path, 'rb') as log_file:
+            return log_file.read().splitlines()
+
+
+class BenchmarkSuite(object):
+    """
+    Repeatable benchmarks of the hot paths of investigation run on a workload.
+    """
+
+    def __init__(self, workload, rounds=5, investigations_count=20, seed=0):
+        """
+        :param investigations_count: maximal number of effect lines investigated by one round
+            of benchmarks of searcher and the whole investigation
+        """
+        self._workload = workload
+        self._rounds = rounds
+        self._front_inputs = workload.effect_front_inputs[:investigations_count]
+        self._seed = seed
+
+    def run_all(self):
+        return [
+            self.benchmark_read_utils(),
+            self.benchmark_concatenated_regex_parser(),
+            self.benchmark_backtrack_searcher(cold_caches=True),
+            self.benchmark_backtrack_searcher(),
+            self.benchmark_verifier(),
+            self.benchmark_get_causes(),
+        ]
+
+    def benchmark_read_utils(self, offsets_count=1000):
+        rng = random.Random(self._seed)
+        log_size = self._workload.log_size
+        offsets = [rng.randrange(log_size) for _ in range(offsets_count)] if log_size else []
+        with open(self._workload.log_path, 'rb') as log_file:
+            return run_benchmark(
+                'ReadUtils.get_line_containing_offset',
+                lambda offset: ReadUtils.get_line_containing_offset(
+                    log_file, offset, ReadUtils.STANDARD_BUFFER_SIZE
+                ),
+                offsets,
+                self._rounds,
+                items_count=len(offsets)
+            )  # yapf: disable
+
+    def benchmark_concatenated_regex_parser(self):
+        lines = self._workload.read_lines()
+        parser = ConcatenatedRegexParser(
+            self._workload.config.get_parsers_of_log_type(LOG_TYPE_NAME)
+        )
+
+        def match_lines(lines_to_match):
+            for line in lines_to_match:
+                parser.get_extracted_parsers_params_from_bytes(line)
+
+        return run_benchmark(
+            'ConcatenatedRegexParser', match_lines, [lines], self._rounds, len(lines),
+            self._workload.log_size
+        )
+
+    def benchmark_backtrack_searcher(self, cold_caches=False):
+        """
+        :param cold_caches: if True, every search is made by searcher with empty caches
+            of file metadata and blocks, otherwise all searchers share caches, which are
+            filled before measurement. Files may still be cached by the operating system.
+        """
+        config = self._workload.config
+        searches = []
+        for front_input in self._front_inputs:
+            log_type = config.get_log_type(front_input.line_source)
+            investigation_plan = config.create_investigation_plan(front_input, log_type)
+            for step, step_log_type in investigation_plan.investigation_steps_with_log_types:
+                for _, path, super_parser in step_log_type.files_to_parse():
+                    searches.append((path, step, super_parser, front_input))
+        # process-wide default caches are not used, so results do not depend on other benchmarks
+        shared_caches = FileMetadataCache(), BlockCache()
+
+        def search(search_arguments):
+            path, step, super_parser, front_input = search_arguments
+            file_metadata_cache, block_cache = (
+                (FileMetadataCache(), BlockCache()) if cold_caches else shared_caches
+            )
+            searcher = BacktrackSearcher(
+                path, step, super_parser, file_metadata_cache=file_metadata_cache,
+                block_cache=block_cache
+            )
+            return searcher.search(front_input)
+
+        if not cold_caches:
+            for search_arguments in searches:
+                search(search_arguments)
+        return run_benchmark(
+            'BacktrackSearcher.search (%s caches)' % ('cold' if cold_caches else 'warm', ),
+            search,
+            searches,
+            self._rounds,
+            items_count=len(searches)
+        )  # yapf: disable
+
+    def benchmark_verifier(self, clues_count=100, max_delta=10):
+        """
+        verifies the rule with two causes, which must be close to the effect in time,
+        on all combinations of their clues
+        """
+        line_source = LineSource('localhost', self._workload.log_path)
+        effect_time = datetime(2016, 1, 1, 1)
+        effect = Clue((effect_time, ), 'effect', 0, line_source)
+        clues_lists = [
+            (
+                [
+                    Clue(
+                        (effect_time - timedelta(seconds=2 * clue_number), ), 'cause',
+                        clue_number, line_source
+                    ) for clue_number in range(clues_count)
+                ], 1
+            ) for _ in range(2)
+        ]  # yapf: disable
+        constraints = [
+            {
+                'clues_groups': [[cause_number, 1], [0, 1]],
+                'name': 'time_delta',
+                'params': {'max_delta': max_delta},
+            } for cause_number in (1, 2)
+        ]  # yapf: disable
+        return run_benchmark(
+            'Verifier.constraints_and',
+            lambda lists: Verifier.constraints_and(
+                lists, effect, constraints, ConstraintManager()
+            ),
+            [clues_lists],
+            self._rounds,
+            items_count=clues_count ** 2
+        )  # yapf: disable
+
+    def benchmark_get_causes(self):
+        log_reader = LogReader(self._workload.config)
+        return run_benchmark(
+            'LogReader.get_causes',
+            log_reader.get_causes,
+            self._front_inputs,
+            self._rounds,
+            items_count=len(self._front_inputs)
+        )  # yapf: disable
@@ -10,6 +10,7 @@ from whylog.config.filename_matchers import WildCardFilenameMatcher
 from whylog.config.investigation_plan import LineSource
 from whylog.config.log_type import LogType
 from whylog.config.settings_factory import YamlSettingsFactory
+from whylog.config.sqlite_config import SQLiteConfig
 from whylog.config.yaml_config import YamlConfig
 
 assert WildCardFilenameMatcher
@@ -25,14 +26,22 @@ class SettingsFactorySelector(object):
     """
     WHYLOG_DIR = '.whylog'
     SETTINGS_FILE = YamlFileNames.settings
+    SNAPSHOT_FILE = YamlFileNames.config_snapshot
     HOME_DIR = os.path.expanduser('~')
     ETC_DIR = '/etc'
     ASSISTANTS_DICT = {'regex': RegexAssistant}
-    SUPPORTED_TYPES = {'yaml': YamlConfig}
+    SUPPORTED_TYPES = {'yaml': YamlConfig, 'sqlite': SQLiteConfig}
+    # config types which are loaded faster from snapshot stored next to settings file,
+    # it is not used when snapshot_path in settings is null
+    SNAPSHOT_TYPES = ('yaml', )
     DEFAULT_SETTINGS_FACTORY_TYPE = YamlSettingsFactory
 
     @classmethod
-    def load_settings(cls, path):
+    def load_settings(cls, path, snapshot_path=None):
+        """
+        :param snapshot_path: path of config snapshot used instead of the one
+            from settings or the default one next to settings file
+        """
         with open(path, "r") as config_file:
             whylog_settings = yaml.load(config_file)
             assistant_name = whylog_settings.pop('pattern_assistant')
@@ -43,6 +52,12 @@ class SettingsFactorySelector(object):
             config_class = cls.SUPPORTED_TYPES.get(config_type)
             if config_class is None:
                 raise UnsupportedConfigType(config_class)
+            if config_type in cls.SNAPSHOT_TYPES:
+                whylog_settings.setdefault(
+                    'snapshot_path', os.path.join(os.path.dirname(path), cls.SNAPSHOT_FILE)
+                )
+                if snapshot_path is not None:
+                    whylog_settings['snapshot_path'] = snapshot_path
             return {'config': config_class(**whylog_settings), 'assistant': assistant_class}
 
     @classmethod
@@ -1,4 +1,3 @@
-import itertools
 from abc import ABCMeta, abstractmethod
 from collections import defaultdict
 
@@ -16,13 +15,33 @@ class AbstractConfig(object):
     words_count_in_name = 4
 
     def __init__(self):
-        self._parsers = self._load_parsers()
+        self._load()
+        self._revision = 0
+        self._investigation_plans_parts = {}
+
+    def _load(self):
+        self._set_parsers(self._load_parsers())
+        self._rules = self._load_rules()
+        self._log_types = self._load_log_types()
+
+    def _set_parsers(self, parsers):
+        self._parsers = parsers
         self._parsers_grouped_by_log_type = self._index_parsers_by_log_type(
             six.itervalues(self._parsers)
         )
+        self._effect_parsers_by_log_type = dict(
+            (log_type_name, ConcatenatedRegexParser(parsers))
+            for log_type_name, parsers in six.iteritems(self._parsers_grouped_by_log_type)
+        )
         self._parser_name_generator = ParserNameGenerator(self._parsers)
-        self._rules = self._load_rules()
-        self._log_types = self._load_log_types()
+
+    @property
+    def revision(self):
+        """
+        number of changes of rules, parsers and log types made since config was loaded,
+        so results computed basing on config can be invalidated after any change
+        """
+        return self._revision
 
     @abstractmethod
     def _load_parsers(self):
@@ -36,6 +55,14 @@ class AbstractConfig(object):
     def _load_log_types(self):
         pass
 
+    @classmethod
+    def _restore_convertions(cls, definition):
+        # JSON object keys are strings, but groups numbers are keys of convertions
+        definition['convertions'] = dict(
+            (int(group), converter) for group, converter in six.iteritems(definition['convertions'])
+        )
+        return definition
+
     @classmethod
     def _index_parsers_by_log_type(cls, parsers):
         grouped_parsers = defaultdict(list)
@@ -45,14 +72,30 @@ class AbstractConfig(object):
 
     def add_rule(self, user_rule_intent):
         created_rule = RegexRuleFactory.create_from_intent(user_rule_intent)
-        self._save_rule_definition(created_rule.serialize())
-        created_parsers = created_rule.get_new_parsers(self._parser_name_generator)
-        self._save_parsers_definition(parser.serialize() for parser in created_parsers)
+        created_parsers = self._save_rule(created_rule, self._parser_name_generator)
         self._rules[created_rule.get_effect_name()].append(created_rule)
         for parser in created_parsers:
             self._parsers[parser.name] = parser
             self._parsers_grouped_by_log_type[parser.log_type].append(parser)
+        # only parsers of log types with new parsers are concatenated again,
+        # their regexes are compiled on the first matching
+        for log_type_name in set(parser.log_type for parser in created_parsers):
+            self._effect_parsers_by_log_type[log_type_name] = ConcatenatedRegexParser(
+                self._parsers_grouped_by_log_type[log_type_name]
+            )
         self._parser_name_generator = ParserNameGenerator(self._parsers)
+        self._investigation_plans_parts.clear()
+        self._revision += 1
+
+    def _save_rule(self, rule, parser_name_generator):
+        """
+        saves rule and its parsers, which names are free according to parser_name_generator
+        :return: saved parsers
+        """
+        self._save_rule_definition(rule.serialize())
+        created_parsers = rule.get_new_parsers(parser_name_generator)
+        self._save_parsers_definition(parser.serialize() for parser in created_parsers)
+        return created_parsers
 
     def rename_log_type(self, old_name, new_name):
         if old_name == new_name:
@@ -71,27 +114,32 @@ class AbstractConfig(object):
                 parser.log_type = new_name
         self._parsers_grouped_by_log_type[new_name
                                          ] = self._parsers_grouped_by_log_type.pop(old_name)
-        all_matchers_definition = tuple()
-        for log_type in six.itervalues(self._log_types):
-            matchers_definitions = (matcher.serialize() for matcher in log_type.filename_matchers)
-            all_matchers_definition = itertools.chain(all_matchers_definition, matchers_definitions)
-        self._resave_all_log_types(all_matchers_definition)
-        self._resave_all_parsers(parser.serialize() for parser in six.itervalues(self._parsers))
+        if old_name in self._effect_parsers_by_log_type:
+            self._effect_parsers_by_log_type[new_name
+                                            ] = self._effect_parsers_by_log_type.pop(old_name)
+        self._save_renamed_log_type(old_name, new_name)
+        self._investigation_plans_parts.clear()
+        self._revision += 1
 
     def add_log_type(self, log_type):
+        self._save_log_type(log_type)
+        self._log_types[log_type.name] = log_type
+        self._revision += 1
+
+    def _save_log_type(self, log_type):
         for matcher in log_type.filename_matchers:
             self.add_filename_matcher_to_log_type(matcher)
-        self._log_types[log_type.name] = log_type
 
     def add_filename_matcher_to_log_type(self, matcher):
+        # super parser regex given by user is rejected before it is saved in config
+        matcher.super_parser.check_regex()
         self._save_filename_matcher_definition(matcher.serialize())
 
     @abstractmethod
-    def _resave_all_log_types(self, matchers_definition):
-        pass
-
-    @abstractmethod
-    def _resave_all_parsers(self, parsers_definition):
+    def _save_renamed_log_type(self, old_name, new_name):
+        """
+        saves parsers and filename matchers of log type, which was renamed
+        """
         pass
 
     @abstractmethod
@@ -109,6 +157,9 @@ class AbstractConfig(object):
     def get_all_log_types(self):
         return six.itervalues(self._log_types)
 
+    def get_parsers_of_log_type(self, log_type_name):
+        return list(self._parsers_grouped_by_log_type.get(log_type_name, []))
+
     def get_log_type(self, line_source):
         for log_type in six.itervalues(self._log_types):
             if line_source in log_type:
@@ -118,13 +169,32 @@ class AbstractConfig(object):
         matching_parsers, effect_params = self._find_matching_parsers(
             front_input.line_content, log_type.name
         )
-        suspected_rules = self._filter_rule_set(matching_parsers)
-        concatenated_parsers = self._create_concatenated_parsers_for_investigation(suspected_rules)
+        suspected_rules, concatenated_parsers = self._get_investigation_plan_parts(
+            matching_parsers
+        )
         effect_clues = self._create_effect_clues(effect_params, front_input)
         steps = self._create_steps_in_investigation(
             concatenated_parsers, suspected_rules, effect_clues
         )
-        return InvestigationPlan(suspected_rules, steps, effect_clues)
+        return InvestigationPlan(list(suspected_rules), steps, effect_clues)
+
+    def _get_investigation_plan_parts(self, matching_parsers):
+        """
+        returns suspected rules and concatenated parsers, which depend only on set of parsers
+        matching the effect line, so they are memoized until rules or log types are changed.
+        Compiled regexes of concatenated parsers are reused by all investigations
+        of effects matched by the same parsers, only search ranges are computed again.
+        """
+        key = frozenset(parser.name for parser in matching_parsers)
+        parts = self._investigation_plans_parts.get(key)
+        if parts is None:
+            suspected_rules = self._filter_rule_set(matching_parsers)
+            parts = (
+                suspected_rules,
+                self._create_concatenated_parsers_for_investigation(suspected_rules)
+            )
+            self._investigation_plans_parts[key] = parts
+        return parts
 
     def _create_effect_clues(self, effect_params, front_input):
         effect_clues = {}
@@ -140,16 +210,16 @@ class AbstractConfig(object):
 
     def _find_matching_parsers(self, effect_line_content, log_type_name):
         """
-        This method finding all parsers from Config base which matching with effect_line_content
+        This method finding all parsers from Config base which matching with effect_line_content.
+        All parsers of log type are matched at once by their concatenated regexes.
         """
-        matching_parsers = []
-        extracted_params = {}
-        for parser in self._parsers_grouped_by_log_type[log_type_name]:
-            params = parser.get_regex_params(effect_line_content)
-            if params is not None:
-                extracted_params[parser.name] = params
-                matching_parsers.append(parser)
-        return matching_parsers, extracted_params
+        effect_parsers = self._effect_parsers_by_log_type.get(log_type_name)
+        if effect_parsers is None:
+            return [], {}
+        matching_parsers = effect_parsers.get_matching_parsers(effect_line_content)
+        return [parser for parser, _ in matching_parsers], dict(
+            (parser.name, params) for parser, params in matching_parsers
+        )
 
     def _filter_rule_set(self, parsers_list):
         """
@@ -1,9 +1,11 @@
+import itertools
 from abc import ABCMeta, abstractmethod
 from collections import defaultdict
 
 import six
 
 from whylog.config.abstract_config import AbstractConfig
+from whylog.config.config_snapshot import ConfigSnapshot
 from whylog.config.exceptions import UnsupportedFilenameMatcher
 from whylog.config.filename_matchers import WildCardFilenameMatcherFactory
 from whylog.config.log_type import LogType
@@ -13,34 +15,70 @@ from whylog.config.rule import RegexRuleFactory
 
 @six.add_metaclass(ABCMeta)
 class AbstractFileConfig(AbstractConfig):
-    def __init__(self, parsers_path, rules_path, log_type_path):
+    def __init__(self, parsers_path, rules_path, log_type_path, snapshot_path=None):
+        """
+        :param snapshot_path: path of ConfigSnapshot, from which config is loaded
+            when config files have not changed since it was saved
+        """
         self._parsers_path = parsers_path
         self._rules_path = rules_path
         self._log_type_path = log_type_path
+        # definitions loaded from snapshot, used only while config is loaded
+        self._definitions = None
+        self._snapshot = None
+        if snapshot_path is not None:
+            self._snapshot = ConfigSnapshot(
+                snapshot_path, [parsers_path, rules_path, log_type_path]
+            )
         super(AbstractFileConfig, self).__init__()
 
+    def _load(self):
+        if self._snapshot is None:
+            super(AbstractFileConfig, self)._load()
+            return
+        key = self._snapshot.compute_key()
+        self._definitions = self._snapshot.load(key)
+        if self._definitions is None:
+            self._definitions = dict(
+                (path, list(self._load_file_with_config(path)))
+                for path in (self._parsers_path, self._rules_path, self._log_type_path)
+            )
+            self._snapshot.save(key, self._definitions)
+        try:
+            super(AbstractFileConfig, self)._load()
+        finally:
+            self._definitions = None
+
+    def _load_definitions(self, path):
+        if self._definitions is None:
+            return self._load_file_with_config(path)
+        return self._definitions[path]
+
     def _load_parsers(self):
         return dict(
-            (parser_definition["name"], RegexParserFactory.from_dao(parser_definition))
-            for parser_definition in self._load_file_with_config(self._parsers_path)
-        )
+            (
+                parser_definition["name"],
+                RegexParserFactory.from_dao(self._restore_convertions(parser_definition))
+            ) for parser_definition in self._load_definitions(self._parsers_path)
+        )  # yapf: disable
 
     def _load_rules(self):
         loaded_rules = defaultdict(list)
-        for serialized_rule in self._load_file_with_config(self._rules_path):
+        for serialized_rule in self._load_definitions(self._rules_path):
             rule = RegexRuleFactory.from_dao(serialized_rule, self._parsers)
             loaded_rules[serialized_rule["effect"]].append(rule)
         return loaded_rules
 
     def _load_log_types(self):
         matchers = defaultdict(list)
-        matcher_definitions = self._load_file_with_config(self._log_type_path)
+        matcher_definitions = self._load_definitions(self._log_type_path)
         matchers_factory_dict = {'WildCardFilenameMatcher': WildCardFilenameMatcherFactory}
         for definition in matcher_definitions:
             matcher_class_name = definition['matcher_class_name']
             factory_class = matchers_factory_dict.get(matcher_class_name)
             if factory_class is None:
                 raise UnsupportedFilenameMatcher(matcher_class_name)
+            self._restore_convertions(definition['super_parser'])
             matcher = factory_class.from_dao(definition)
             matchers[definition['log_type_name']].append(matcher)
         return dict(
@@ -64,6 +102,14 @@ class AbstractFileConfig(AbstractConfig):
         with open(self._log_type_path, "a") as parsers_file:
             parsers_file.write(self._convert_matcher_to_file_form(matcher_definition))
 
+    def _save_renamed_log_type(self, old_name, new_name):
+        all_matchers_definition = tuple()
+        for log_type in six.itervalues(self._log_types):
+            matchers_definitions = (matcher.serialize() for matcher in log_type.filename_matchers)
+            all_matchers_definition = itertools.chain(all_matchers_definition, matchers_definitions)
+        self._resave_all_log_types(all_matchers_definition)
+        self._resave_all_parsers(parser.serialize() for parser in six.itervalues(self._parsers))
+
     def _resave_all_log_types(self, matchers_definition):
         with open(self._log_type_path, "w") as parsers_file:
             parsers_file.write(self._massive_dump_to_yaml(matchers_definition))
@@ -0,0 +1,86 @@
+import hashlib
+import json
+import os
+import tempfile
+
+
+class ConfigSnapshot(object):
+    """
+    Definitions of parsers, rules and log types read from config files, saved as JSON,
+    so they are restored without parsing YAML, which is much slower. Snapshot is keyed
+    by hashes of config files contents, so it is not used when any of them has changed
+    since it was saved. Snapshot is JSON, not pickle, so loading snapshot replaced by other
+    user cannot execute code, but it is still used only if it is owned by the current user.
+    """
+
+    VERSION = 5
+
+    def __init__(self, snapshot_path, source_paths):
+        self._snapshot_path = snapshot_path
+        self._source_paths = source_paths
+
+    def compute_key(self):
+        key = [self.VERSION]
+        for path in self._source_paths:
+            source_hash = hashlib.sha1()
+            with open(path, 'rb') as source_file:
+                for chunk in iter(lambda: source_file.read(1 << 16), b''):
+                    source_hash.update(chunk)
+            key.append([path, source_hash.hexdigest()])
+        return key
+
+    def load(self, key):
+        """
+        returns saved definitions, or None if snapshot does not exist, is not owned
+        by the current user or its key is different
+        """
+        if not os.path.isfile(self._snapshot_path) or not self._is_owned_by_current_user():
+            return None
+        try:
+            with open(self._snapshot_path, 'r') as snapshot_file:
+                saved_key, state = json.load(snapshot_file)
+        except (IOError, OSError, ValueError, TypeError):
+            # snapshot may be corrupted or saved by incompatible version of whylog,
+            # then it is replaced by the next save
+            return None
+        if key != saved_key:
+            return None
+        return state
+
+    def _is_owned_by_current_user(self):
+        if not hasattr(os, 'getuid'):
+            # windows has no owners of files in the posix sense
+            return True
+        return os.stat(self._snapshot_path).st_uid == os.getuid()
+
+    def save(self, key, state):
+        """
+        Snapshot is written to temporary file, which replaces the old one,
+        so other processes never read partially written snapshot.
+        Config is usable without snapshot, so failed save is ignored.
+        :param key: key computed before objects were loaded from config files,
+            so objects loaded from files changed during loading are not used later
+        """
+        snapshot_dir = os.path.dirname(os.path.abspath(self._snapshot_path))
+        try:
+            file_descriptor, tmp_path = tempfile.mkstemp(dir=snapshot_dir)
+        except (IOError, OSError):
+            return
+        try:
+            # temporary file created by mkstemp is readable only by its owner
+            with os.fdopen(file_descriptor, 'w') as snapshot_file:
+                json.dump([key, state], snapshot_file)
+            self._replace(tmp_path, self._snapshot_path)
+        except (IOError, OSError, TypeError, ValueError):
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @classmethod
+    def _replace(cls, source_path, destination_path):
+        if hasattr(os, 'replace'):
+            os.replace(source_path, destination_path)
+            return
+        # python 2 on windows cannot rename file to existing one
+        if os.path.exists(destination_path):
+            os.remove(destination_path)
+        os.rename(source_path, destination_path)
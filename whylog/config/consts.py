@@ -20,3 +20,5 @@ class YamlFileNames(object):
     unix_log_types = 'unix_log_types.yaml'
     windows_log_types = 'windows_log_types.yaml'
     settings = 'settings.yaml'
+    config_snapshot = 'config_snapshot.json'
+    sqlite_config = 'config.sqlite'
@@ -10,7 +10,7 @@ from whylog.config.super_parser import RegexSuperParserFactory
 @six.add_metaclass(ABCMeta)
 class AbstractFilenameMatcher(object):
     @abstractmethod
-    def get_matched_files(self):
+    def get_matched_files(self, agent_registry=None):
         pass
 
 
@@ -21,12 +21,19 @@ class WildCardFilenameMatcher(AbstractFilenameMatcher):
         self.log_type_name = log_type_name
         self.super_parser = super_parser
 
-    def get_matched_files(self):
+    def get_matched_files(self, agent_registry=None):
+        """
+        files on other hosts are listed by agents running on these hosts
+        :param agent_registry: AgentRegistry with addresses of agents of hosts
+        """
         if self.host_pattern == 'localhost':
             for path in glob.iglob(self.path_pattern):
                 yield 'localhost', path, self.super_parser
+        elif agent_registry is not None:
+            for host in agent_registry.match_hosts(self.host_pattern):
+                for path in agent_registry.get_client(host).list_files(self.path_pattern):
+                    yield host, path, self.super_parser
         else:
-            # TODO: finding files in others hosts
             raise NotImplementedError
 
     def __contains__(self, line_source):
@@ -1,6 +1,10 @@
+from collections import OrderedDict
+
 import six
 
-from whylog.config.utils import CompareResult
+from whylog.config.parser_subset import ConcatenatedRegexParser
+from whylog.config.parsers import RegexParserFactory
+from whylog.config.utils import CompareResult, LogEncoding
 
 
 class InvestigationPlan(object):
@@ -71,12 +75,19 @@ class InvestigationStep(object):
         if not super_parser_groups:
             return None, None
         group_type, group_value = super_parser_groups[0]
+        return group_value, self.get_bound_value(bound, group_type)
+
+    def get_bound_value(self, bound, group_type):
+        """
+        returns value of bound (LEFT_BOUND or RIGHT_BOUND) for primary key type,
+        or None if bounds are not defined for this type
+        """
         # type_bound is a dictionary, that contains bounds (LEFT and RIGHT bound)
         # values for concrete primary key type
         type_bounds = self._search_ranges.get(group_type)
         if type_bounds is None:
-            return None, None
-        return group_value, type_bounds[bound]
+            return None
+        return type_bounds[bound]
 
     def _compare_with_undefined_bound(self, bound):
         if bound == self.LEFT_BOUND:
@@ -91,6 +102,86 @@ class InvestigationStep(object):
             return CompareResult.GT
         return CompareResult.EQ
 
+    @property
+    def parser_names(self):
+        return self._parser_subset.parser_names
+
+    @classmethod
+    def merge(cls, investigation_steps):
+        """
+        Creates step, which finds clues of all given steps, with search ranges covering
+        their search ranges. Primary key type is bounded in merged step only if it is bounded
+        in all given steps.
+        """
+        parsers = OrderedDict()
+        for step in investigation_steps:
+            for parser in step._parser_subset.parsers:
+                parsers.setdefault(parser.name, parser)
+        group_types = set.intersection(*[set(step._search_ranges) for step in investigation_steps])
+        search_ranges = {}
+        for group_type in group_types:
+            types_bounds = [step._search_ranges[group_type] for step in investigation_steps]
+            search_ranges[group_type] = {
+                cls.LEFT_BOUND: min(type_bounds[cls.LEFT_BOUND] for type_bounds in types_bounds),
+                cls.RIGHT_BOUND: max(type_bounds[cls.RIGHT_BOUND] for type_bounds in types_bounds)
+            }
+        return cls(ConcatenatedRegexParser(list(parsers.values())), search_ranges)
+
+    def overlaps(self, other):
+        """
+        Checks whether search ranges of steps have common part. Primary key types
+        bounded only in one of steps do not narrow the common part.
+        """
+        for group_type in set(self._search_ranges).intersection(other._search_ranges):
+            type_bounds = self._search_ranges[group_type]
+            other_type_bounds = other._search_ranges[group_type]
+            if type_bounds[self.RIGHT_BOUND] < other_type_bounds[self.LEFT_BOUND] or \
+                    other_type_bounds[self.RIGHT_BOUND] < type_bounds[self.LEFT_BOUND]:
+                return False
+        return True
+
+    def is_clue_in_range(self, parser_name, clue, original_front_input, super_parser):
+        """
+        Checks whether clue would be found by search with this step, e.g. when it was found
+        by search with merged step. Like in search, primary key of clue is taken from groups
+        extracted from its line by super parser of its file.
+        In the file of original front input only lines before it are searched.
+        """
+        if parser_name not in self.parser_names:
+            return False
+        primary_key_groups = super_parser.get_ordered_groups(clue.line_prefix_content)
+        if self.compare_with_bound(self.LEFT_BOUND, primary_key_groups) == CompareResult.LT:
+            return False
+        if clue.line_source == original_front_input.line_source:
+            return clue.line_offset < original_front_input.offset
+        return self.compare_with_bound(
+            self.RIGHT_BOUND, primary_key_groups
+        ) != CompareResult.GT
+
+    def serialize(self):
+        """
+        search ranges are serialized as list of (primary key type, left bound, right bound),
+        bound values are not converted
+        """
+        return {
+            'parsers': self._parser_subset.serialize(),
+            'search_ranges': [
+                [group_type, type_bounds[self.LEFT_BOUND], type_bounds[self.RIGHT_BOUND]]
+                for group_type, type_bounds in six.iteritems(self._search_ranges)
+            ],
+        }  # yapf: disable
+
+    def get_clues_from_parsers_groups(self, parsers_groups, line, offset, line_source):
+        """
+        Creates clues from groups extracted earlier from line by parsers.
+        :param parsers_groups: dict of parser name to tuple of not converted groups
+        """
+        converted_params = self._parser_subset.convert_parsers_groups(parsers_groups)
+        return dict(
+            (parser_name, Clue(converted_groups, line, offset, line_source))
+            for parser_name, converted_groups in six.iteritems(converted_params)
+        )
+
     def get_clues(self, line, offset, line_source):
         converted_params = self._parser_subset.convert_parsers_groups_from_matched_line(line)
         return dict(
@@ -98,6 +189,41 @@ class InvestigationStep(object):
             for parser_name, converted_groups in six.iteritems(converted_params)
         )
 
+    def may_match_range(self, buffer, begin, end):
+        """
+        returns False if line given as range of bytes buffer certainly contains no clues
+        """
+        return self._parser_subset.may_match_range(buffer, begin, end)
+
+    def get_clues_from_bytes(self, raw_line, offset, line_source):
+        """
+        Works like get_clues, but for line which was not decoded.
+        Line is decoded only if it may be matched by some parser.
+        """
+        converted_params = self._parser_subset.convert_parsers_groups_from_matched_bytes(raw_line)
+        if not converted_params:
+            return {}
+        line = LogEncoding.decode(raw_line)
+        return dict(
+            (parser_name, Clue(converted_groups, line, offset, line_source))
+            for parser_name, converted_groups in six.iteritems(converted_params)
+        )
+
+
+class InvestigationStepFactory(object):
+    @classmethod
+    def from_dao(cls, serialized):
+        parser_subset = ConcatenatedRegexParser(
+            [RegexParserFactory.from_dao(parser) for parser in serialized['parsers']]
+        )
+        search_ranges = dict(
+            (group_type, {
+                InvestigationStep.LEFT_BOUND: left_bound,
+                InvestigationStep.RIGHT_BOUND: right_bound
+            }) for group_type, left_bound, right_bound in serialized['search_ranges']
+        )
+        return InvestigationStep(parser_subset, search_ranges)
+
 
 class Clue(object):
     """
@@ -0,0 +1,126 @@
+import six
+
+from whylog.config.utils import LogEncoding
+
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:
+    import sre_constants
+    import sre_parse
+
+
+class LiteralPrefilter(object):
+    """
+    Rejects lines, which cannot be matched by any of given parsers, without matching
+    their regexes. For every parser the longest literal, which is contained by every line
+    matched by this parser, is extracted from its regex. Line may be matched by some parser
+    only if it contains some of these literals, what is checked by fast substring search.
+    """
+
+    def __init__(self, literals):
+        self._literals = literals
+        self._bytes_literals = [LogEncoding.encode(literal) for literal in literals]
+
+    @property
+    def literals(self):
+        return list(self._literals)
+
+    @classmethod
+    def create(cls, parsers):
+        """
+        returns prefilter for parsers, or None if required literal
+        cannot be extracted from regex of some parser
+        """
+        literals = set()
+        for parser in parsers:
+            literal = cls.extract_required_literal(parser.regex_str)
+            if not literal:
+                return None
+            literals.add(literal)
+        # line containing literal contains also all its substrings,
+        # so literals containing other literals are redundant
+        minimal_literals = []
+        for literal in sorted(literals, key=len):
+            if not any(shorter in literal for shorter in minimal_literals):
+                minimal_literals.append(literal)
+        return cls(minimal_literals)
+
+    def may_match(self, line, from_bytes):
+        literals = self._bytes_literals if from_bytes else self._literals
+        for literal in literals:
+            if literal in line:
+                return True
+        return False
+
+    def may_match_range(self, buffer, begin, end):
+        """
+        works like may_match for bytes line, which is given as range of buffer
+        (e.g. memory mapped file), so line does not have to be copied from buffer
+        """
+        for literal in self._bytes_literals:
+            if buffer.find(literal, begin, end) != -1:
+                return True
+        return False
+
+    @classmethod
+    def extract_required_literal(cls, regex_str):
+        """
+        returns the longest literal contained by every line matched by regex,
+        or None if there is no such literal or regex cannot be analysed
+        (e.g. it uses syntax specific for regex module or ignores case)
+        """
+        try:
+            parsed_regex = sre_parse.parse(regex_str)
+        except (sre_constants.error, ValueError, TypeError, OverflowError, RuntimeError):
+            return None
+        regex_state = getattr(parsed_regex, 'state', None) or parsed_regex.pattern
+        if regex_state.flags & sre_constants.SRE_FLAG_IGNORECASE:
+            return None
+        literals = cls._find_required_literals(parsed_regex)
+        if not literals:
+            return None
+        return max(literals, key=len)
+
+    @classmethod
+    def _find_required_literals(cls, parsed_regex):
+        """
+        returns literals, which are the parts of regex matched always
+        """
+        literals = []
+        characters = []
+        for operation, argument in parsed_regex:
+            if operation == sre_constants.LITERAL:
+                characters.append(six.unichr(argument))
+                continue
+            if characters:
+                literals.append(u''.join(characters))
+                characters = []
+            literals.extend(cls._find_literals_in_operation(operation, argument))
+        if characters:
+            literals.append(u''.join(characters))
+        return literals
+
+    @classmethod
+    def _find_literals_in_operation(cls, operation, argument):
+        if operation == sre_constants.SUBPATTERN:
+            # group is described by (group, subregex) or (group, add flags, del flags, subregex)
+            if len(argument) == 4 and argument[1] & sre_constants.SRE_FLAG_IGNORECASE:
+                return []
+            return cls._find_required_literals(argument[-1])
+        if operation in cls._get_repeat_operations():
+            min_repeat, _, subregex = argument
+            if min_repeat >= 1:
+                return cls._find_required_literals(subregex)
+        if operation == getattr(sre_constants, 'ATOMIC_GROUP', None):
+            return cls._find_required_literals(argument)
+        # other operations, e.g. alternatives and character classes, do not contain
+        # literals matched always
+        return []
+
+    @classmethod
+    def _get_repeat_operations(cls):
+        return [
+            getattr(sre_constants, name)
+            for name in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT')
+            if hasattr(sre_constants, name)
+        ]  # yapf: disable
@@ -11,7 +11,7 @@ class LogType(object):
         self.name = name
         self.filename_matchers = filename_matchers
 
-    def files_to_parse(self, forced_log_type=None):
+    def files_to_parse(self, forced_log_type=None, agent_registry=None):
         """
         Gets all possible distinct tuples (host, file_name, super_parser) belonging to single log type
         It's information which files should be parsed by LogReader. Super parser has a information about
@@ -21,7 +21,8 @@ class LogType(object):
         parsed_files = set()
         for matcher in self.filename_matchers:
             for host, path, super_parser in itertools.chain(
-                self._generate_forced_files(forced_log_type), matcher.get_matched_files()
+                self._generate_forced_files(forced_log_type),
+                matcher.get_matched_files(agent_registry)
             ):
                 file_source = (host, path)
                 if file_source not in parsed_files:
@@ -35,6 +36,17 @@ class LogType(object):
             for line_source in forced_log_type
         )
 
+    def get_super_parser(self, line_source, forced_log_type=None):
+        """
+        returns super parser, which files_to_parse returns for file of line source
+        """
+        if line_source in (forced_log_type or EMPTY_TUPLE):
+            return DEFAULT_SUPER_REGEX
+        for matcher in self.filename_matchers:
+            if line_source in matcher:
+                return matcher.super_parser
+        return DEFAULT_SUPER_REGEX
+
     def __hash__(self):
         return self.name.__hash__()
 
@@ -1,3 +1,4 @@
+import itertools
 import re
 
 import six
@@ -12,6 +13,18 @@ class ParserNameGenerator(object):
     def is_free_parser_name(self, parser_name, black_list):
         return (parser_name not in self._parsers) and (parser_name not in black_list)
 
+    def find_free_parser_name(self, parser_name, black_list):
+        """
+        returns parser_name if it is free, otherwise the first free name
+        created by appending number to it
+        """
+        if self.is_free_parser_name(parser_name, black_list):
+            return parser_name
+        for number in itertools.count(1):
+            numbered_name = parser_name + str(number)
+            if self.is_free_parser_name(numbered_name, black_list):
+                return numbered_name
+
     def _create_name_from_words(self, words, black_list, words_count_in_name):
         proposed_name = '_'.join(words[:words_count_in_name])
         if self.is_free_parser_name(proposed_name, black_list):
@@ -3,7 +3,16 @@ from abc import ABCMeta, abstractmethod
 import six
 from frozendict import frozendict
 
-from whylog.config.utils import IMPORTED_RE, regex
+from whylog.config.literal_prefilter import LiteralPrefilter
+from whylog.config.pattern_cache import SHARED_PATTERN_CACHE
+from whylog.config.utils import IMPORTED_RE, LogEncoding, regex
+from whylog.investigation_stats import InvestigationStats
+
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:
+    import sre_constants
+    import sre_parse
 
 
 @six.add_metaclass(ABCMeta)
@@ -22,22 +31,43 @@ class ConcatenatedRegexParser(AbstractParserSubset):
     Sample backward concatenated regex: (e)|(d)|(c)|(b)|(a)
     where a, b, c, d, e are subregexes. Subregexes can have own groups
     We need to backward concatenated regex to check that only subregex matches with given line
+    Subregexes which cannot be concatenated, because they refer to groups, have named groups
+    or set flags of the whole regex, are matched separately.
     """
     NO_MATCH = frozendict()
+    GROUP_REFERENCES = frozenset([sre_constants.GROUPREF, sre_constants.GROUPREF_EXISTS])
+    REPEAT_OPERATIONS = frozenset(
+        getattr(sre_constants, name)
+        for name in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT')
+        if hasattr(sre_constants, name)
+    )  # yapf: disable
 
     def __init__(self, parser_list):
         self._parsers = parser_list
         self._parsers_dict = dict((parser.name, parser) for parser in self._parsers)
+        self._prefilter = LiteralPrefilter.create(self._parsers)
+        self._numbers_in_list = self._number_in_list(self._parsers)
         if IMPORTED_RE:
             return
-        forward, backward = self._create_concatenated_regexes()
-        self._forward_regex = regex.compile(forward)
-        self._backward_regex = regex.compile(backward)
-        self._forward_parsers_indexes = self._get_indexes_of_groups_for_parsers(self._parsers)
+        groups_counts = dict(
+            (parser.name, self._count_groups_of_concatenable_regex(parser.regex_str))
+            for parser in self._parsers
+        )
+        self._concatenated_parsers = [
+            parser for parser in self._parsers if groups_counts[parser.name] is not None
+        ]
+        self._separately_matched_parsers = [
+            parser for parser in self._parsers if groups_counts[parser.name] is None
+        ]
+        self._numbers_in_concatenated_list = self._number_in_list(self._concatenated_parsers)
+        # concatenated regexes are compiled on the first use
+        self._compiled_regexes = None
+        self._forward_parsers_indexes = self._get_indexes_of_groups_for_parsers(
+            self._concatenated_parsers, groups_counts
+        )
         self._backward_parsers_indexes = self._get_indexes_of_groups_for_parsers(
-            reversed(self._parsers)
+            reversed(self._concatenated_parsers), groups_counts
         )
-        self._numbers_in_list = self._number_in_list()
         self._forward_group_index_to_regex = self._create_group_index_to_regex_name(
             self._forward_parsers_indexes
         )
@@ -45,26 +75,104 @@ class ConcatenatedRegexParser(AbstractParserSubset):
             self._backward_parsers_indexes
         )
 
+    @property
+    def parser_names(self):
+        return [parser.name for parser in self._parsers]
+
+    @property
+    def parsers(self):
+        return list(self._parsers)
+
+    def serialize(self):
+        return [parser.serialize() for parser in self._parsers]
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if '_compiled_regexes' in state:
+            state['_compiled_regexes'] = None
+        return state
+
+    def _get_compiled_regexes(self):
+        """
+        returns forward and backward concatenated regexes
+        """
+        if self._compiled_regexes is None:
+            self._compiled_regexes = tuple(
+                SHARED_PATTERN_CACHE.compile(regex, pattern)
+                for pattern in self._create_concatenated_regexes()
+            )
+        return self._compiled_regexes
+
     def _create_concatenated_regexes(self):
-        forward_regex = "|".join("(" + parser.regex_str + ")" for parser in self._parsers)
+        forward_regex = "|".join(
+            "(" + parser.regex_str + ")" for parser in self._concatenated_parsers
+        )
         backward_regex = "|".join(
-            "(" + parser.regex_str + ")" for parser in reversed(self._parsers)
+            "(" + parser.regex_str + ")" for parser in reversed(self._concatenated_parsers)
         )
         return forward_regex, backward_regex
 
-    def _get_indexes_of_groups_for_parsers(self, parser_list):
+    @classmethod
+    def _count_groups_of_concatenable_regex(cls, regex_str):
+        """
+        returns the number of groups of regex, or None if regex cannot be a part
+        of concatenated regex: numbers of its groups would be shifted in concatenated regex,
+        its group names could be repeated by other subregexes, and its global flags
+        would be applied to the whole concatenated regex or rejected in the middle of it.
+        Regex which cannot be analysed, e.g. uses syntax specific for regex module,
+        is not concatenated either.
+        """
+        try:
+            parsed_regex = sre_parse.parse(regex_str)
+        except (sre_constants.error, ValueError, TypeError, OverflowError, RuntimeError):
+            return None
+        regex_state = getattr(parsed_regex, 'state', None) or parsed_regex.pattern
+        if regex_state.flags & ~sre_constants.SRE_FLAG_UNICODE or regex_state.groupdict:
+            return None
+        if cls._refers_to_groups(parsed_regex):
+            return None
+        return regex_state.groups - 1
+
+    @classmethod
+    def _refers_to_groups(cls, parsed_regex):
+        for operation, argument in parsed_regex:
+            if operation in cls.GROUP_REFERENCES:
+                return True
+            if any(
+                cls._refers_to_groups(subregex)
+                for subregex in cls._get_nested_subregexes(operation, argument)
+            ):
+                return True
+        return False
+
+    @classmethod
+    def _get_nested_subregexes(cls, operation, argument):
+        if operation == sre_constants.SUBPATTERN:
+            # group is described by (group, subregex) or (group, add flags, del flags, subregex)
+            return [argument[-1]]
+        if operation in cls.REPEAT_OPERATIONS:
+            return [argument[2]]
+        if operation == sre_constants.BRANCH:
+            return argument[1]
+        if operation in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            return [argument[1]]
+        if operation == getattr(sre_constants, 'ATOMIC_GROUP', None):
+            return [argument]
+        return []
+
+    def _get_indexes_of_groups_for_parsers(self, parser_list, groups_counts):
         indexes_dict = {}
         free_index = 0
         for parser in parser_list:
-            amount_of_group = parser.regex_str.count('(') - parser.regex_str.count('\(')
+            amount_of_group = groups_counts[parser.name]
             indexes_dict[parser.name] = (free_index, amount_of_group)
             free_index += amount_of_group + 1
         return indexes_dict
 
-    def _number_in_list(self):
+    def _number_in_list(self, parsers):
         regex_numbers = {}
         number = 0
-        for parser in self._parsers:
+        for parser in parsers:
             regex_numbers[parser.name] = number
             number += 1
         return regex_numbers
@@ -90,7 +198,19 @@ class ConcatenatedRegexParser(AbstractParserSubset):
             }
             commited_transaction is sample parser name which matches with line
         """
-        params_dict = self.get_extracted_parsers_params(line)
+        return self.convert_parsers_groups(self.get_extracted_parsers_params(line))
+
+    def convert_parsers_groups_from_matched_bytes(self, line):
+        """
+        Works like convert_parsers_groups_from_matched_line, but for line which was not decoded.
+        """
+        return self.convert_parsers_groups(self.get_extracted_parsers_params_from_bytes(line))
+
+    def convert_parsers_groups(self, params_dict):
+        """
+        converts groups extracted by parsers (given as dict of parser name
+        to tuple of string groups) to types defined in these parsers
+        """
         converted_params = {}
         for parser_name, parser in six.iteritems(params_dict):
             converted_params[parser_name] = self._parsers_dict[parser_name].convert_params(parser)
@@ -108,12 +228,74 @@ class ConcatenatedRegexParser(AbstractParserSubset):
             "lost_data_suffix": ("2015-12-03 12:11:00", "alfa21. Loss = 567.02 GB. Host name: 101"),
         }
         """
+        return self._extract_parsers_params(line, False)
+
+    def get_extracted_parsers_params_from_bytes(self, line):
+        """
+        Works like get_extracted_parsers_params, but for line which was not decoded.
+        Line is decoded only if it contains some literal required by parsers,
+        so extracted groups are decoded too.
+        """
+        return self._extract_parsers_params(line, True)
+
+    def may_match_range(self, buffer, begin, end):
+        """
+        checks, without copying line given as range of bytes buffer, whether it may be
+        matched by some parser, i.e. it contains some literal required by parsers
+        """
+        return self._prefilter is None or self._prefilter.may_match_range(buffer, begin, end)
+
+    def get_matching_parsers(self, line):
+        """
+        returns pairs of parser and groups extracted by it from given line for all parsers
+        matching this line, in order of parsers. Unlike get_extracted_parsers_params,
+        it does not record matching in InvestigationStats, because it is used to find
+        parsers of effect line during creation of investigation plan, not in searched files.
+        """
+        if self._prefilter is not None and not self._prefilter.may_match(line, False):
+            return []
+        extracted_regex_params = self._match_regexes(line)
+        return [
+            (self._parsers_dict[parser_name], extracted_regex_params[parser_name])
+            for parser_name in sorted(extracted_regex_params, key=self._numbers_in_list.get)
+        ]
+
+    def _extract_parsers_params(self, line, from_bytes):
+        # most of lines contain no literal required by parsers, so regexes are not matched
+        if self._prefilter is not None and not self._prefilter.may_match(line, from_bytes):
+            return ConcatenatedRegexParser.NO_MATCH
+        if from_bytes:
+            # regexes are matched with decoded line, because matched with bytes,
+            # \w, \d, \s, . and character classes would match single bytes of UTF-8,
+            # not characters, and repetitions would count bytes
+            line = LogEncoding.decode(line)
+        extracted_regex_params = self._match_regexes(line)
+        stats = InvestigationStats.get_active()
+        if stats is not None:
+            stats.record_regex_matching(self._parsers_dict, extracted_regex_params)
+        return extracted_regex_params
+
+    def _match_regexes(self, line):
         # Handle case when regex module is not installed by matching many regexes
         if IMPORTED_RE:
             extracted_regex_params = {}
-            self._brute_subregexes_matching(extracted_regex_params, 0, len(self._parsers) - 1, line)
+            self._brute_subregexes_matching(extracted_regex_params, self._parsers, line)
             return extracted_regex_params
-        forward_matched = self._forward_regex.match(line)
+        if self._concatenated_parsers:
+            extracted_regex_params = self._match_concatenated_regexes(line)
+        else:
+            extracted_regex_params = ConcatenatedRegexParser.NO_MATCH
+        if not self._separately_matched_parsers:
+            return extracted_regex_params
+        extracted_regex_params = dict(extracted_regex_params)
+        self._brute_subregexes_matching(
+            extracted_regex_params, self._separately_matched_parsers, line
+        )
+        return extracted_regex_params
+
+    def _match_concatenated_regexes(self, line):
+        forward_regex, backward_regex = self._get_compiled_regexes()
+        forward_matched = forward_regex.match(line)
         if forward_matched is None:
             return ConcatenatedRegexParser.NO_MATCH
         forward_groups = forward_matched.groups()
@@ -121,7 +303,10 @@ class ConcatenatedRegexParser(AbstractParserSubset):
             # If it was last subregex it's true that only one subregex matches
             return self._extract_params_from_last_regex(forward_groups)
         # Now we must use backward concatenated regex to check if only one subregex matched
-        backward_groups = self._backward_regex.match(line).groups()
+        stats = InvestigationStats.get_active()
+        if stats is not None:
+            stats.backward_regex_fallbacks += 1
+        backward_groups = backward_regex.match(line).groups()
         forward_matched_regex_name, only_one = self._check_that_only_one_regex_matched(
             forward_groups, backward_groups
         )
@@ -147,11 +332,13 @@ class ConcatenatedRegexParser(AbstractParserSubset):
             backward_groups, backward_matched_regex_name, self._backward_parsers_indexes
         )
         extracted_regex_params[backward_matched_regex_name] = regex_params
-        left = self._numbers_in_list[forward_matched_regex_name] + 1
-        right = self._numbers_in_list[backward_matched_regex_name] - 1
+        left = self._numbers_in_concatenated_list[forward_matched_regex_name] + 1
+        right = self._numbers_in_concatenated_list[backward_matched_regex_name] - 1
         # Now we must check if other subregexes matched with line.
         # We only have to check the ones that are beetween subregexes found forward and backward
-        self._brute_subregexes_matching(extracted_regex_params, left, right, line)
+        self._brute_subregexes_matching(
+            extracted_regex_params, self._concatenated_parsers[left:right + 1], line
+        )
         return extracted_regex_params
 
     def _extract_regex_params_by_regex_name(self, groups, matched_regex_name, parsers_indexes):
@@ -176,7 +363,7 @@ class ConcatenatedRegexParser(AbstractParserSubset):
         return regex_name, is_matched_one_regex
 
     def _extract_params_from_last_regex(self, forward_groups):
-        last_regex_name = self._parsers[-1].name
+        last_regex_name = self._concatenated_parsers[-1].name
         last_regex_params = self._extract_regex_params_by_regex_name(
             forward_groups, last_regex_name, self._forward_parsers_indexes
         )
@@ -191,8 +378,8 @@ class ConcatenatedRegexParser(AbstractParserSubset):
             for i in six.moves.range(regex_index + 1, regex_index + regex_group_number + 1)
         )
 
-    def _brute_subregexes_matching(self, extracted_regex_params, left, right, line):
-        for i in six.moves.range(left, right + 1):
-            match = self._parsers[i].get_regex_params(line)
+    def _brute_subregexes_matching(self, extracted_regex_params, parsers, line):
+        for parser in parsers:
+            match = parser.get_regex_params(line)
             if match is not None:
-                extracted_regex_params[self._parsers[i].name] = match
+                extracted_regex_params[parser.name] = match
@@ -2,9 +2,11 @@ from abc import ABCMeta, abstractmethod
 
 import six
 
-from whylog.config.utils import regex
+from whylog.config.pattern_cache import SHARED_PATTERN_CACHE
+from whylog.config.utils import LogEncoding, regex
 from whylog.converters import CONVERTION_MAPPING, STRING
 from whylog.converters.exceptions import UnsupportedConverterError
+from whylog.investigation_stats import InvestigationStats
 
 
 @six.add_metaclass(ABCMeta)
@@ -29,16 +31,47 @@ class RegexParser(AbstractParser):
         self.name = name
         self.line_content = line_content
         self.regex_str = regex_str
-        self.regex = regex.compile(self.regex_str)
+        self._regex = None
         self.primary_key_groups = primary_key_groups
         self.log_type = log_type
         self.convertions = convertions
 
+    @property
+    def regex(self):
+        """
+        regex is compiled on the first use, so parsers not used by investigations
+        are never compiled
+        """
+        if self._regex is None:
+            self._regex = SHARED_PATTERN_CACHE.compile(regex, self.regex_str)
+        return self._regex
+
+    def check_regex(self):
+        """
+        compiles regex now, so malformed regex raises error before parser is used.
+        Regexes loaded from config are not checked, because checking is as costly
+        as compilation, so malformed regex from config raises error on the first use.
+        """
+        return self.regex
+
+    def __getstate__(self):
+        # compiled regex would be pickled as pattern and compiled again after unpickling
+        state = self.__dict__.copy()
+        state['_regex'] = None
+        return state
+
     def get_regex_params(self, line):
         matches = self.regex.match(line)
         if matches is not None:
             return matches.groups()
 
+    def get_regex_params_from_bytes(self, line):
+        """
+        Works like get_regex_params, but for line which was not decoded.
+        Line is decoded before matching, so regex matches characters, not bytes of UTF-8.
+        """
+        return self.get_regex_params(LogEncoding.decode(line))
+
     def serialize(self):
         return {
             "name": self.name,
@@ -57,6 +90,7 @@ class RegexParser(AbstractParser):
             return: (datetime(2015, 12, 3, 12, 10, 10), 2100, 'postgres_db')
         """
         converted_params = []
+        converter_calls = 0
         for i in six.moves.range(len(params)):
             group_type = self.convertions.get(i + 1, STRING)
             if group_type == STRING:
@@ -66,6 +100,10 @@ class RegexParser(AbstractParser):
             if converter is None:
                 raise UnsupportedConverterError(group_type)
             converted_params.append(converter.convert(params[i]))
+            converter_calls += 1
+        stats = InvestigationStats.get_active()
+        if stats is not None:
+            stats.converter_calls += converter_calls
         return tuple(converted_params)
 
     def get_primary_key_group(self):
@@ -106,10 +144,13 @@ class RegexParserFactory(object):
             (group_id, group.converter_type)
             for group_id, group in six.iteritems(parser_intent.groups)
         )
-        return RegexParser(
+        parser = RegexParser(
             parser_intent.pattern_name, parser_intent.line_content, parser_intent.pattern,
             parser_intent.primary_key_groups, parser_intent.log_type_name, convertions
         )
+        # regex given by user is rejected before it is saved in config
+        parser.check_regex()
+        return parser
 
     @classmethod
     def from_dao(cls, serialized_parser):
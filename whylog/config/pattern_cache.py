@@ -0,0 +1,41 @@
+import threading
+
+
+class PatternCache(object):
+    """
+    Process-wide cache of compiled regexes keyed by their patterns, so parsers with
+    the same regex and concatenated regexes of the same parsers share compiled patterns.
+    When it is disabled, every user compiles its patterns itself.
+    Compiled patterns are never evicted, so cache should be enabled only for bounded sets
+    of patterns, e.g. regexes of parsers from config.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._patterns = {}
+        self._lock = threading.Lock()
+
+    def compile(self, regex_module, pattern):
+        """
+        :param regex_module: re or regex module, which compiles the pattern
+        """
+        if not self.enabled:
+            return regex_module.compile(pattern)
+        key = (regex_module.__name__, pattern)
+        compiled = self._patterns.get(key)
+        if compiled is None:
+            compiled = regex_module.compile(pattern)
+            with self._lock:
+                compiled = self._patterns.setdefault(key, compiled)
+        return compiled
+
+    def clear(self):
+        with self._lock:
+            self._patterns.clear()
+
+    def __len__(self):
+        return len(self._patterns)
+
+
+
+SHARED_PATTERN_CACHE = PatternCache(enabled=False)
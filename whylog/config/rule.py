@@ -362,6 +362,11 @@ class Rule(object):
             for parser_name, occurrences in self._frequency_information
             if clues.get(parser_name) is not None
         ]
+        if self._linkage == self.LINKAGE_AND and len(clues_lists) < len(
+            self._frequency_information
+        ):
+            # all causes are required, so rule is not satisfied when some cause has no clues
+            return []
         effect_clue = effect_clues_dict[self._effect.name]
         constraint_manager = ConstraintManager()
         return self.LINKAGE_SELECTOR[self._linkage](
@@ -5,6 +5,7 @@ import six
 import yaml
 
 from whylog.config.consts import DEFAULT_MATCHER, YamlFileNames
+from whylog.config.sqlite_config import SQLiteConfig
 
 
 class AbstractSettingsFactory(object):
@@ -60,3 +61,16 @@ class YamlSettingsFactory(AbstractSettingsFactory):
         settings['pattern_assistant'] = cls.DEFAULT_PATTERN_ASSISTANT
         settings['config_type'] = 'yaml'
         return settings
+
+
+class SQLiteSettingsFactory(AbstractSettingsFactory):
+    @classmethod
+    def _create_settings_dict(cls, whylog_dir):
+        database_path = os.path.join(whylog_dir, YamlFileNames.sqlite_config)
+        config = SQLiteConfig(database_path)
+        config.add_filename_matcher_to_log_type(DEFAULT_MATCHER)
+        return {
+            'database_path': database_path,
+            'pattern_assistant': cls.DEFAULT_PATTERN_ASSISTANT,
+            'config_type': 'sqlite',
+        }
@@ -0,0 +1,284 @@
+import copy
+import json
+import sqlite3
+import threading
+from collections import defaultdict
+from contextlib import closing, contextmanager
+
+import six
+
+from whylog.config.abstract_config import AbstractConfig
+from whylog.config.exceptions import UnsupportedFilenameMatcher
+from whylog.config.filename_matchers import WildCardFilenameMatcherFactory
+from whylog.config.log_type import LogType
+from whylog.config.parser_name_generator import ParserNameGenerator
+from whylog.config.parsers import RegexParserFactory
+from whylog.config.rule import RegexRuleFactory
+from whylog.teacher.user_intent import UserRuleIntent
+
+
+class SQLiteRulesIndex(object):
+    """
+    Rules grouped by name of their effect parser. Rules of effect are queried
+    from the database by index on the first lookup of this effect, so rules
+    never suspected in investigations are not loaded.
+    """
+
+    def __init__(self, config):
+        self._config = config
+        self._rules = {}
+
+    def get(self, effect_name, default=None):
+        rules = self[effect_name]
+        if not rules:
+            return default
+        return rules
+
+    def __getitem__(self, effect_name):
+        rules = self._rules.get(effect_name)
+        if rules is None:
+            rules = self._config._load_rules_of_effect(effect_name)
+            self._rules[effect_name] = rules
+        return rules
+
+
+class SQLiteConfig(AbstractConfig):
+    """
+    Config stored in SQLite database. Every change of config is saved in one transaction,
+    which modifies only rows of changed parsers, rules and matchers, so it is either saved
+    completely or not at all, and it does not rewrite the whole config like file configs.
+    Parsers and log types are loaded when config is created, rules are loaded lazily
+    by SQLiteRulesIndex.
+    Connection of transaction in progress is kept per thread, so queries of other threads
+    do not use transactions which they have not begun.
+    """
+
+    SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS parsers (
+            name TEXT PRIMARY KEY,
+            log_type TEXT NOT NULL,
+            definition TEXT NOT NULL
+        )
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS parsers_by_log_type ON parsers (log_type)
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS rules (
+            rule_id INTEGER PRIMARY KEY,
+            effect TEXT NOT NULL,
+            definition TEXT NOT NULL
+        )
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS rules_by_effect ON rules (effect)
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS matchers (
+            matcher_id INTEGER PRIMARY KEY,
+            log_type_name TEXT NOT NULL,
+            definition TEXT NOT NULL
+        )
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS matchers_by_log_type ON matchers (log_type_name)
+        """,
+    )  # yapf: disable
+
+    MATCHERS_FACTORIES = {'WildCardFilenameMatcher': WildCardFilenameMatcherFactory}
+
+    def __init__(self, database_path, timeout=5.0):
+        """
+        :param timeout: number of seconds for which transaction waits
+            for transactions of other processes using the same database
+        """
+        self._database_path = database_path
+        self._timeout = timeout
+        self._local = threading.local()
+        with self._transaction() as connection:
+            for statement in self.SCHEMA:
+                connection.execute(statement)
+        super(SQLiteConfig, self).__init__()
+
+    def __getstate__(self):
+        # thread local storage cannot be pickled, it happens when config is sent to other process
+        state = self.__dict__.copy()
+        del state['_local']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    @property
+    def _connection(self):
+        """
+        connection of transaction begun by the current thread, or None
+        """
+        return getattr(self._local, 'connection', None)
+
+    def _connect(self):
+        # transactions are begun explicitly by _transaction
+        return sqlite3.connect(self._database_path, timeout=self._timeout, isolation_level=None)
+
+    @contextmanager
+    def _transaction(self):
+        """
+        yields connection with begun transaction, which is committed on exit
+        or rolled back on exception. Nested calls use the transaction of the outermost one.
+        """
+        if self._connection is not None:
+            yield self._connection
+            return
+        with closing(self._connect()) as connection:
+            connection.execute('BEGIN IMMEDIATE')
+            self._local.connection = connection
+            try:
+                yield connection
+            except Exception:
+                connection.execute('ROLLBACK')
+                raise
+            else:
+                connection.execute('COMMIT')
+            finally:
+                self._local.connection = None
+
+    def _query(self, query, params=()):
+        if self._connection is not None:
+            return self._connection.execute(query, params).fetchall()
+        with closing(self._connect()) as connection:
+            return connection.execute(query, params).fetchall()
+
+    def _load_parsers(self):
+        return dict(
+            (name, RegexParserFactory.from_dao(self._restore_convertions(json.loads(definition))))
+            for name, definition in self._query('SELECT name, definition FROM parsers')
+        )
+
+    def _load_rules(self):
+        return SQLiteRulesIndex(self)
+
+    def _load_rules_of_effect(self, effect_name):
+        return [
+            RegexRuleFactory.from_dao(json.loads(definition), self._parsers)
+            for (definition, ) in self._query(
+                'SELECT definition FROM rules WHERE effect = ? ORDER BY rule_id', (effect_name, )
+            )
+        ]
+
+    def _load_log_types(self):
+        matchers = defaultdict(list)
+        for (definition, ) in self._query('SELECT definition FROM matchers ORDER BY matcher_id'):
+            definition = json.loads(definition)
+            matcher_class_name = definition['matcher_class_name']
+            factory_class = self.MATCHERS_FACTORIES.get(matcher_class_name)
+            if factory_class is None:
+                raise UnsupportedFilenameMatcher(matcher_class_name)
+            self._restore_convertions(definition['super_parser'])
+            matchers[definition['log_type_name']].append(factory_class.from_dao(definition))
+        return dict(
+            (log_type_name, LogType(log_type_name, log_type_matchers))
+            for log_type_name, log_type_matchers in six.iteritems(matchers)
+        )
+
+    def add_rule(self, user_rule_intent):
+        """
+        parsers are read again in transaction, which blocks changes of config made by other
+        processes, so names of new parsers are not taken by parsers added by them since config
+        was loaded. Config in memory is changed only after the transaction is committed,
+        then parsers and rules added by other processes are loaded too.
+        """
+        with self._transaction():
+            parsers = self._load_parsers()
+            user_rule_intent = self._rename_parsers_added_by_others(user_rule_intent, parsers)
+            created_rule = RegexRuleFactory.create_from_intent(user_rule_intent)
+            created_parsers = self._save_rule(created_rule, ParserNameGenerator(parsers))
+        parsers.update((parser.name, parser) for parser in created_parsers)
+        self._set_parsers(parsers)
+        self._rules = self._load_rules()
+        self._investigation_plans_parts.clear()
+        self._revision += 1
+
+    def _rename_parsers_added_by_others(self, user_rule_intent, parsers):
+        """
+        returns intent, in which new parsers named like parsers added by other processes
+        get free names, so they do not refer to these parsers
+        """
+        parser_name_generator = ParserNameGenerator(parsers)
+        black_list = set(
+            parser_intent.pattern_name for parser_intent in six.itervalues(user_rule_intent.parsers)
+        )
+        new_names = {}
+        parser_intents = {}
+        for intent_id, parser_intent in six.iteritems(user_rule_intent.parsers):
+            name = parser_intent.pattern_name
+            if name in parsers and name not in self._parsers:
+                if name not in new_names:
+                    new_names[name] = parser_name_generator.find_free_parser_name(name, black_list)
+                    black_list.add(new_names[name])
+                parser_intent = copy.copy(parser_intent)
+                parser_intent.pattern_name = new_names[name]
+            parser_intents[intent_id] = parser_intent
+        if not new_names:
+            return user_rule_intent
+        return UserRuleIntent(
+            user_rule_intent.effect_id, parser_intents, user_rule_intent.constraints
+        )
+
+    def rename_log_type(self, old_name, new_name):
+        """
+        renamed log type is saved before it is renamed in memory,
+        so config in memory is not changed when saving fails
+        """
+        with self._transaction():
+            # otherwise log type is not renamed or error is raised below
+            if old_name != new_name and old_name in self._log_types and \
+                    new_name not in self._log_types:
+                self._save_log_type_under_new_name(old_name, new_name)
+        super(SQLiteConfig, self).rename_log_type(old_name, new_name)
+
+    def _save_log_type(self, log_type):
+        with self._transaction():
+            super(SQLiteConfig, self)._save_log_type(log_type)
+
+    def _save_rule_definition(self, rule_definition):
+        with self._transaction() as connection:
+            connection.execute(
+                'INSERT INTO rules (effect, definition) VALUES (?, ?)',
+                (rule_definition['effect'], json.dumps(rule_definition))
+            )
+
+    def _save_parsers_definition(self, parser_definitions):
+        with self._transaction() as connection:
+            connection.executemany(
+                'INSERT INTO parsers (name, log_type, definition) VALUES (?, ?, ?)', (
+                    (definition['name'], definition['log_type'], json.dumps(definition))
+                    for definition in parser_definitions
+                )
+            )
+
+    def _save_filename_matcher_definition(self, matcher_definition):
+        with self._transaction() as connection:
+            connection.execute(
+                'INSERT INTO matchers (log_type_name, definition) VALUES (?, ?)',
+                (matcher_definition['log_type_name'], json.dumps(matcher_definition))
+            )
+
+    def _save_renamed_log_type(self, old_name, new_name):
+        # log type is saved by rename_log_type before it is renamed in memory
+        pass
+
+    def _save_log_type_under_new_name(self, old_name, new_name):
+        with self._transaction() as connection:
+            connection.executemany(
+                'UPDATE parsers SET log_type = ?, definition = ? WHERE name = ?', (
+                    (new_name, json.dumps(dict(parser.serialize(), log_type=new_name)), parser.name)
+                    for parser in self._parsers_grouped_by_log_type.get(old_name, [])
+                )
+            )
+            connection.execute('DELETE FROM matchers WHERE log_type_name = ?', (old_name, ))
+            for matcher in self._log_types[old_name].filename_matchers:
+                self._save_filename_matcher_definition(
+                    dict(matcher.serialize(), log_type_name=new_name)
+                )
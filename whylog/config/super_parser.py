@@ -3,6 +3,8 @@ from abc import ABCMeta, abstractmethod
 
 import six
 
+from whylog.config.pattern_cache import SHARED_PATTERN_CACHE
+from whylog.config.utils import LogEncoding
 from whylog.converters import CONVERTION_MAPPING, STRING
 
 
@@ -21,13 +23,34 @@ class RegexSuperParser(AbstractSuperParser):
     NO_PRIMARY_KEY = tuple()
 
     def __init__(self, regex_str, group_order, convertions):
-        self.regex = re.compile(regex_str)
+        self.regex_str = regex_str
+        self._regex = None
         self.group_order = group_order
         self.convertions = convertions
 
+    @property
+    def regex(self):
+        """
+        regex is compiled on the first use, like regexes of parsers
+        """
+        if self._regex is None:
+            self._regex = SHARED_PATTERN_CACHE.compile(re, self.regex_str)
+        return self._regex
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_regex'] = None
+        return state
+
+    def check_regex(self):
+        """
+        compiles regex now, like RegexParser.check_regex
+        """
+        return self.regex
+
     def serialize(self):
         return {
-            'regex_str': self.regex.pattern,
+            'regex_str': self.regex_str,
             'group_order': self.group_order,
             'convertions': self.convertions
         }
@@ -51,7 +74,16 @@ class RegexSuperParser(AbstractSuperParser):
         match = self.regex.match(line)
         if not match:
             return self.NO_PRIMARY_KEY
-        groups = match.groups()
+        return self._convert_ordered_groups(match.groups())
+
+    def get_ordered_groups_from_bytes(self, line):
+        """
+        Works like get_ordered_groups, but for line which was not decoded.
+        Line is decoded before matching, so regex matches characters, not bytes of UTF-8.
+        """
+        return self.get_ordered_groups(LogEncoding.decode(line))
+
+    def _convert_ordered_groups(self, groups):
         result = []
         for group_nr in self.group_order:
             convertion_type = self.convertions.get(group_nr)
@@ -16,3 +16,20 @@ assert regex
 
 class CompareResult(object):
     LT, EQ, GT = -1, 0, 1
+
+
+class LogEncoding(object):
+    """
+    Log files are read as bytes, only lines which are interesting
+    for investigation are decoded with this encoding.
+    """
+    DEFAULT = 'utf-8'
+    ERRORS = 'replace'
+
+    @classmethod
+    def decode(cls, raw_content):
+        return raw_content.decode(cls.DEFAULT, cls.ERRORS)
+
+    @classmethod
+    def encode(cls, content):
+        return content.encode(cls.DEFAULT)
@@ -4,8 +4,8 @@ from whylog.config.abstract_file_config import AbstractFileConfig
 
 
 class YamlConfig(AbstractFileConfig):
-    def __init__(self, parsers_path, rules_path, log_types_path):
-        super(YamlConfig, self).__init__(parsers_path, rules_path, log_types_path)
+    def __init__(self, parsers_path, rules_path, log_types_path, snapshot_path=None):
+        super(YamlConfig, self).__init__(parsers_path, rules_path, log_types_path, snapshot_path)
 
     def _load_file_with_config(self, path):
         with open(path, "r") as config_file:
@@ -3,6 +3,7 @@ import itertools
 from whylog.config.investigation_plan import Clue
 from whylog.constraints.exceptions import TooManyConstraintsToNegate
 from whylog.front.utils import FrontInput
+from whylog.investigation_stats import InvestigationStats
 
 
 class Verifier(object):
@@ -27,6 +28,9 @@ class Verifier(object):
         effect (which represents parser 0 from this rule) satisfy one given constraint.
         returns True if so, or False otherwise
         """
+        stats = InvestigationStats.get_active()
+        if stats is not None:
+            stats.constraint_checks += 1
         constraint_verifier = constraint_manager.get_constraint_object(index, constraint)
         groups = []
         for group_info in constraint['clues_groups']:
@@ -75,6 +79,17 @@ class Verifier(object):
         else:
             yield collected_subset
 
+    @classmethod
+    def _enumerate_combinations(cls, clues_lists):
+        """
+        yields combinations generated by _clues_combinations and counts them in stats
+        """
+        stats = InvestigationStats.get_active()
+        for combination in cls._clues_combinations(clues_lists):
+            if stats is not None:
+                stats.verifier_combinations += 1
+            yield combination
+
     @classmethod
     def _construct_proper_clues_lists(cls, original_clues_lists):
         clues_lists = []
@@ -102,7 +117,7 @@ class Verifier(object):
         """
         clues_lists = cls._construct_proper_clues_lists(clues_lists)
         causes = []
-        for combination in cls._clues_combinations(clues_lists):
+        for combination in cls._enumerate_combinations(clues_lists):
             if all(
                 cls._verify_constraint(combination, effect, idx, constraint, constraint_manager)
                 for idx, constraint in enumerate(constraints)
@@ -127,11 +142,11 @@ class Verifier(object):
             # each of them should be returned
             return [
                 cls._pack_results_for_constraint_or(combination, constraints)
-                for combination in cls._clues_combinations(clues_lists)
+                for combination in cls._enumerate_combinations(clues_lists)
             ]
         causes = []
         clues_lists = cls._construct_proper_clues_lists(clues_lists)
-        for combination in cls._clues_combinations(clues_lists):
+        for combination in cls._enumerate_combinations(clues_lists):
             verified_constraints = [
                 constraint
                 for idx, constraint in enumerate(constraints)
@@ -171,7 +186,7 @@ class Verifier(object):
         returns list of all produced InvestigationResults
         """
         clues_lists = cls._construct_proper_clues_lists(clues_lists)
-        for combination in cls._clues_combinations(clues_lists):
+        for combination in cls._enumerate_combinations(clues_lists):
             if cls._verify_constraint(combination, effect, 0, constraint, constraint_manager):
                 # called with constraint index = 0, because this function assumes that there is one constraint
                 return []
@@ -43,6 +43,15 @@ class DeltaConverter(AbstractConverter):
     def switch_by_delta(cls, value, delta, delta_type=None):
         pass
 
+    @classmethod
+    @abstractmethod
+    def to_number(cls, value):
+        """
+        projects converted value to the number, keeping the order and proportions of distances
+        between values, so positions of values in sorted log file can be estimated
+        """
+        pass
+
 
 class IntConverter(DeltaConverter):
     MIN_VALUE = -six.MAXSIZE - 1
@@ -52,6 +61,10 @@ class IntConverter(DeltaConverter):
     def switch_by_delta(cls, value, delta, delta_type=None):
         return value - delta
 
+    @classmethod
+    def to_number(cls, value):
+        return float(value)
+
     @classmethod
     def convert(cls, pattern_group):
         return int(pattern_group)
@@ -65,6 +78,10 @@ class FloatConverter(DeltaConverter):
     def switch_by_delta(cls, value, delta, delta_type=None):
         return value - delta
 
+    @classmethod
+    def to_number(cls, value):
+        return value
+
     @classmethod
     def convert(cls, pattern_group):
         return float(pattern_group)
@@ -80,6 +97,7 @@ class StringConverter(AbstractConverter):
 class DateConverter(DeltaConverter):
     MIN_VALUE = datetime.min
     MAX_VALUE = datetime.max
+    EPOCH = datetime(1970, 1, 1)
 
     @classmethod
     def switch_by_delta(cls, date, delta, delta_type=None):
@@ -91,6 +109,12 @@ class DateConverter(DeltaConverter):
         converted_delta = timedelta(seconds=delta)
         return date - converted_delta
 
+    @classmethod
+    def to_number(cls, date):
+        if date.tzinfo is not None:
+            date = date.replace(tzinfo=None) - date.utcoffset()
+        return (date - cls.EPOCH).total_seconds()
+
     @classmethod
     def convert(cls, pattern_group):
         return dateutil.parser.parse(pattern_group)
@@ -0,0 +1,102 @@
+import json
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+import six
+
+
+class InvestigationStats(object):
+    """
+    Counters of work done during investigations, which show where their time is spent.
+    Instrumented code records events in stats activated in the current thread,
+    so nothing is recorded when no stats are activated.
+    Executors activate fresh stats in their workers and merge them into the activated ones.
+    Work done by agents on other hosts is not recorded.
+    """
+
+    COUNTERS = (
+        'files_considered',
+        'files_skipped',
+        'bisection_probes',
+        'bytes_read',
+        'lines_scanned',
+        'backward_regex_fallbacks',
+        'converter_calls',
+        'verifier_combinations',
+        'constraint_checks',
+    )  # yapf: disable
+    PER_PARSER_COUNTERS = ('regex_attempts', 'regex_hits')
+
+    _active = threading.local()
+
+    def __init__(self):
+        self.plan_creation_time = 0.0
+        for counter_name in self.COUNTERS:
+            setattr(self, counter_name, 0)
+        for counter_name in self.PER_PARSER_COUNTERS:
+            setattr(self, counter_name, Counter())
+
+    @classmethod
+    def get_active(cls):
+        """
+        returns stats activated in the current thread or None
+        """
+        return getattr(cls._active, 'stats', None)
+
+    @contextmanager
+    def activated(self):
+        previous_stats = self.get_active()
+        self._active.stats = self
+        try:
+            yield self
+        finally:
+            self._active.stats = previous_stats
+
+    def record_regex_matching(self, parser_names, matched_parser_names):
+        for parser_name in parser_names:
+            self.regex_attempts[parser_name] += 1
+        for parser_name in matched_parser_names:
+            self.regex_hits[parser_name] += 1
+
+    def merge(self, other):
+        self.plan_creation_time += other.plan_creation_time
+        for counter_name in self.COUNTERS + self.PER_PARSER_COUNTERS:
+            setattr(
+                self, counter_name,
+                getattr(self, counter_name) + getattr(other, counter_name)
+            )  # yapf: disable
+
+    def serialize(self):
+        serialized = {'plan_creation_time': self.plan_creation_time}
+        for counter_name in self.COUNTERS:
+            serialized[counter_name] = getattr(self, counter_name)
+        for counter_name in self.PER_PARSER_COUNTERS:
+            serialized[counter_name] = dict(getattr(self, counter_name))
+        return serialized
+
+    def dump_json(self, file_path):
+        with open(file_path, 'w') as stats_file:
+            json.dump(self.serialize(), stats_file, indent=2, sort_keys=True)
+
+    def __repr__(self):
+        return "(InvestigationStats: %s)" % (
+            ', '.join('%s=%s' % item for item in sorted(six.iteritems(self.serialize()))),
+        )
+
+
+class StatsCollectingFunction(object):
+    """
+    Wraps function run by worker of executor, so its result is returned
+    together with stats collected during the run.
+    Module level class, so it can be passed to processes pool.
+    """
+
+    def __init__(self, function):
+        self._function = function
+
+    def __call__(self, task):
+        stats = InvestigationStats()
+        with stats.activated():
+            result = self._function(task)
+        return result, stats
@@ -1,12 +1,22 @@
 import itertools
+import time
 from abc import ABCMeta, abstractmethod
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 
 import six
 from frozendict import frozendict
 
+from whylog.config.investigation_plan import InvestigationStep, LineSource
+from whylog.front.utils import FrontInput
+from whylog.investigation_stats import InvestigationStats
+from whylog.log_reader.agent import RemoteSearcher
+from whylog.log_reader.budget import PartialResults
+from whylog.log_reader.causes_tree import CausesTree
+from whylog.log_reader.const import TreeConsts
 from whylog.log_reader.exceptions import NoLogTypeError
+from whylog.log_reader.executors import DEFAULT_EXECUTOR
 from whylog.log_reader.investiagtion_utils import InvestigationUtils
+from whylog.log_reader.result_cache import ResultCache
 from whylog.log_reader.searchers import BacktrackSearcher
 
 EMPTY_FROZEN_DICT = frozendict()
@@ -15,27 +25,169 @@ EMPTY_FROZEN_DICT = frozendict()
 @six.add_metaclass(ABCMeta)
 class AbstractLogReader(object):
     @abstractmethod
-    def get_causes(self, front_input, tmp_assign_to_log_type=EMPTY_FROZEN_DICT):
+    def get_causes(
+        self, front_input, tmp_assign_to_log_type=EMPTY_FROZEN_DICT, budget=None, stats=None
+    ):
         pass
 
     @abstractmethod
-    def get_causes_tree(self, front_input):
+    def iter_causes(self, front_input, tmp_assign_to_log_type=EMPTY_FROZEN_DICT):
+        pass
+
+    @abstractmethod
+    def get_causes_batch(self, front_inputs, tmp_assign_to_log_type=EMPTY_FROZEN_DICT):
+        pass
+
+    @abstractmethod
+    def get_causes_tree(
+        self,
+        front_input,
+        tmp_assign_to_log_type=EMPTY_FROZEN_DICT,
+        max_depth=TreeConsts.DEFAULT_MAX_DEPTH,
+        max_fan_out=TreeConsts.DEFAULT_MAX_FAN_OUT
+    ):
         pass
 
 
 class LogReader(AbstractLogReader):
-    def __init__(self, config):
+    def __init__(
+        self,
+        config,
+        searcher_factory=BacktrackSearcher,
+        file_executor=DEFAULT_EXECUTOR,
+        step_executor=DEFAULT_EXECUTOR,
+        agent_registry=None,
+        result_cache=None,
+        branch_executor=DEFAULT_EXECUTOR
+    ):
+        """
+        :param searcher_factory: callable creating searcher from (file path, investigation step,
+            super parser), e.g. BacktrackSearcher or IndexSearcher
+        :param file_executor: executor which runs searches in files of single log type,
+            e.g. ThreadSearchExecutor or ProcessSearchExecutor
+        :param step_executor: executor which runs investigation steps of different log types
+        :param agent_registry: AgentRegistry with agents searching files on hosts
+            other than localhost
+        :param result_cache: ResultCache with results of get_causes, which are returned
+            for repeated investigations of the same effect line
+        :param branch_executor: executor which runs investigations of lines from different
+            files in get_causes_batch and get_causes_tree. If it is also used as step
+            or file executor, investigations run by its workers use it serially.
+        """
         self.config = config
+        self._searcher_factory = searcher_factory
+        self._file_executor = file_executor
+        self._step_executor = step_executor
+        self._agent_registry = agent_registry
+        self._result_cache = result_cache
+        self._branch_executor = branch_executor
+
+    def get_causes(
+        self, front_input, tmp_assign_to_log_type=EMPTY_FROZEN_DICT, budget=None, stats=None
+    ):
+        """
+        :param budget: InvestigationBudget limiting the investigation. If it is given,
+            PartialResults are returned.
+        :param stats: InvestigationStats, which record the work done by the investigation.
+            Other methods record it in stats activated by InvestigationStats.activated.
+        """
+        if stats is not None:
+            with stats.activated():
+                return self.get_causes(front_input, tmp_assign_to_log_type, budget)
+        if self._result_cache is None:
+            manager = self._create_search_manager(front_input, tmp_assign_to_log_type)
+            return manager.investigate(front_input, tmp_assign_to_log_type, budget)
+        return self._get_causes_using_cache(front_input, tmp_assign_to_log_type, budget)
+
+    def _get_causes_using_cache(self, front_input, tmp_assign_to_log_type, budget):
+        causes = self._result_cache.get(self.config, front_input, tmp_assign_to_log_type)
+        if causes is not None:
+            return causes if budget is None else PartialResults(causes, [])
+        investigation_plan = self._create_investigation_plan(front_input, tmp_assign_to_log_type)
+        log_types = [
+            log_type for _, log_type in investigation_plan.investigation_steps_with_log_types
+        ]
+        # state of files is taken before search, so files changed during it are searched again
+        files_state = ResultCache.get_files_state(log_types, tmp_assign_to_log_type)
+        causes = self._create_search_manager_for_plan(investigation_plan).investigate(
+            front_input, tmp_assign_to_log_type, budget
+        )
+        if budget is None or not causes.is_partial:
+            self._result_cache.put(
+                self.config, front_input, tmp_assign_to_log_type, log_types, files_state, causes
+            )
+        return causes
 
-    def get_causes(self, front_input, tmp_assign_to_log_type=EMPTY_FROZEN_DICT):
+    def iter_causes(self, front_input, tmp_assign_to_log_type=EMPTY_FROZEN_DICT):
+        """
+        works like get_causes, but yields InvestigationResults of every rule as soon as
+        all log types of its causes are investigated, not after the whole investigation
+        """
+        manager = self._create_search_manager(front_input, tmp_assign_to_log_type)
+        return manager.iter_investigate(front_input, tmp_assign_to_log_type)
+
+    def get_causes_batch(self, front_inputs, tmp_assign_to_log_type=EMPTY_FROZEN_DICT):
+        """
+        works like get_causes called for every front input, but inputs of the same log type
+        share investigation, so every file is searched once in ranges covering overlapping
+        ranges of these inputs
+        :return: list of lists of InvestigationResults, in order of front inputs
+        """
+        grouped_indexes = OrderedDict()
+        for index, front_input in enumerate(front_inputs):
+            log_type = self._get_log_type_of_input(front_input, tmp_assign_to_log_type)
+            log_type_name = None if log_type is None else log_type.name
+            grouped_indexes.setdefault(log_type_name, []).append(index)
+        groups = list(six.itervalues(grouped_indexes))
+        tasks = (
+            (self, [front_inputs[index] for index in indexes], tmp_assign_to_log_type)
+            for indexes in groups
+        )
+        causes = [None] * len(front_inputs)
+        for indexes, group_causes in six.moves.zip(
+            groups, self._branch_executor.map(investigate_lines_of_log_type, tasks)
+        ):
+            for index, input_causes in six.moves.zip(indexes, group_causes):
+                causes[index] = input_causes
+        return causes
+
+    def _get_causes_of_lines_of_log_type(self, front_inputs, tmp_assign_to_log_type):
+        manager = BatchSearchManager(
+            [
+                self._create_investigation_plan(front_input, tmp_assign_to_log_type)
+                for front_input in front_inputs
+            ], self._searcher_factory, self._file_executor, self._step_executor,
+            self._agent_registry
+        )  # yapf: disable
+        return manager.investigate(front_inputs, tmp_assign_to_log_type)
+
+    def _get_log_type_of_input(self, front_input, tmp_assign_to_log_type):
         input_line_source = front_input.line_source
-        input_log_type = self._get_input_log_type(tmp_assign_to_log_type, input_line_source) or \
-                         self.config.get_log_type(input_line_source)
+        return self._get_input_log_type(tmp_assign_to_log_type, input_line_source) or \
+            self.config.get_log_type(input_line_source)
+
+    def _create_investigation_plan(self, front_input, tmp_assign_to_log_type):
+        input_log_type = self._get_log_type_of_input(front_input, tmp_assign_to_log_type)
         if not input_log_type:
-            raise NoLogTypeError(input_line_source)
+            raise NoLogTypeError(front_input.line_source)
+        stats = InvestigationStats.get_active()
+        if stats is None:
+            return self.config.create_investigation_plan(front_input, input_log_type)
+        start_time = time.time()
         investigation_plan = self.config.create_investigation_plan(front_input, input_log_type)
-        manager = SearchManager(investigation_plan)
-        return manager.investigate(front_input, tmp_assign_to_log_type)
+        stats.plan_creation_time += time.time() - start_time
+        return investigation_plan
+
+    def _create_search_manager(self, front_input, tmp_assign_to_log_type):
+        return self._create_search_manager_for_plan(
+            self._create_investigation_plan(front_input, tmp_assign_to_log_type)
+        )
+
+    def _create_search_manager_for_plan(self, investigation_plan):
+        return SearchManager(
+            investigation_plan, self._searcher_factory, self._file_executor, self._step_executor,
+            self._agent_registry
+        )
 
     @classmethod
     def _get_input_log_type(cls, tmp_assign_to_log_type, input_line_source):
@@ -43,13 +195,60 @@ class LogReader(AbstractLogReader):
             if input_line_source in line_sources:
                 return log_type
 
-    def get_causes_tree(self, front_input):
-        pass
+    def get_causes_tree(
+        self,
+        front_input,
+        tmp_assign_to_log_type=EMPTY_FROZEN_DICT,
+        max_depth=TreeConsts.DEFAULT_MAX_DEPTH,
+        max_fan_out=TreeConsts.DEFAULT_MAX_FAN_OUT
+    ):
+        """
+        Investigates causes of line, then causes of these causes and so on, level by level.
+        Lines of single level are investigated by get_causes_batch, so lines from the same file
+        share search of other files. Every line is investigated once, even if it is a cause
+        of many lines.
+        :param max_depth: lines at this depth (root line has depth 0) are not investigated
+        :param max_fan_out: maximal number of distinct cause lines of single line,
+            which are added to tree as its children
+        :return: CausesTree of front_input
+        """
+        root = CausesTree(front_input)
+        nodes = {CausesTree.create_key(front_input): root}
+        level = [root]
+        for _ in six.moves.range(max_depth):
+            if not level:
+                break
+            level_causes = self.get_causes_batch(
+                [node.front_input for node in level], tmp_assign_to_log_type
+            )
+            next_level = []
+            for node, investigation_results in six.moves.zip(level, level_causes):
+                node.investigation_results = investigation_results
+                for cause_line in node.get_cause_lines()[:max_fan_out]:
+                    key = CausesTree.create_key(cause_line)
+                    child = nodes.get(key)
+                    if child is None:
+                        child = nodes[key] = CausesTree(cause_line)
+                        next_level.append(child)
+                    node.children.append(child)
+            level = next_level
+        return root
 
 
 class SearchManager(object):
-    def __init__(self, investigation_plan):
+    def __init__(
+        self,
+        investigation_plan,
+        searcher_factory=BacktrackSearcher,
+        file_executor=DEFAULT_EXECUTOR,
+        step_executor=DEFAULT_EXECUTOR,
+        agent_registry=None
+    ):
         self._investigation_plan = investigation_plan
+        self._searcher_factory = searcher_factory
+        self._file_executor = file_executor
+        self._step_executor = step_executor
+        self._agent_registry = agent_registry
 
     @classmethod
     def _save_clues_in_normal_dict(cls, collector):
@@ -57,50 +256,382 @@ class SearchManager(object):
             (parser_name, list(clues_iter)) for parser_name, clues_iter in six.iteritems(collector)
         )
 
-    def _constraints_verification(self, clues):
+    @classmethod
+    def verify_constraints(cls, investigation_plan, clues):
         """
         provides constraints verification basing on
         rules from investigation_plan and collected clues
         """
         causes = []
-        for rule in self._investigation_plan.suspected_rules:
-            results_from_rule = rule.constraints_check(clues, self._investigation_plan.effect_clues)
+        for rule in investigation_plan.suspected_rules:
+            results_from_rule = rule.constraints_check(clues, investigation_plan.effect_clues)
             causes.extend(results_from_rule)
         return causes
 
-    def investigate(self, original_front_input, tmp_assign_to_log_type=EMPTY_FROZEN_DICT):
+    def _create_step_tasks(self, original_front_input, tmp_assign_to_log_type):
+        return (
+            (
+                SearchHandler(
+                    step, log_type, self._searcher_factory, self._file_executor,
+                    self._agent_registry
+                ),
+                original_front_input, tmp_assign_to_log_type.get(log_type)
+            )
+            for step, log_type in self._investigation_plan.investigation_steps_with_log_types
+        )  # yapf: disable
+
+    def investigate(
+        self, original_front_input, tmp_assign_to_log_type=EMPTY_FROZEN_DICT, budget=None
+    ):
         """
         this function collects clues from SearchHandlers
         (each of them corresponds to one InvestigationStep)
         in dictionary clues_collector
-        and then provide their verification with constraints
+        and then provide their verification with constraints.
+        Steps are independent, so they are run by step executor,
+        but their clues are merged in order of steps.
+        :return: list of InvestigationResults, or PartialResults if budget is given
+        """
+        if budget is not None:
+            return self._investigate_within_budget(
+                original_front_input, tmp_assign_to_log_type, budget
+            )
+        tasks = self._create_step_tasks(original_front_input, tmp_assign_to_log_type)
+        clues_collector = defaultdict(itertools.chain)
+        for clues_from_step in self._step_executor.map(investigate_step, tasks):
+            InvestigationUtils.merge_clue_dicts(clues_collector, clues_from_step)
+        clues = self._save_clues_in_normal_dict(clues_collector)
+        return self.verify_constraints(self._investigation_plan, clues)
+
+    def _investigate_within_budget(self, original_front_input, tmp_assign_to_log_type, budget):
+        tasks = (
+            (search_handler, front_input, forced_log_type, budget)
+            for search_handler, front_input, forced_log_type in self._create_step_tasks(
+                original_front_input, tmp_assign_to_log_type
+            )
+        )  # yapf: disable
+        clues_collector = defaultdict(itertools.chain)
+        cut_short_steps = []
+        for log_type_name, clues_from_step, cut_short in self._step_executor.map(
+            investigate_step_within_budget, tasks
+        ):
+            InvestigationUtils.merge_clue_dicts(clues_collector, clues_from_step)
+            if cut_short:
+                cut_short_steps.append(log_type_name)
+        clues = self._save_clues_in_normal_dict(clues_collector)
+        return PartialResults(
+            self.verify_constraints(self._investigation_plan, clues), cut_short_steps
+        )
+
+    def iter_investigate(self, original_front_input, tmp_assign_to_log_type=EMPTY_FROZEN_DICT):
+        """
+        lazy version of investigate.
+        Every suspected rule waits only for the steps of log types of its causes,
+        so its constraints are verified and its InvestigationResults are yielded
+        as soon as these steps are finished, even if other steps are still running.
+        """
+        investigated_log_types = set(
+            log_type.name
+            for _, log_type in self._investigation_plan.investigation_steps_with_log_types
+        )
+        pending_rules = [
+            (rule, investigated_log_types.intersection(
+                parser.log_type for parser in rule.get_causes_parsers()
+            ))
+            for rule in self._investigation_plan.suspected_rules
+        ]  # yapf: disable
+        finished_log_types = set()
+        clues = {}
+        for cause in self._verify_completed_rules(pending_rules, finished_log_types, clues):
+            yield cause
+        if not pending_rules:
+            return
+        tasks = self._create_step_tasks(original_front_input, tmp_assign_to_log_type)
+        for log_type_name, clues_from_step in self._step_executor.imap_unordered(
+            investigate_step_of_log_type, tasks
+        ):
+            for parser_name, clues_list in six.iteritems(clues_from_step):
+                clues.setdefault(parser_name, []).extend(clues_list)
+            finished_log_types.add(log_type_name)
+            for cause in self._verify_completed_rules(pending_rules, finished_log_types, clues):
+                yield cause
+            if not pending_rules:
+                return
+
+    def _verify_completed_rules(self, pending_rules, finished_log_types, clues):
+        """
+        verifies constraints of rules, which all cause log types are already investigated,
+        and removes these rules from pending_rules
         :return: list of InvestigationResults
         """
+        completed_rules = [
+            rule for rule, cause_log_types in pending_rules
+            if cause_log_types <= finished_log_types
+        ]  # yapf: disable
+        pending_rules[:] = [
+            (rule, cause_log_types) for rule, cause_log_types in pending_rules
+            if not cause_log_types <= finished_log_types
+        ]  # yapf: disable
+        causes = []
+        for rule in completed_rules:
+            causes.extend(rule.constraints_check(clues, self._investigation_plan.effect_clues))
+        return causes
+
+
+class BatchSearchManager(object):
+    """
+    Investigates many front inputs of the same log type at once.
+    Steps of the same log type from all investigation plans, which search ranges overlap,
+    are merged, so every file is searched once for every group of overlapping ranges,
+    and then every found clue is assigned to investigations of all front inputs,
+    which steps would find it.
+    """
+
+    # front input, which is in no file, so in every file the whole search range is searched
+    NO_FILE_FRONT_INPUT = FrontInput(None, None, LineSource(None, None))
+
+    def __init__(
+        self,
+        investigation_plans,
+        searcher_factory=BacktrackSearcher,
+        file_executor=DEFAULT_EXECUTOR,
+        step_executor=DEFAULT_EXECUTOR,
+        agent_registry=None
+    ):
+        self._investigation_plans = investigation_plans
+        self._searcher_factory = searcher_factory
+        self._file_executor = file_executor
+        self._step_executor = step_executor
+        self._agent_registry = agent_registry
+
+    def _merge_steps(self, original_front_inputs):
+        """
+        :return: list of triples (merged investigation step, log type, merged front input)
+        """
+        grouped_steps = OrderedDict()
+        for investigation_plan, front_input in six.moves.zip(
+            self._investigation_plans, original_front_inputs
+        ):
+            for step, log_type in investigation_plan.investigation_steps_with_log_types:
+                grouped_steps.setdefault(log_type, []).append((step, front_input))
+        return [
+            (merged_step, log_type, self._create_merged_front_input(front_inputs))
+            for log_type, steps in six.iteritems(grouped_steps)
+            for merged_step, front_inputs in self._merge_overlapping_steps(steps)
+        ]  # yapf: disable
+
+    @classmethod
+    def _merge_overlapping_steps(cls, steps_with_front_inputs):
+        """
+        merges steps with overlapping search ranges, so merged step does not cover gaps
+        between disjoint ranges
+        :return: list of pairs (merged step, front inputs of its steps),
+            search ranges of merged steps are disjoint
+        """
+        groups = []
+        for step, front_input in steps_with_front_inputs:
+            steps, front_inputs = [step], [front_input]
+            disjoint_groups = []
+            for merged_step, group_steps, group_front_inputs in groups:
+                if merged_step.overlaps(step):
+                    steps.extend(group_steps)
+                    front_inputs.extend(group_front_inputs)
+                else:
+                    disjoint_groups.append((merged_step, group_steps, group_front_inputs))
+            groups = disjoint_groups + [(InvestigationStep.merge(steps), steps, front_inputs)]
+        return [(merged_step, front_inputs) for merged_step, _, front_inputs in groups]
+
+    @classmethod
+    def _create_merged_front_input(cls, original_front_inputs):
+        """
+        if front inputs are from the same file, lines after the last of them are not searched
+        """
+        line_sources = set(front_input.line_source for front_input in original_front_inputs)
+        if len(line_sources) > 1:
+            return cls.NO_FILE_FRONT_INPUT
+        return max(original_front_inputs, key=lambda front_input: front_input.offset)
+
+    def _select_clues(
+        self, investigation_plan, original_front_input, clues, tmp_assign_to_log_type
+    ):
+        """
+        returns clues, which would be found by steps of single investigation plan
+        """
+        selected_clues = {}
+        for step, log_type in investigation_plan.investigation_steps_with_log_types:
+            forced_log_type = tmp_assign_to_log_type.get(log_type)
+            for parser_name in step.parser_names:
+                parser_clues = [
+                    clue for clue in clues.get(parser_name, [])
+                    if step.is_clue_in_range(
+                        parser_name, clue, original_front_input,
+                        log_type.get_super_parser(clue.line_source, forced_log_type)
+                    )
+                ]  # yapf: disable
+                if parser_clues:
+                    selected_clues[parser_name] = parser_clues
+        return selected_clues
+
+    def investigate(self, original_front_inputs, tmp_assign_to_log_type=EMPTY_FROZEN_DICT):
+        """
+        :return: list of lists of InvestigationResults, in order of front inputs
+        """
+        tasks = (
+            (
+                SearchHandler(
+                    step, log_type, self._searcher_factory, self._file_executor,
+                    self._agent_registry
+                ), merged_front_input, tmp_assign_to_log_type.get(log_type)
+            ) for step, log_type, merged_front_input in self._merge_steps(original_front_inputs)
+        )  # yapf: disable
         clues_collector = defaultdict(itertools.chain)
-        for step, log_type in self._investigation_plan.investigation_steps_with_log_types:
-            search_handler = SearchHandler(step, log_type)
-            InvestigationUtils.merge_clue_dicts(
-                clues_collector, search_handler.investigate(
-                    original_front_input, tmp_assign_to_log_type.get(log_type)
+        for clues_from_step in self._step_executor.map(investigate_step, tasks):
+            InvestigationUtils.merge_clue_dicts(clues_collector, clues_from_step)
+        clues = SearchManager._save_clues_in_normal_dict(clues_collector)
+        return [
+            SearchManager.verify_constraints(
+                investigation_plan, self._select_clues(
+                    investigation_plan, original_front_input, clues, tmp_assign_to_log_type
                 )
+            ) for investigation_plan, original_front_input in six.moves.zip(
+                self._investigation_plans, original_front_inputs
             )
-        clues = self._save_clues_in_normal_dict(clues_collector)
-        return self._constraints_verification(clues)
+        ]  # yapf: disable
 
 
 class SearchHandler(object):
-    def __init__(self, investigation_step, log_type):
+    def __init__(
+        self,
+        investigation_step,
+        log_type,
+        searcher_factory=BacktrackSearcher,
+        executor=DEFAULT_EXECUTOR,
+        agent_registry=None
+    ):
         self._investigation_step = investigation_step
         self._log_type = log_type
+        self._searcher_factory = searcher_factory
+        self._executor = executor
+        self._agent_registry = agent_registry
 
-    def investigate(self, original_front_input, forced_log_type=None):
-        clues = defaultdict(itertools.chain)
-        for host, path, super_parser in self._log_type.files_to_parse(forced_log_type):
+    @property
+    def log_type(self):
+        return self._log_type
+
+    def _create_searchers(self, forced_log_type):
+        searchers = []
+        for host, path, super_parser in self._log_type.files_to_parse(
+            forced_log_type, self._agent_registry
+        ):
             if host == "localhost":
-                searcher = BacktrackSearcher(path, self._investigation_step, super_parser)
-                InvestigationUtils.merge_clue_dicts(clues, searcher.search(original_front_input))
+                searchers.append(
+                    self._searcher_factory(path, self._investigation_step, super_parser)
+                )
+            elif self._agent_registry is not None and self._agent_registry.has_agent(host):
+                # files on other hosts are searched by their agents, next to the data
+                searchers.append(
+                    RemoteSearcher(
+                        host, path, self._investigation_step, super_parser,
+                        self._agent_registry.get_client(host)
+                    )
+                )
             else:
                 raise NotImplementedError(
-                    "Cannot operate on %s which is different than %s" % (host, "localhost")
+                    "Cannot operate on %s which is different than %s and has no agent" %
+                    (host, "localhost")
                 )
+        stats = InvestigationStats.get_active()
+        if stats is not None:
+            stats.files_considered += len(searchers)
+        return searchers
+
+    def investigate(self, original_front_input, forced_log_type=None):
+        """
+        searches in all files of log type using executor
+        and merges found clues in order of searched files
+        """
+        tasks = (
+            (searcher, original_front_input)
+            for searcher in self._create_searchers(forced_log_type)
+        )
+        clues = defaultdict(itertools.chain)
+        for clues_from_file in self._executor.map(search_in_file, tasks):
+            InvestigationUtils.merge_clue_dicts(clues, clues_from_file)
         return clues
+
+    def investigate_within_budget(self, original_front_input, forced_log_type, budget):
+        """
+        works like investigate, but searchers stop when budget is exhausted
+        :return: found clues and information whether some search was cut short
+        """
+        tasks = (
+            (searcher, original_front_input, budget)
+            for searcher in self._create_searchers(forced_log_type)
+        )
+        clues = defaultdict(itertools.chain)
+        cut_short = False
+        for clues_from_file, file_cut_short in self._executor.map(
+            search_in_file_within_budget, tasks
+        ):
+            InvestigationUtils.merge_clue_dicts(clues, clues_from_file)
+            cut_short = cut_short or file_cut_short
+        return clues, cut_short
+
+
+def investigate_step(task):
+    """
+    module level function, so it can be passed to executor using processes pool
+    """
+    search_handler, original_front_input, forced_log_type = task
+    return SearchManager._save_clues_in_normal_dict(
+        search_handler.investigate(original_front_input, forced_log_type)
+    )
+
+
+def investigate_step_of_log_type(task):
+    """
+    works like investigate_step, but returns also the name of investigated log type,
+    because steps run by imap_unordered may finish in any order
+    """
+    search_handler = task[0]
+    return search_handler.log_type.name, investigate_step(task)
+
+
+def investigate_step_within_budget(task):
+    """
+    works like investigate_step_of_log_type, but returns also information
+    whether the step was cut short, because budget was exhausted
+    """
+    search_handler, original_front_input, forced_log_type, budget = task
+    clues, cut_short = search_handler.investigate_within_budget(
+        original_front_input, forced_log_type, budget
+    )
+    return (
+        search_handler.log_type.name, SearchManager._save_clues_in_normal_dict(clues), cut_short
+    )
+
+
+def investigate_lines_of_log_type(task):
+    """
+    module level function, so it can be passed to executor using processes pool
+    """
+    log_reader, front_inputs, tmp_assign_to_log_type = task
+    return log_reader._get_causes_of_lines_of_log_type(front_inputs, tmp_assign_to_log_type)
+
+
+def search_in_file(task):
+    """
+    module level function, so it can be passed to executor using processes pool
+    """
+    searcher, original_front_input = task
+    return searcher.search(original_front_input)
+
+
+def search_in_file_within_budget(task):
+    """
+    module level function, so it can be passed to executor using processes pool.
+    Search is cut short when budget is exhausted during it or before it.
+    """
+    searcher, original_front_input, budget = task
+    clues = searcher.search(original_front_input, budget)
+    return clues, budget.is_exhausted()
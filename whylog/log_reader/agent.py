@@ -0,0 +1,334 @@
+import fnmatch
+import glob
+import hmac
+import json
+import os
+import socket
+import threading
+from collections import defaultdict
+from datetime import datetime
+
+import dateutil.parser
+import six
+from six.moves import socketserver
+
+from whylog.config.investigation_plan import Clue, InvestigationStepFactory, LineSource
+from whylog.config.super_parser import RegexSuperParserFactory
+from whylog.front.utils import FrontInput
+from whylog.log_reader.budget import InvestigationBudget
+from whylog.log_reader.exceptions import AgentError
+from whylog.log_reader.searchers import AbstractSearcher, BacktrackSearcher
+
+
+class AgentProtocol(object):
+    """
+    Agent and its clients exchange single JSON objects, each one in single line.
+    Client sends request {'token': ..., 'method': ..., 'params': {...}} and agent replies
+    {'result': ...} or {'error': message}.
+    Datetimes (e.g. search range bounds and date groups of clues) are sent
+    as {'__datetime__': iso format}.
+    """
+    DATETIME_KEY = '__datetime__'
+    ENCODING = 'utf-8'
+
+    @classmethod
+    def _encode_datetime(cls, value):
+        return {cls.DATETIME_KEY: value.isoformat()}
+
+    @classmethod
+    def _encode_value(cls, value):
+        # encoders of values which are not JSON values
+        encoders = {datetime: cls._encode_datetime}
+        encoder = encoders.get(type(value))
+        if encoder is None:
+            raise TypeError("%r is not JSON serializable" % (value, ))
+        return encoder(value)
+
+    @classmethod
+    def _decode_object(cls, json_object):
+        if list(json_object) == [cls.DATETIME_KEY]:
+            return dateutil.parser.parse(json_object[cls.DATETIME_KEY])
+        return json_object
+
+    @classmethod
+    def restore_group_numbers(cls, serialized_parser):
+        """
+        JSON object keys are strings, so numbers of groups in parser convertions
+        have to be restored after decoding
+        """
+        serialized_parser['convertions'] = dict(
+            (int(group), convertion)
+            for group, convertion in six.iteritems(serialized_parser['convertions'])
+        )
+        return serialized_parser
+
+    @classmethod
+    def encode(cls, message):
+        return (json.dumps(message, default=cls._encode_value) + '\n').encode(cls.ENCODING)
+
+    @classmethod
+    def decode(cls, raw_message):
+        return json.loads(raw_message.decode(cls.ENCODING), object_hook=cls._decode_object)
+
+
+class SearchAgent(object):
+    """
+    Runs on host with log files and searches them on behalf of LogReaders from other hosts,
+    so only found clues are sent through the network.
+    Agent serves only files matched by one of allowed_path_patterns, no files by default.
+    Real paths of files, without symbolic links and '..', are matched with patterns
+    component by component, so wildcards never match '/'.
+    Agent runs regexes sent by clients, so it serves only requests with token shared
+    with its clients. Token is sent as plain text, so agent should listen only
+    in trusted network or behind encrypted tunnel.
+    """
+
+    def __init__(
+        self,
+        token,
+        address=('localhost', 0),
+        allowed_path_patterns=(),
+        searcher_factory=BacktrackSearcher
+    ):
+        """
+        :param token: secret shared with clients of agent
+        :param address: (host, port) on which agent listens, port 0 means any free port
+        """
+        if not token:
+            raise AgentError("Agent requires token shared with its clients")
+        self._token = six.text_type(token).encode(AgentProtocol.ENCODING)
+        self._allowed_path_patterns = [
+            self._split_path(os.path.realpath(pattern)) for pattern in allowed_path_patterns
+        ]
+        self._searcher_factory = searcher_factory
+        self._server = AgentServer(address, self)
+        self._thread = None
+
+    @property
+    def address(self):
+        return self._server.server_address
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def start(self):
+        """
+        serves requests in background thread
+        """
+        self._thread = threading.Thread(target=self.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def shutdown(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def handle_request(self, request):
+        # tokens are compared in constant time, so token cannot be guessed by timing
+        token = request.get('token')
+        if type(token) is not six.text_type or not hmac.compare_digest(
+            token.encode(AgentProtocol.ENCODING), self._token
+        ):
+            raise AgentError("Invalid token")
+        handlers = {'list_files': self.list_files, 'search': self.search}
+        handler = handlers.get(request.get('method'))
+        if handler is None:
+            raise AgentError("Unknown method %s" % (request.get('method'), ))
+        return handler(**request['params'])
+
+    @classmethod
+    def _split_path(cls, path):
+        return path.split(os.sep)
+
+    @classmethod
+    def _matches_pattern(cls, path_components, pattern_components):
+        return len(path_components) == len(pattern_components) and all(
+            fnmatch.fnmatch(component, pattern_component)
+            for component, pattern_component in six.moves.zip(path_components, pattern_components)
+        )
+
+    def _is_allowed(self, real_path):
+        path_components = self._split_path(real_path)
+        return any(
+            self._matches_pattern(path_components, pattern_components)
+            for pattern_components in self._allowed_path_patterns
+        )
+
+    def list_files(self, path_pattern):
+        return sorted(
+            path for path in glob.iglob(path_pattern) if self._is_allowed(os.path.realpath(path))
+        )
+
+    def search(self, path, investigation_step, super_parser, front_input, budget=None):
+        """
+        :param budget: remaining limits of budget of investigation, or None
+        :return: dict with found clues, given as dict of parser name to list of
+            (groups, line, offset), and with usage of budget
+        """
+        # real path is searched, so symbolic link cannot be changed after it is checked
+        real_path = os.path.realpath(path)
+        if not self._is_allowed(real_path):
+            raise AgentError("Path %s is not served by agent" % (path, ))
+        for serialized_parser in investigation_step['parsers']:
+            AgentProtocol.restore_group_numbers(serialized_parser)
+        searcher = self._searcher_factory(
+            real_path, InvestigationStepFactory.from_dao(investigation_step),
+            RegexSuperParserFactory.from_dao(AgentProtocol.restore_group_numbers(super_parser))
+        )
+        front_input_path = front_input['path']
+        if front_input_path is not None:
+            front_input_path = os.path.realpath(front_input_path)
+        original_front_input = FrontInput(
+            front_input['offset'], front_input['line_content'],
+            LineSource('localhost', front_input_path)
+        )
+        search_budget = None if budget is None else InvestigationBudget(**budget)
+        clues = searcher.search(original_front_input, search_budget)
+        return {
+            'clues': dict(
+                (parser_name, [
+                    [clue.regex_parameters, clue.line_prefix_content, clue.line_offset]
+                    for clue in parser_clues
+                ]) for parser_name, parser_clues in six.iteritems(clues)
+            ),
+            'bytes_read': 0 if search_budget is None else search_budget.bytes_read,
+            'lines_examined': 0 if search_budget is None else search_budget.lines_examined,
+            'exhausted': search_budget is not None and search_budget.is_exhausted(),
+        }  # yapf: disable
+
+
+class AgentRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            request = AgentProtocol.decode(self.rfile.readline())
+            response = {'result': self.server.agent.handle_request(request)}
+        except Exception as exception:
+            # error is sent to client, so agent keeps serving other requests
+            response = {'error': "%s: %s" % (type(exception).__name__, exception)}
+        self.wfile.write(AgentProtocol.encode(response))
+
+
+class AgentServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, agent):
+        socketserver.TCPServer.__init__(self, address, AgentRequestHandler)
+        self.agent = agent
+
+
+class AgentClient(object):
+    """
+    Sends requests to SearchAgent, every request in new connection,
+    so client can be used by many threads and sent to other processes.
+    """
+
+    def __init__(self, address, token, timeout=None):
+        self._address = tuple(address)
+        self._token = token
+        self._timeout = timeout
+
+    def _call(self, method, **params):
+        connection = socket.create_connection(self._address, self._timeout)
+        try:
+            connection.sendall(
+                AgentProtocol.encode({'token': self._token, 'method': method, 'params': params})
+            )
+            connection_file = connection.makefile('rb')
+            try:
+                raw_response = connection_file.readline()
+            finally:
+                connection_file.close()
+        finally:
+            connection.close()
+        if not raw_response:
+            raise AgentError("Agent %s:%s closed connection" % self._address)
+        response = AgentProtocol.decode(raw_response)
+        if 'error' in response:
+            raise AgentError(response['error'])
+        return response['result']
+
+    def list_files(self, path_pattern):
+        return self._call('list_files', path_pattern=path_pattern)
+
+    def search(self, path, investigation_step, super_parser, front_input, budget=None):
+        return self._call(
+            'search',
+            path=path,
+            investigation_step=investigation_step.serialize(),
+            super_parser=super_parser.serialize(),
+            front_input=front_input,
+            budget=None if budget is None else budget.serialize_remaining()
+        )
+
+
+class AgentRegistry(object):
+    """
+    Addresses of agents running on hosts with log files.
+    """
+
+    def __init__(self, agents_addresses, token, timeout=None):
+        """
+        :param agents_addresses: dict of host name to (address, port) of agent on this host
+        :param token: secret shared with agents
+        """
+        self._agents_addresses = agents_addresses
+        self._token = token
+        self._timeout = timeout
+
+    def has_agent(self, host):
+        return host in self._agents_addresses
+
+    def match_hosts(self, host_pattern):
+        return sorted(fnmatch.filter(self._agents_addresses, host_pattern))
+
+    def get_client(self, host):
+        return AgentClient(self._agents_addresses[host], self._token, self._timeout)
+
+
+class RemoteSearcher(AbstractSearcher):
+    """
+    Searches file on other host by agent running there.
+    """
+
+    def __init__(self, host, file_path, investigation_step, super_parser, agent_client):
+        self._host = host
+        self._file_path = file_path
+        self._investigation_step = investigation_step
+        self._super_parser = super_parser
+        self._agent_client = agent_client
+
+    def _serialize_front_input(self, original_front_input):
+        line_source = original_front_input.line_source
+        path = None
+        if line_source.host == self._host:
+            path = line_source.path
+        return {
+            'offset': original_front_input.offset,
+            'line_content': original_front_input.line_content,
+            'path': path,
+        }
+
+    def search(self, original_front_input, budget=None):
+        clues = defaultdict(list)
+        if budget is not None and budget.is_exhausted():
+            return clues
+        search_result = self._agent_client.search(
+            self._file_path, self._investigation_step, self._super_parser,
+            self._serialize_front_input(original_front_input), budget
+        )
+        if budget is not None:
+            # budget is charged with lines examined by agent
+            budget.consume(search_result['bytes_read'], search_result['lines_examined'])
+            if search_result['exhausted']:
+                budget.exhaust()
+        line_source = LineSource(self._host, self._file_path)
+        for parser_name, serialized_clues in six.iteritems(search_result['clues']):
+            clues[parser_name] = [
+                Clue(tuple(groups), line, offset, line_source)
+                for groups, line, offset in serialized_clues
+            ]
+        return clues
@@ -0,0 +1,167 @@
+import os
+import threading
+from collections import OrderedDict
+
+from whylog.log_reader.compressed_files import open_log_file, stat_opened_log_file
+from whylog.log_reader.const import CacheConsts
+
+
+class BlockCache(object):
+    """
+    Size-bounded cache of fixed size blocks of log files content with LRU eviction.
+    Blocks are keyed by (path, inode, block number). The size and mtime of file are
+    remembered with its blocks, so all of them are dropped when file changes.
+    """
+
+    def __init__(
+        self,
+        max_size=CacheConsts.DEFAULT_MAX_CACHE_SIZE,
+        block_size=CacheConsts.DEFAULT_BLOCK_SIZE
+    ):
+        self.block_size = block_size
+        self._max_size = max_size
+        self._size = 0
+        self._blocks = OrderedDict()
+        self._file_versions = {}
+        self._lock = threading.Lock()
+
+    def __reduce__(self):
+        # cached blocks are not sent to other processes, but every process has its own
+        # default cache, so it is still shared by all searches made there
+        if self is DEFAULT_BLOCK_CACHE:
+            return get_default_block_cache, ()
+        return BlockCache, (self._max_size, self.block_size)
+
+    def __len__(self):
+        return len(self._blocks)
+
+    def validate_file_version(self, file_path, inode, size, mtime):
+        """
+        drops all cached blocks of file if its size or mtime differs from cached ones
+        """
+        file_key = (file_path, inode)
+        with self._lock:
+            version = self._file_versions.get(file_key)
+            if version == (size, mtime):
+                return
+            if version is not None:
+                for block_key in [key for key in self._blocks if key[:2] == file_key]:
+                    self._size -= len(self._blocks.pop(block_key))
+            self._file_versions[file_key] = (size, mtime)
+
+    def get_block(self, file_path, inode, block_number, load_block):
+        block_key = (file_path, inode, block_number)
+        with self._lock:
+            block = self._blocks.pop(block_key, None)
+            if block is not None:
+                # the most recently used block is moved to the end
+                self._blocks[block_key] = block
+                return block
+        block = load_block(block_number * self.block_size, self.block_size)
+        with self._lock:
+            if block_key not in self._blocks:
+                self._blocks[block_key] = block
+                self._size += len(block)
+            while self._size > self._max_size:
+                _, evicted_block = self._blocks.popitem(last=False)
+                self._size -= len(evicted_block)
+        return block
+
+
+def get_default_block_cache():
+    return DEFAULT_BLOCK_CACHE
+
+
+DEFAULT_BLOCK_CACHE = BlockCache()
+
+
+class CachedFile(object):
+    """
+    Read-only binary file-like object, which reads content of log file through BlockCache.
+    Compressed files are cached after decompression.
+    """
+
+    def __init__(self, file_path, block_cache=None):
+        self._file_path = file_path
+        self._block_cache = DEFAULT_BLOCK_CACHE if block_cache is None else block_cache
+        self._file = open_log_file(file_path)
+        try:
+            file_stat = stat_opened_log_file(self._file)
+            self._file.seek(0, os.SEEK_END)
+            self._size = self._file.tell()
+        except Exception:
+            self._file.close()
+            raise
+        self._inode = file_stat.st_ino
+        self._block_cache.validate_file_version(
+            file_path, self._inode, file_stat.st_size, file_stat.st_mtime
+        )
+        self._position = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self._file.close()
+
+    def fileno(self):
+        return self._file.fileno()
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_CUR:
+            offset += self._position
+        elif whence == os.SEEK_END:
+            offset += self._size
+        self._position = max(offset, 0)
+        return self._position
+
+    def _load_block(self, offset, size):
+        self._file.seek(offset)
+        return self._file.read(size)
+
+    def _get_block_containing(self, offset):
+        """
+        returns the block which contains offset and the offset of its beginning
+        """
+        block_number = offset // self._block_cache.block_size
+        block = self._block_cache.get_block(
+            self._file_path, self._inode, block_number, self._load_block
+        )
+        return block, block_number * self._block_cache.block_size
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self._size - self._position
+        parts = []
+        while size > 0 and self._position < self._size:
+            block, block_offset = self._get_block_containing(self._position)
+            begin = self._position - block_offset
+            part = block[begin:begin + size]
+            if not part:
+                break
+            parts.append(part)
+            self._position += len(part)
+            size -= len(part)
+        return b''.join(parts)
+
+    def readline(self):
+        parts = []
+        while self._position < self._size:
+            block, block_offset = self._get_block_containing(self._position)
+            begin = self._position - block_offset
+            line_end = block.find(b'\n', begin)
+            if line_end != -1:
+                parts.append(block[begin:line_end + 1])
+                self._position = block_offset + line_end + 1
+                break
+            if begin >= len(block):
+                break
+            parts.append(block[begin:])
+            self._position = block_offset + len(block)
+        return b''.join(parts)
@@ -0,0 +1,81 @@
+import time
+
+
+class InvestigationBudget(object):
+    """
+    Limits of single investigation: time after which it is stopped, number of bytes read
+    and number of lines examined by searchers. None means no limit.
+    Searchers stop when budget is exhausted, so the investigation returns partial results.
+    New budget should be created for every investigation.
+    Counters are not synchronized between threads and are copied to other processes,
+    so limits of bytes and lines are approximate when files are searched concurrently.
+    """
+
+    def __init__(self, timeout=None, max_bytes=None, max_lines=None):
+        """
+        :param timeout: seconds from creation of budget to the deadline of investigation
+        """
+        self.deadline = None if timeout is None else time.time() + timeout
+        self.max_bytes = max_bytes
+        self.max_lines = max_lines
+        self.bytes_read = 0
+        self.lines_examined = 0
+        self._exhausted = False
+
+    def is_exhausted(self):
+        return self._exhausted
+
+    def exhaust(self):
+        self._exhausted = True
+
+    def consume(self, bytes_count, lines_count=1):
+        """
+        charges budget with examined lines
+        :return: False if budget is exhausted, so these lines should not be examined
+        """
+        self.bytes_read += bytes_count
+        self.lines_examined += lines_count
+        if self._exhausted:
+            return False
+        if any((
+            self.max_bytes is not None and self.bytes_read > self.max_bytes,
+            self.max_lines is not None and self.lines_examined > self.max_lines,
+            self.deadline is not None and time.time() > self.deadline
+        )):  # yapf: disable
+            self._exhausted = True
+        return not self._exhausted
+
+    def serialize_remaining(self):
+        """
+        returns limits, which are left in budget, e.g. to create budget for search on other host
+        """
+        return {
+            'timeout': None if self.deadline is None else max(self.deadline - time.time(), 0),
+            'max_bytes': None if self.max_bytes is None else max(
+                self.max_bytes - self.bytes_read, 0
+            ),
+            'max_lines': None if self.max_lines is None else max(
+                self.max_lines - self.lines_examined, 0
+            ),
+        }  # yapf: disable
+
+
+class PartialResults(list):
+    """
+    List of InvestigationResults of investigation with budget.
+    cut_short_steps contains names of log types, which steps were stopped
+    because budget was exhausted. Results of their rules may be incomplete.
+    """
+
+    def __init__(self, investigation_results, cut_short_steps):
+        super(PartialResults, self).__init__(investigation_results)
+        self.cut_short_steps = cut_short_steps
+
+    @property
+    def is_partial(self):
+        return bool(self.cut_short_steps)
+
+    def __repr__(self):
+        return "(PartialResults: %s, cut short steps: %s)" % (
+            list.__repr__(self), self.cut_short_steps
+        )
@@ -0,0 +1,40 @@
+class CausesTree(object):
+    """
+    Node of tree of causes of single line.
+    investigation_results are results of investigation of this line, or None if it was not
+    investigated, because depth limit was reached.
+    children are nodes of distinct lines of these results, limited by fan-out limit.
+    Line found by many investigations has one node, so the tree may share subtrees.
+    """
+
+    def __init__(self, front_input):
+        self.front_input = front_input
+        self.investigation_results = None
+        self.children = []
+
+    @classmethod
+    def create_key(cls, front_input):
+        line_source = front_input.line_source
+        return line_source.host, line_source.path, front_input.offset
+
+    @property
+    def is_investigated(self):
+        return self.investigation_results is not None
+
+    def get_cause_lines(self):
+        """
+        returns distinct lines of investigation results, in order of results
+        """
+        cause_lines = []
+        seen_keys = set()
+        for investigation_result in self.investigation_results or []:
+            for line in investigation_result.lines:
+                key = self.create_key(line)
+                if key not in seen_keys:
+                    seen_keys.add(key)
+                    cause_lines.append(line)
+        return cause_lines
+
+    def __repr__(self):
+        # children are not printed, because shared subtrees may form cycles
+        return "(CausesTree: %s, %s children)" % (self.front_input, len(self.children))
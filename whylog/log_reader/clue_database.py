@@ -0,0 +1,219 @@
+import itertools
+import json
+import os
+import sqlite3
+from contextlib import closing
+
+import six
+
+from whylog.config.investigation_plan import InvestigationStep
+from whylog.config.parser_subset import ConcatenatedRegexParser
+from whylog.config.utils import LogEncoding
+from whylog.converters import DELTA_CONVERTION_MAPPING, STRING
+from whylog.log_reader.compressed_files import open_log_file
+
+
+class ClueDatabase(object):
+    """
+    SQLite database with clues found in log files by all parsers of their log types.
+    Every log file is parsed once during ingestion, and then the clues for investigation step
+    are found by indexed range queries on parser name and primary key of line.
+    Primary keys are stored as numbers, so lines of files with string primary keys
+    are found only by the offset.
+    Database is accessed by new connection in every call, so it can be shared by threads
+    and sent to other processes.
+    """
+
+    SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS files (
+            file_id INTEGER PRIMARY KEY,
+            path TEXT UNIQUE NOT NULL,
+            signature TEXT NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS ingested_parsers (
+            file_id INTEGER NOT NULL,
+            parser_name TEXT NOT NULL,
+            PRIMARY KEY (file_id, parser_name)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS clues (
+            file_id INTEGER NOT NULL,
+            parser_name TEXT NOT NULL,
+            primary_key REAL,
+            line_offset INTEGER NOT NULL,
+            raw_groups TEXT NOT NULL,
+            line TEXT NOT NULL
+        )
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS clues_by_primary_key
+        ON clues (file_id, parser_name, primary_key)
+        """,
+    )  # yapf: disable
+
+    INSERT_CHUNK_SIZE = 10000
+
+    def __init__(self, database_path):
+        self._database_path = database_path
+        with closing(self._connect()) as connection:
+            with connection:
+                for statement in self.SCHEMA:
+                    connection.execute(statement)
+
+    def _connect(self):
+        return sqlite3.connect(self._database_path)
+
+    @classmethod
+    def _create_file_signature(cls, file_path):
+        file_stat = os.stat(file_path)
+        return json.dumps([file_stat.st_ino, file_stat.st_size, file_stat.st_mtime])
+
+    @classmethod
+    def get_primary_key_type(cls, super_parser):
+        if not super_parser.group_order:
+            return None
+        return super_parser.convertions.get(super_parser.group_order[0], STRING)
+
+    @classmethod
+    def to_primary_key_number(cls, key_type, key_value):
+        converter = DELTA_CONVERTION_MAPPING.get(key_type)
+        if converter is None or key_value is None:
+            return None
+        return converter.to_number(key_value)
+
+    def ingest(self, config):
+        """
+        ingests all local files of all log types from config
+        """
+        for log_type in config.get_all_log_types():
+            parsers = config.get_parsers_of_log_type(log_type.name)
+            if not parsers:
+                continue
+            parser_subset = ConcatenatedRegexParser(parsers)
+            for host, path, super_parser in log_type.files_to_parse():
+                if host == 'localhost':
+                    self.ingest_file(path, parser_subset, super_parser)
+
+    def ingest_file(self, file_path, parser_subset, super_parser):
+        """
+        stores clues found in file by parser subset,
+        replacing the clues of previous version of this file
+        """
+        signature = self._create_file_signature(file_path)
+        parser_names = parser_subset.parser_names
+        if self._get_file_id(file_path, signature, parser_names) is not None:
+            return
+        with closing(self._connect()) as connection:
+            with connection:
+                self._delete_file(connection, file_path)
+                file_id = connection.execute(
+                    'INSERT INTO files (path, signature) VALUES (?, ?)', (file_path, signature)
+                ).lastrowid
+                connection.executemany(
+                    'INSERT INTO ingested_parsers (file_id, parser_name) VALUES (?, ?)',
+                    ((file_id, parser_name) for parser_name in parser_names)
+                )
+                # rows are inserted while file is parsed, so clues of the whole file
+                # are never kept in memory
+                rows = self._parse_file(file_path, parser_subset, super_parser)
+                while True:
+                    chunk = [
+                        (file_id, ) + row for row in itertools.islice(rows, self.INSERT_CHUNK_SIZE)
+                    ]
+                    if not chunk:
+                        break
+                    connection.executemany(
+                        'INSERT INTO clues (file_id, parser_name, primary_key, line_offset, '
+                        'raw_groups, line) VALUES (?, ?, ?, ?, ?, ?)', chunk
+                    )
+
+    @classmethod
+    def _delete_file(cls, connection, file_path):
+        for (file_id, ) in connection.execute(
+            'SELECT file_id FROM files WHERE path = ?', (file_path, )
+        ).fetchall():
+            connection.execute('DELETE FROM clues WHERE file_id = ?', (file_id, ))
+            connection.execute('DELETE FROM ingested_parsers WHERE file_id = ?', (file_id, ))
+            connection.execute('DELETE FROM files WHERE file_id = ?', (file_id, ))
+
+    def _parse_file(self, file_path, parser_subset, super_parser):
+        """
+        a generator that returns rows of clues table, without file id, for lines of file
+        """
+        key_type = self.get_primary_key_type(super_parser)
+        offset = 0
+        with open_log_file(file_path) as fd:
+            for raw_line in iter(fd.readline, b''):
+                line_offset, offset = offset, offset + len(raw_line)
+                raw_line = raw_line.rstrip(b'\n')
+                params = parser_subset.get_extracted_parsers_params_from_bytes(raw_line)
+                if not params:
+                    continue
+                primary_key = None
+                groups = super_parser.get_ordered_groups_from_bytes(raw_line)
+                if groups:
+                    primary_key = self.to_primary_key_number(key_type, groups[0][1])
+                line = LogEncoding.decode(raw_line)
+                for parser_name, parser_groups in six.iteritems(params):
+                    raw_groups = json.dumps(parser_groups)
+                    yield parser_name, primary_key, line_offset, raw_groups, line
+
+    def _get_file_id(self, file_path, signature, parser_names):
+        """
+        returns id of file if its actual version was ingested by all given parsers
+        """
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                'SELECT file_id FROM files WHERE path = ? AND signature = ?',
+                (file_path, signature)
+            ).fetchone()
+            if row is None:
+                return None
+            file_id = row[0]
+            ingested_parsers = set(
+                parser_name for (parser_name, ) in connection.execute(
+                    'SELECT parser_name FROM ingested_parsers WHERE file_id = ?', (file_id, )
+                )
+            )
+        if not ingested_parsers.issuperset(parser_names):
+            return None
+        return file_id
+
+    def get_ingested_file_id(self, file_path, parser_names):
+        return self._get_file_id(file_path, self._create_file_signature(file_path), parser_names)
+
+    def find_clues_rows(self, file_id, parser_name, key_range, offset_limit):
+        """
+        returns tuples (line offset, raw groups, line) of lines matched by parser,
+        which primary keys are in key_range and offsets are lower than offset_limit,
+        in reverse order of offsets.
+        None as a bound of key_range or offset_limit means no limit.
+        """
+        query = 'SELECT line_offset, raw_groups, line FROM clues ' \
+                'WHERE file_id = ? AND parser_name = ?'
+        params = [file_id, parser_name]
+        for bound, operator in six.moves.zip(key_range, ('>=', '<=')):
+            if bound is not None:
+                query += ' AND primary_key %s ?' % (operator, )
+                params.append(bound)
+        if offset_limit is not None:
+            query += ' AND line_offset < ?'
+            params.append(offset_limit)
+        query += ' ORDER BY line_offset DESC'
+        with closing(self._connect()) as connection:
+            return [
+                (line_offset, tuple(json.loads(raw_groups)), line)
+                for line_offset, raw_groups, line in connection.execute(query, params)
+            ]
+
+    def get_key_range(self, investigation_step, super_parser):
+        key_type = self.get_primary_key_type(super_parser)
+        return tuple(
+            self.to_primary_key_number(
+                key_type, investigation_step.get_bound_value(bound, key_type)
+            ) for bound in (InvestigationStep.LEFT_BOUND, InvestigationStep.RIGHT_BOUND)
+        )
@@ -0,0 +1,377 @@
+import bisect
+import bz2
+import io
+import os
+import threading
+import zlib
+from collections import namedtuple
+
+from whylog.log_reader.const import CompressionConsts, IndexConsts
+from whylog.log_reader.index_files import IndexFiles
+
+try:
+    import lzma
+except ImportError:
+    lzma = None
+
+Checkpoint = namedtuple('Checkpoint', ['uncompressed_offset', 'compressed_offset', 'decompressor'])
+
+
+def _create_gzip_decompressor():
+    return zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+
+DECOMPRESSOR_FACTORIES = {'.gz': _create_gzip_decompressor, '.bz2': bz2.BZ2Decompressor}
+if lzma is not None:
+    DECOMPRESSOR_FACTORIES['.xz'] = lzma.LZMADecompressor
+
+
+def _get_decompressor_factory(file_path):
+    return DECOMPRESSOR_FACTORIES.get(os.path.splitext(file_path)[1])
+
+
+def is_compressed(file_path):
+    return _get_decompressor_factory(file_path) is not None
+
+
+def open_log_file(file_path):
+    """
+    opens log file in binary mode. Compressed files are opened as SeekableDecompressedFile,
+    so all offsets are positions of bytes in decompressed content
+    """
+    if is_compressed(file_path):
+        return SeekableDecompressedFile(file_path)
+    return open(file_path, 'rb')
+
+
+class CheckpointIndex(object):
+    """
+    Decompression checkpoints of single compressed file.
+    Decompression is resumed by a new decompressor at checkpoints without decompressor,
+    which are at the beginnings of compressed streams (file may consist of many concatenated
+    streams, e.g. appended gzip members or bz2 streams written by pbzip2).
+    Other checkpoints keep a copy of decompressor state after decompressing the content
+    up to their uncompressed_offset, so decompression can be resumed there without
+    decompressing the beginning of stream. State of decompressor cannot be serialized,
+    so only checkpoints at streams beginnings are saved in index file, and the other ones
+    are added again when file is decompressed.
+    State of bz2 and xz decompressors cannot be copied, so their checkpoints are only
+    at streams beginnings, and files with long streams have no random access.
+    """
+
+    def __init__(self, file_signature, checkpoint_interval, size=0, checkpoints=None):
+        self.file_signature = file_signature
+        self.checkpoint_interval = checkpoint_interval
+        self.size = size
+        self.random_access = True
+        self._checkpoints = checkpoints or [Checkpoint(0, 0, None)]
+        self._uncompressed_offsets = [
+            checkpoint.uncompressed_offset for checkpoint in self._checkpoints
+        ]
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._checkpoints)
+
+    def get_checkpoint_before(self, offset):
+        with self._lock:
+            position = bisect.bisect_right(self._uncompressed_offsets, offset)
+            return self._checkpoints[max(position - 1, 0)]
+
+    def get_max_gap(self):
+        """
+        returns the length of the longest part of content, which is decompressed
+        from one checkpoint before the next one can be used
+        """
+        with self._lock:
+            offsets = self._uncompressed_offsets + [self.size]
+        return max(end - begin for begin, end in zip(offsets, offsets[1:]))
+
+    def add_checkpoint(self, uncompressed_offset, compressed_offset, decompressor):
+        """
+        adds checkpoint if there is no other one closer than checkpoint interval.
+        Decompressor is None at the beginning of compressed stream, otherwise
+        it is the decompressor which has decompressed content up to uncompressed_offset,
+        and checkpoint is added only if its state can be copied.
+        """
+        with self._lock:
+            position = bisect.bisect_right(self._uncompressed_offsets, uncompressed_offset)
+            if uncompressed_offset - self._uncompressed_offsets[position - 1] < \
+                    self.checkpoint_interval:
+                return
+            if position < len(self._uncompressed_offsets) and \
+                    self._uncompressed_offsets[position] - uncompressed_offset < \
+                    self.checkpoint_interval:
+                return
+            if decompressor is not None:
+                decompressor = _copy_decompressor(decompressor)
+                if decompressor is None:
+                    return
+            self._checkpoints.insert(
+                position, Checkpoint(uncompressed_offset, compressed_offset, decompressor)
+            )
+            self._uncompressed_offsets.insert(position, uncompressed_offset)
+
+    def serialize(self):
+        with self._lock:
+            streams_checkpoints = [
+                [checkpoint.uncompressed_offset, checkpoint.compressed_offset]
+                for checkpoint in self._checkpoints if checkpoint.decompressor is None
+            ]
+        return {
+            'file_signature': list(self.file_signature),
+            'checkpoint_interval': self.checkpoint_interval,
+            'size': self.size,
+            'streams_checkpoints': streams_checkpoints,
+        }
+
+    @classmethod
+    def from_dao(cls, serialized):
+        return cls(
+            tuple(serialized['file_signature']), serialized['checkpoint_interval'],
+            serialized['size'], [
+                Checkpoint(uncompressed_offset, compressed_offset, None)
+                for uncompressed_offset, compressed_offset in serialized['streams_checkpoints']
+            ]
+        )
+
+
+class CheckpointIndexStorage(object):
+    """
+    Keeps CheckpointIndex for every opened compressed file in memory and persists it
+    in index file, so the whole file is decompressed only once per file version.
+    Index files are kept in private index_dir, as described in IndexFiles.
+    """
+    INDEX_FILE_SUFFIX = '.whylog_checkpoints'
+
+    def __init__(
+        self, checkpoint_interval=CompressionConsts.DEFAULT_CHECKPOINT_INTERVAL, index_dir=None
+    ):
+        """
+        :param index_dir: directory of index files, by default the whylog directory
+            in user's cache directory
+        """
+        self._checkpoint_interval = checkpoint_interval
+        self._index_files = IndexFiles(
+            index_dir or IndexConsts.get_default_index_dir(), self.INDEX_FILE_SUFFIX
+        )
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def get_index(self, file_path, raw_file, decompressor_factory):
+        file_stat = os.fstat(raw_file.fileno())
+        file_signature = (file_stat.st_ino, file_stat.st_size, file_stat.st_mtime)
+        with self._lock:
+            index = self._indexes.get(file_path)
+        if index is not None and index.file_signature == file_signature:
+            return index
+        index = self._index_files.load(file_path, CheckpointIndex.from_dao)
+        if index is None or index.file_signature != file_signature or \
+                index.checkpoint_interval != self._checkpoint_interval:
+            index = self._build_index(raw_file, decompressor_factory, file_signature)
+            self._index_files.save(file_path, index.serialize())
+        index.random_access = self._has_random_access(index, decompressor_factory)
+        with self._lock:
+            self._indexes[file_path] = index
+        return index
+
+    def _build_index(self, raw_file, decompressor_factory, file_signature):
+        index = CheckpointIndex(file_signature, self._checkpoint_interval)
+        for data, compressed_offset, decompressor in decompress_chunks(
+            raw_file, index.get_checkpoint_before(0), decompressor_factory
+        ):
+            index.size += len(data)
+            index.add_checkpoint(index.size, compressed_offset, decompressor)
+        return index
+
+    @classmethod
+    def _has_random_access(cls, index, decompressor_factory):
+        # checkpoints with copies of decompressor are at most one decompressed chunk
+        # further than checkpoint interval, but they are not saved in index file
+        if _copy_decompressor(decompressor_factory()) is not None:
+            return True
+        return index.get_max_gap() <= 2 * index.checkpoint_interval
+
+
+DEFAULT_CHECKPOINT_STORAGE = CheckpointIndexStorage()
+
+
+def _copy_decompressor(decompressor):
+    try:
+        return decompressor.copy()
+    except AttributeError:
+        return None
+
+
+def _is_end_of_stream(decompressor):
+    # zlib decompressors of python 2 have no eof attribute
+    return getattr(decompressor, 'eof', bool(decompressor.unused_data))
+
+
+def decompress_chunks(raw_file, checkpoint, decompressor_factory):
+    """
+    a generator that resumes decompression at the checkpoint and returns triples
+    consisting of decompressed chunk, the offset in compressed file at which decompression
+    is resumed after this chunk, and decompressor which resumes it.
+    Files with many concatenated compressed streams (e.g. appended gzip members) are supported.
+    The last chunk of stream is returned separately, with the offset of the next stream
+    beginning and None instead of decompressor, because the new one decompresses next stream.
+    """
+    if checkpoint.decompressor is None:
+        decompressor = decompressor_factory()
+    else:
+        decompressor = _copy_decompressor(checkpoint.decompressor)
+    compressed_offset = checkpoint.compressed_offset
+    raw_file.seek(compressed_offset)
+    while True:
+        raw_data = raw_file.read(CompressionConsts.COMPRESSED_CHUNK_SIZE)
+        if not raw_data:
+            return
+        compressed_offset += len(raw_data)
+        data = b''
+        while raw_data:
+            if _is_end_of_stream(decompressor):
+                # data after the end of stream begin the next stream,
+                # but trailing zero bytes are only a padding
+                if not raw_data.strip(b'\x00'):
+                    break
+                yield data, compressed_offset - len(raw_data), None
+                decompressor = decompressor_factory()
+                data = b''
+            data += decompressor.decompress(raw_data)
+            raw_data = decompressor.unused_data if _is_end_of_stream(decompressor) else b''
+        yield data, compressed_offset, decompressor
+
+
+def has_random_access(file_path):
+    """
+    checks whether reading log file from any offset is cheap. It is not true for
+    compressed files with long bz2 or xz streams, where every seek backwards means
+    decompressing the stream from its beginning.
+    """
+    if not is_compressed(file_path):
+        return True
+    with SeekableDecompressedFile(file_path) as fd:
+        return fd.has_random_access()
+
+
+def stat_opened_log_file(opened_file):
+    """
+    returns stat of file opened by open_log_file, which is the stat
+    of compressed file for SeekableDecompressedFile
+    """
+    raw_file = getattr(opened_file, 'raw_file', opened_file)
+    return os.fstat(raw_file.fileno())
+
+
+class SeekableDecompressedFile(object):
+    """
+    Read-only binary file-like object with decompressed content of compressed log file.
+    Seeking is done by resuming decompression at the nearest preceding checkpoint,
+    so it costs at most the decompression of checkpoint interval in files with random access,
+    and sequential reads continue decompression without going back to checkpoint.
+    File has no file descriptor, so it cannot be e.g. memory mapped.
+    """
+
+    def __init__(self, file_path, checkpoint_storage=None):
+        self._decompressor_factory = _get_decompressor_factory(file_path)
+        self._raw_file = open(file_path, 'rb')
+        checkpoint_storage = checkpoint_storage or DEFAULT_CHECKPOINT_STORAGE
+        try:
+            self._index = checkpoint_storage.get_index(
+                file_path, self._raw_file, self._decompressor_factory
+            )
+        except Exception:
+            self._raw_file.close()
+            raise
+        self._position = 0
+        self._chunks = None
+        self._chunk = b''
+        self._chunk_offset = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self._raw_file.close()
+
+    @property
+    def raw_file(self):
+        return self._raw_file
+
+    def fileno(self):
+        raise io.UnsupportedOperation('decompressed content has no file descriptor')
+
+    def has_random_access(self):
+        return self._index.random_access
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_CUR:
+            offset += self._position
+        elif whence == os.SEEK_END:
+            offset += self._index.size
+        self._position = max(offset, 0)
+        return self._position
+
+    def _restart_decompression(self, offset):
+        checkpoint = self._index.get_checkpoint_before(offset)
+        self._chunks = decompress_chunks(self._raw_file, checkpoint, self._decompressor_factory)
+        self._chunk = b''
+        self._chunk_offset = checkpoint.uncompressed_offset
+
+    def _needs_restart(self, offset):
+        if self._chunks is None or offset < self._chunk_offset:
+            return True
+        # resuming at checkpoint is cheaper than decompressing all content up to it
+        chunk_end = self._chunk_offset + len(self._chunk)
+        return self._index.get_checkpoint_before(offset).uncompressed_offset > chunk_end
+
+    def _move_to_chunk_containing(self, offset):
+        """
+        makes current chunk the one which contains the offset,
+        returns False if offset is beyond the end of file
+        """
+        if offset >= self._index.size:
+            return False
+        if self._needs_restart(offset):
+            self._restart_decompression(offset)
+        while offset >= self._chunk_offset + len(self._chunk):
+            self._chunk_offset += len(self._chunk)
+            self._chunk, compressed_offset, decompressor = next(self._chunks)
+            # checkpoints with copies of decompressor are not saved in index file,
+            # so they are added again when content of file is decompressed
+            self._index.add_checkpoint(
+                self._chunk_offset + len(self._chunk), compressed_offset, decompressor
+            )
+        return True
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self._index.size - self._position
+        parts = []
+        while size > 0 and self._move_to_chunk_containing(self._position):
+            begin = self._position - self._chunk_offset
+            part = self._chunk[begin:begin + size]
+            parts.append(part)
+            self._position += len(part)
+            size -= len(part)
+        return b''.join(parts)
+
+    def readline(self):
+        parts = []
+        while self._move_to_chunk_containing(self._position):
+            begin = self._position - self._chunk_offset
+            line_end = self._chunk.find(b'\n', begin)
+            if line_end != -1:
+                parts.append(self._chunk[begin:line_end + 1])
+                self._position = self._chunk_offset + line_end + 1
+                break
+            parts.append(self._chunk[begin:])
+            self._position = self._chunk_offset + len(self._chunk)
+        return b''.join(parts)
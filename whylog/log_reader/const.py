@@ -1,2 +1,32 @@
+import os
+
+
 class BufsizeConsts(object):
     STANDARD_BUF_SIZE = 1024 * 1024 * 10
+
+
+class IndexConsts(object):
+    DEFAULT_SAMPLING_INTERVAL = 1024 * 64
+
+    @classmethod
+    def get_default_index_dir(cls):
+        cache_dir = os.environ.get('XDG_CACHE_HOME') or os.path.join(
+            os.path.expanduser('~'), '.cache'
+        )
+        return os.path.join(cache_dir, 'whylog', 'indexes')
+
+
+class CompressionConsts(object):
+    DEFAULT_CHECKPOINT_INTERVAL = 1024 * 1024
+    COMPRESSED_CHUNK_SIZE = 1024 * 16
+
+
+class CacheConsts(object):
+    DEFAULT_BLOCK_SIZE = 1024 * 64
+    DEFAULT_MAX_CACHE_SIZE = 1024 * 1024 * 64
+    DEFAULT_MAX_RESULTS_COUNT = 1024
+
+
+class TreeConsts(object):
+    DEFAULT_MAX_DEPTH = 8
+    DEFAULT_MAX_FAN_OUT = 16
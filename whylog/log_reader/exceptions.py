@@ -27,3 +27,7 @@ class OffsetBiggerThanFileSize(LogReaderError):
 
     def __str__(self):
         return 'Captured offset (%s) is too big' % self.offset
+
+
+class AgentError(LogReaderError):
+    pass
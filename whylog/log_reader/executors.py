@@ -0,0 +1,160 @@
+import multiprocessing
+import threading
+from abc import ABCMeta, abstractmethod
+from multiprocessing.pool import ThreadPool
+
+import six
+
+from whylog.investigation_stats import InvestigationStats, StatsCollectingFunction
+
+
+@six.add_metaclass(ABCMeta)
+class AbstractSearchExecutor(object):
+    """
+    Runs independent parts of investigation (e.g. searches in single files).
+    Results are always returned in the order of given tasks,
+    so merged results are the same as for serial execution.
+    """
+
+    @abstractmethod
+    def map(self, function, tasks):
+        pass
+
+    def imap_unordered(self, function, tasks):
+        """
+        lazy version of map, which yields every result as soon as it is ready,
+        so the order of results may differ from the order of tasks
+        """
+        for task in tasks:
+            yield function(task)
+
+    def close(self):
+        pass
+
+
+class SerialSearchExecutor(AbstractSearchExecutor):
+    def map(self, function, tasks):
+        return [function(task) for task in tasks]
+
+
+@six.add_metaclass(ABCMeta)
+class AbstractPoolSearchExecutor(AbstractSearchExecutor):
+    """
+    Executor with pool of workers, that is created on first usage and reused by next ones.
+    """
+
+    def __init__(self, workers_count=None):
+        self._workers_count = workers_count or multiprocessing.cpu_count()
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def __getstate__(self):
+        # pool and lock cannot be pickled, it happens when nested executor is sent to other process
+        state = self.__dict__.copy()
+        state['_pool'] = None
+        del state['_pool_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._pool_lock = threading.Lock()
+
+    @abstractmethod
+    def _create_pool(self):
+        pass
+
+    def _can_use_pool(self):
+        return True
+
+    def _get_pool(self):
+        # executor may be used by many threads, e.g. by workers of step executor,
+        # and each of them would create its own pool
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = self._create_pool()
+            return self._pool
+
+    def map(self, function, tasks):
+        tasks = list(tasks)
+        if len(tasks) <= 1 or not self._can_use_pool():
+            return [function(task) for task in tasks]
+        stats = InvestigationStats.get_active()
+        if stats is None:
+            return self._get_pool().map(function, tasks)
+        results = self._get_pool().map(StatsCollectingFunction(function), tasks)
+        return [self._merge_stats(stats, result) for result in results]
+
+    def imap_unordered(self, function, tasks):
+        tasks = list(tasks)
+        if len(tasks) <= 1 or not self._can_use_pool():
+            return super(AbstractPoolSearchExecutor, self).imap_unordered(function, tasks)
+        stats = InvestigationStats.get_active()
+        if stats is None:
+            return self._get_pool().imap_unordered(function, tasks)
+        results = self._get_pool().imap_unordered(StatsCollectingFunction(function), tasks)
+        return (self._merge_stats(stats, result) for result in results)
+
+    @classmethod
+    def _merge_stats(cls, stats, result_with_stats):
+        """
+        workers do not see stats activated in this thread, so they collect their own ones
+        """
+        result, worker_stats = result_with_stats
+        stats.merge(worker_stats)
+        return result
+
+    def close(self):
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+
+class ThreadSearchExecutor(AbstractPoolSearchExecutor):
+    """
+    Suitable for I/O-bound investigations, e.g. logs placed on network file systems.
+    The same executor may run both investigation steps and searches in files.
+    Its workers, which would wait for tasks queued behind them in the same pool,
+    run tasks of nested calls serially.
+    """
+
+    def __init__(self, workers_count=None):
+        super(ThreadSearchExecutor, self).__init__(workers_count)
+        self._workers_local = threading.local()
+
+    def __getstate__(self):
+        state = super(ThreadSearchExecutor, self).__getstate__()
+        del state['_workers_local']
+        return state
+
+    def __setstate__(self, state):
+        super(ThreadSearchExecutor, self).__setstate__(state)
+        self._workers_local = threading.local()
+
+    def _create_pool(self):
+        return ThreadPool(self._workers_count, initializer=self._mark_worker)
+
+    def _mark_worker(self):
+        self._workers_local.is_worker = True
+
+    def _can_use_pool(self):
+        return not getattr(self._workers_local, 'is_worker', False)
+
+
+class ProcessSearchExecutor(AbstractPoolSearchExecutor):
+    """
+    Suitable for regex-bound investigations. Searchers, their investigation steps and
+    found clues are pickled when they are passed between processes.
+    """
+
+    def _create_pool(self):
+        return multiprocessing.Pool(self._workers_count)
+
+    def _can_use_pool(self):
+        # workers of processes pool cannot create their own processes,
+        # so nested executor runs tasks serially in them
+        return not multiprocessing.current_process().daemon
+
+
+DEFAULT_EXECUTOR = SerialSearchExecutor()
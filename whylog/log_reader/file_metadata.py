@@ -0,0 +1,147 @@
+import os
+import threading
+
+import six
+
+from whylog.config.investigation_plan import InvestigationStep
+from whylog.config.utils import CompareResult
+from whylog.log_reader.compressed_files import open_log_file
+from whylog.log_reader.file_version import FileVersion
+from whylog.log_reader.read_utils import ReadUtils
+
+
+class FileMetadata(object):
+    """
+    Primary key groups (extracted by super parser) of the first and the last line
+    of single log file version, which have a primary key.
+    None means that there is no such line in file.
+    Content size is the size of file content (decompressed one for compressed files).
+    """
+
+    def __init__(self, file_version, parser_signature, content_size, first_groups, last_groups):
+        self.file_version = file_version
+        self.parser_signature = parser_signature
+        self.content_size = content_size
+        self.first_groups = first_groups
+        self.last_groups = last_groups
+
+    def may_intersect(self, investigation_step):
+        """
+        returns False only if all lines of file are before the left bound or after the right bound
+        of investigation step, assuming that lines in file are sorted by primary key
+        """
+        if self.first_groups is None or self.last_groups is None:
+            return True
+        if investigation_step.compare_with_bound(
+            InvestigationStep.LEFT_BOUND, self.last_groups
+        ) == CompareResult.LT:
+            return False
+        return investigation_step.compare_with_bound(
+            InvestigationStep.RIGHT_BOUND, self.first_groups
+        ) != CompareResult.GT
+
+
+class FileMetadataCache(object):
+    """
+    Keeps FileMetadata of searched log files in memory, so when files of rotated log series
+    are searched again, only their stat is checked to skip files which key span
+    is outside of the search range.
+    When data is appended to file, only appended part is read to update its metadata.
+    """
+
+    def __init__(self):
+        self._metadata = {}
+        self._lock = threading.Lock()
+
+    def __reduce__(self):
+        # cached metadata is not sent to other processes with searchers, but like BlockCache,
+        # every process has its own default cache, which is shared by searches made there
+        if self is DEFAULT_FILE_METADATA_CACHE:
+            return get_default_file_metadata_cache, ()
+        return FileMetadataCache, ()
+
+    def get_metadata(self, file_path, super_parser, budget=None):
+        """
+        :param budget: InvestigationBudget charged with lines read to find primary keys.
+            If it is exhausted during reading, the returned metadata may lack primary keys
+            and it is not kept.
+        """
+        parser_signature = sorted(six.iteritems(super_parser.serialize()), key=lambda item: item[0])
+        file_stat = os.stat(file_path)
+        with self._lock:
+            metadata = self._metadata.get(file_path)
+        if metadata is not None and metadata.parser_signature != parser_signature:
+            metadata = None
+        if metadata is not None and metadata.file_version.matches_stat(file_stat):
+            return metadata
+        with open(file_path, 'rb') as raw_file:
+            file_version = FileVersion.of_opened_file(raw_file)
+            if metadata is not None and not metadata.file_version.is_appended_by(
+                file_version, raw_file
+            ):
+                metadata = None
+        with open_log_file(file_path) as fd:
+            if metadata is None:
+                metadata = FileMetadata(
+                    file_version, parser_signature, ReadUtils.size_of_opened_file(fd),
+                    self._find_first_groups(fd, super_parser, budget=budget),
+                    self._find_last_groups(fd, super_parser, budget=budget)
+                )
+            else:
+                metadata = self._extend_metadata(
+                    metadata, fd, super_parser, file_version, budget
+                )
+        if budget is not None and budget.is_exhausted():
+            return metadata
+        with self._lock:
+            self._metadata[file_path] = metadata
+        return metadata
+
+    @classmethod
+    def _extend_metadata(cls, metadata, fd, super_parser, file_version, budget=None):
+        """
+        creates metadata of file, to which data was appended after the metadata was created
+        """
+        first_groups = metadata.first_groups
+        if first_groups is None:
+            first_groups = cls._find_first_groups(
+                fd, super_parser, metadata.content_size, budget
+            )
+        last_groups = cls._find_last_groups(fd, super_parser, metadata.content_size, budget)
+        return FileMetadata(
+            file_version, metadata.parser_signature, ReadUtils.size_of_opened_file(fd),
+            first_groups, last_groups or metadata.last_groups
+        )
+
+    @classmethod
+    def _find_first_groups(cls, fd, super_parser, start_offset=0, budget=None):
+        fd.seek(start_offset)
+        for line in iter(fd.readline, b''):
+            if budget is not None and not budget.consume(len(line)):
+                return None
+            groups = super_parser.get_ordered_groups_from_bytes(line.rstrip(b'\n'))
+            if groups:
+                return groups
+        return None
+
+    @classmethod
+    def _find_last_groups(cls, fd, super_parser, stop_offset=0, budget=None):
+        offset = ReadUtils.size_of_opened_file(fd) - 1
+        while offset >= stop_offset:
+            line, line_begin, _ = ReadUtils.get_line_containing_offset(
+                fd, offset, ReadUtils.STANDARD_BUFFER_SIZE
+            )
+            if budget is not None and not budget.consume(len(line) + 1):
+                return None
+            groups = super_parser.get_ordered_groups_from_bytes(line)
+            if groups:
+                return groups
+            offset = line_begin - 1
+        return None
+
+
+def get_default_file_metadata_cache():
+    return DEFAULT_FILE_METADATA_CACHE
+
+
+DEFAULT_FILE_METADATA_CACHE = FileMetadataCache()
@@ -0,0 +1,74 @@
+import hashlib
+import os
+
+
+class FileVersion(object):
+    """
+    Identifies single version of file by its inode, size, mtime and the digest of its head.
+    Head digest allows to check cheaply whether newer version of file was created
+    only by appending data to this one, so state built for this version can be extended
+    instead of being rebuilt.
+    Versions of compressed files describe the compressed content.
+    """
+    HEAD_SIZE = 1024
+
+    def __init__(self, inode, size, mtime, head_digest):
+        self.inode = inode
+        self.size = size
+        self.mtime = mtime
+        self.head_digest = head_digest
+
+    @classmethod
+    def _create_head_digest(cls, raw_file, length):
+        raw_file.seek(0)
+        return hashlib.sha1(raw_file.read(length)).hexdigest()
+
+    @classmethod
+    def of_opened_file(cls, raw_file):
+        """
+        :param raw_file: file opened in binary mode, without decompression
+        """
+        file_stat = os.fstat(raw_file.fileno())
+        head_digest = cls._create_head_digest(raw_file, min(cls.HEAD_SIZE, file_stat.st_size))
+        return cls(file_stat.st_ino, file_stat.st_size, file_stat.st_mtime, head_digest)
+
+    @property
+    def head_length(self):
+        return min(self.HEAD_SIZE, self.size)
+
+    def matches_stat(self, file_stat):
+        return (self.inode, self.size, self.mtime) == (
+            file_stat.st_ino, file_stat.st_size, file_stat.st_mtime
+        )
+
+    def is_appended_by(self, newer_version, raw_file):
+        """
+        checks whether newer version of file (opened as raw_file) contains this one as prefix,
+        basing on inode, size and head digest
+        """
+        if newer_version.inode != self.inode or newer_version.size < self.size:
+            return False
+        if newer_version.head_length == self.head_length:
+            return newer_version.head_digest == self.head_digest
+        return self._create_head_digest(raw_file, self.head_length) == self.head_digest
+
+    def serialize(self):
+        return {
+            'inode': self.inode,
+            'size': self.size,
+            'mtime': self.mtime,
+            'head_digest': self.head_digest,
+        }
+
+    @classmethod
+    def from_dao(cls, serialized):
+        return cls(**serialized)
+
+    def __eq__(self, other):
+        return self.serialize() == other.serialize()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return "(FileVersion: %s, %s, %s)" % (self.inode, self.size, self.mtime)
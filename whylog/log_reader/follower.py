@@ -0,0 +1,148 @@
+import json
+import os
+import time
+
+import six
+
+from whylog.log_reader.file_metadata import DEFAULT_FILE_METADATA_CACHE
+from whylog.log_reader.file_version import FileVersion
+from whylog.log_reader.key_index import DEFAULT_INDEX_STORAGE
+
+
+class FileChange(object):
+    NEW = 'new'
+    APPENDED = 'appended'
+    TRUNCATED = 'truncated'
+    ROTATED = 'rotated'
+
+    def __init__(self, path, change_type, previous_offset, offset):
+        self.path = path
+        self.change_type = change_type
+        self.previous_offset = previous_offset
+        self.offset = offset
+
+    def __repr__(self):
+        return "(FileChange: %s %s %s-%s)" % (
+            self.path, self.change_type, self.previous_offset, self.offset
+        )
+
+    def __eq__(self, other):
+        return all((
+            self.path == other.path,
+            self.change_type == other.change_type,
+            self.previous_offset == other.previous_offset,
+            self.offset == other.offset
+        ))  # yapf: disable
+
+    def __ne__(self, other):
+        return not self == other
+
+
+class LogFollower(object):
+    """
+    Follows continuously growing local files of all log types from config.
+    For every file it keeps a cursor (FileVersion: inode, offset, head digest) of its
+    last seen version, so it detects appended data, rotation (new inode under the same path)
+    and truncation (file shrank or its head changed).
+    After every change, per-file state used by searchers (key index and first/last keys)
+    is updated. For appended files it is only extended with appended data.
+    Cursors are persisted in cursors_path file, if it is specified.
+    """
+
+    def __init__(
+        self,
+        config,
+        cursors_path=None,
+        index_storage=None,
+        file_metadata_cache=None,
+        poll_interval=1.0
+    ):
+        self._config = config
+        self._cursors_path = cursors_path
+        self._index_storage = index_storage or DEFAULT_INDEX_STORAGE
+        self._file_metadata_cache = file_metadata_cache or DEFAULT_FILE_METADATA_CACHE
+        self._poll_interval = poll_interval
+        self._cursors = self._load_cursors()
+
+    def _load_cursors(self):
+        if self._cursors_path is None:
+            return {}
+        try:
+            with open(self._cursors_path) as cursors_file:
+                serialized_cursors = json.load(cursors_file)
+        except (IOError, OSError, ValueError):
+            return {}
+        return dict(
+            (path, FileVersion.from_dao(serialized))
+            for path, serialized in six.iteritems(serialized_cursors)
+        )
+
+    def _save_cursors(self):
+        if self._cursors_path is None:
+            return
+        serialized_cursors = dict(
+            (path, cursor.serialize()) for path, cursor in six.iteritems(self._cursors)
+        )
+        with open(self._cursors_path, 'w') as cursors_file:
+            json.dump(serialized_cursors, cursors_file)
+
+    def get_cursor(self, path):
+        return self._cursors.get(path)
+
+    def poll(self):
+        """
+        checks all files once, updates their state and cursors
+        :return: list of FileChanges
+        """
+        changes = []
+        seen_paths = set()
+        for log_type in self._config.get_all_log_types():
+            for host, path, super_parser in log_type.files_to_parse():
+                if host != 'localhost' or path in seen_paths:
+                    continue
+                seen_paths.add(path)
+                try:
+                    change = self._update_cursor(path)
+                    if change is not None:
+                        self._index_storage.get_index(path, super_parser)
+                        self._file_metadata_cache.get_metadata(path, super_parser)
+                except (IOError, OSError):
+                    # file was removed after it had been matched, e.g. during rotation
+                    seen_paths.discard(path)
+                    continue
+                if change is not None:
+                    changes.append(change)
+        for path in set(self._cursors) - seen_paths:
+            del self._cursors[path]
+        self._save_cursors()
+        return changes
+
+    def follow(self):
+        """
+        a generator that polls files every poll_interval seconds
+        and returns lists of FileChanges
+        """
+        while True:
+            yield self.poll()
+            time.sleep(self._poll_interval)
+
+    def _update_cursor(self, path):
+        cursor = self._cursors.get(path)
+        if cursor is not None and cursor.matches_stat(os.stat(path)):
+            return None
+        with open(path, 'rb') as raw_file:
+            file_version = FileVersion.of_opened_file(raw_file)
+            change_type = self._get_change_type(cursor, file_version, raw_file)
+        self._cursors[path] = file_version
+        previous_offset = 0 if cursor is None else cursor.size
+        return FileChange(path, change_type, previous_offset, file_version.size)
+
+    @classmethod
+    def _get_change_type(cls, cursor, file_version, raw_file):
+        if cursor is None:
+            return FileChange.NEW
+        if cursor.inode != file_version.inode:
+            return FileChange.ROTATED
+        if cursor.is_appended_by(file_version, raw_file):
+            return FileChange.APPENDED
+        return FileChange.TRUNCATED
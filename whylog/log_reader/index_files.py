@@ -0,0 +1,78 @@
+import hashlib
+import json
+import os
+import tempfile
+
+
+class IndexFiles(object):
+    """
+    JSON files with indexes of log files, kept in private index_dir,
+    not next to log files, where they would be matched by log types paths patterns and
+    could be replaced by other users of shared log directory.
+    Index file is named by hash of absolute path of log file, and this path is saved
+    in index file too, so hash collisions are detected.
+    """
+
+    def __init__(self, index_dir, index_file_suffix):
+        self._index_dir = index_dir
+        self._index_file_suffix = index_file_suffix
+
+    @property
+    def index_dir(self):
+        return self._index_dir
+
+    @classmethod
+    def get_absolute_path(cls, file_path):
+        return os.path.realpath(file_path)
+
+    def get_index_file_path(self, file_path):
+        file_name = hashlib.sha1(self.get_absolute_path(file_path).encode('utf-8')).hexdigest()
+        return os.path.join(self._index_dir, file_name + self._index_file_suffix)
+
+    def load(self, file_path, from_dao):
+        """
+        returns index of file created by from_dao from serialized index,
+        or None if index file does not exist or cannot be read
+        """
+        try:
+            with open(self.get_index_file_path(file_path), 'r') as index_file:
+                serialized = json.load(index_file)
+            if serialized['file_path'] != self.get_absolute_path(file_path):
+                return None
+            return from_dao(serialized['index'])
+        except (IOError, OSError, ValueError, LookupError, TypeError):
+            # index file may be corrupted or saved by other version of whylog,
+            # then index is built again
+            return None
+
+    def save(self, file_path, serialized_index):
+        """
+        Index is written to temporary file, which replaces the old one,
+        so other processes never read partially written index.
+        The lack of permissions to write index file should not break the investigation,
+        in such case index is kept only in memory.
+        """
+        serialized = {'file_path': self.get_absolute_path(file_path), 'index': serialized_index}
+        try:
+            if not os.path.isdir(self._index_dir):
+                os.makedirs(self._index_dir, 0o700)
+            file_descriptor, tmp_path = tempfile.mkstemp(dir=self._index_dir)
+        except (IOError, OSError):
+            return
+        try:
+            with os.fdopen(file_descriptor, 'w') as index_file:
+                json.dump(serialized, index_file)
+            self._replace(tmp_path, self.get_index_file_path(file_path))
+        except (IOError, OSError):
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @classmethod
+    def _replace(cls, source_path, destination_path):
+        if hasattr(os, 'replace'):
+            os.replace(source_path, destination_path)
+            return
+        # python 2 on windows cannot rename file to existing one
+        if os.path.exists(destination_path):
+            os.remove(destination_path)
+        os.rename(source_path, destination_path)
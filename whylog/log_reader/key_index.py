@@ -0,0 +1,263 @@
+import json
+import os
+import threading
+
+from whylog.config.investigation_plan import InvestigationStep
+from whylog.config.utils import CompareResult
+from whylog.converters import CONVERTION_MAPPING, ConverterType
+from whylog.log_reader.compressed_files import open_log_file
+from whylog.log_reader.const import IndexConsts
+from whylog.log_reader.file_version import FileVersion
+from whylog.log_reader.index_files import IndexFiles
+from whylog.log_reader.read_utils import ReadUtils
+
+
+# converted primary keys, which are not JSON values, are stored as strings
+KEY_ENCODERS = {ConverterType.TO_DATE: lambda date: date.isoformat()}
+
+
+class SparseKeyIndex(object):
+    """
+    Maps primary key groups (extracted by super parser) of sampled lines from single log file
+    to the offsets of these lines.
+    At most one line per sampling_interval bytes is sampled, so index stays small even for
+    huge files, but every search range bound can be narrowed to the window of about
+    sampling_interval bytes with only one in-memory lookup.
+    """
+
+    def __init__(self, parser_signature, sampling_interval):
+        self.parser_signature = parser_signature
+        self.sampling_interval = sampling_interval
+        self.file_version = None
+        self.indexed_size = 0
+        self._offsets = []
+        self._groups = []
+        self._next_sample_offset = 0
+
+    def __len__(self):
+        return len(self._offsets)
+
+    @property
+    def file_signature(self):
+        return self.file_version, self.parser_signature
+
+    def copy(self):
+        index = SparseKeyIndex(self.parser_signature, self.sampling_interval)
+        index.file_version = self.file_version
+        index.indexed_size = self.indexed_size
+        index._offsets = list(self._offsets)
+        index._groups = list(self._groups)
+        index._next_sample_offset = self._next_sample_offset
+        return index
+
+    def serialize(self):
+        return {
+            'parser_signature': self.parser_signature,
+            'sampling_interval': self.sampling_interval,
+            'file_version': self.file_version.serialize(),
+            'indexed_size': self.indexed_size,
+            'offsets': self._offsets,
+            'groups': [
+                [
+                    (key_type, KEY_ENCODERS.get(key_type, lambda value: value)(value))
+                    for key_type, value in groups
+                ] for groups in self._groups
+            ],
+            'next_sample_offset': self._next_sample_offset,
+        }  # yapf: disable
+
+    @classmethod
+    def from_dao(cls, serialized):
+        index = cls(serialized['parser_signature'], serialized['sampling_interval'])
+        index.file_version = FileVersion.from_dao(serialized['file_version'])
+        index.indexed_size = serialized['indexed_size']
+        index._offsets = serialized['offsets']
+        index._groups = [
+            tuple(
+                (key_type, CONVERTION_MAPPING[key_type].convert(value))
+                if key_type in KEY_ENCODERS else (key_type, value)
+                for key_type, value in groups
+            ) for groups in serialized['groups']
+        ]  # yapf: disable
+        index._next_sample_offset = serialized['next_sample_offset']
+        return index
+
+    def extend(self, fd, super_parser, file_size, budget=None):
+        """
+        samples lines from opened (in binary mode) file, beginning from the first
+        not yet sampled position and ending at file_size
+        :param budget: InvestigationBudget charged with bytes read while sampling
+        :return: False if sampling was stopped, because budget was exhausted
+        """
+        position = self._next_sample_offset
+        while position < file_size:
+            line_begin = self._move_to_line_beginning(fd, position)
+            line_end = self._sample_next_keyed_line(fd, super_parser, line_begin)
+            if budget is not None and not budget.consume(fd.tell() - position):
+                return False
+            if line_end is None:
+                # file ends with not completed line, it will be sampled in the next extension
+                break
+            position = max(line_end, position + self.sampling_interval)
+        self._next_sample_offset = position
+        self.indexed_size = file_size
+        return True
+
+    @classmethod
+    def _move_to_line_beginning(cls, fd, position):
+        if position == 0:
+            fd.seek(0)
+            return 0
+        fd.seek(position - 1)
+        return position - 1 + len(fd.readline())
+
+    def _sample_next_keyed_line(self, fd, super_parser, line_begin):
+        """
+        adds to index the first line which has a primary key, beginning from line_begin
+        and returns the offset of the end of this line
+        """
+        while True:
+            line = fd.readline()
+            if not line.endswith(b'\n'):
+                return None
+            line_end = line_begin + len(line)
+            groups = super_parser.get_ordered_groups_from_bytes(line.rstrip(b'\n'))
+            if groups:
+                self._offsets.append(line_begin)
+                self._groups.append(tuple(groups))
+                return line_end
+            line_begin = line_end
+
+    def _find_first_sample(self, predicate):
+        """
+        returns the index of the first sampled line for which predicate is true,
+        basing on assumption that if it holds for some line, it holds for all next lines
+        """
+        left, right = 0, len(self._groups)
+        while left < right:
+            middle = (left + right) // 2
+            if predicate(self._groups[middle]):
+                right = middle
+            else:
+                left = middle + 1
+        return left
+
+    def get_left_window(self, investigation_step):
+        """
+        returns a pair of offsets that surrounds the beginning of the first line
+        which is not before InvestigationStep.LEFT_BOUND.
+        None as the second element means the end of file.
+        """
+        position = self._find_first_sample(
+            lambda groups: investigation_step.compare_with_bound(
+                InvestigationStep.LEFT_BOUND, groups
+            ) != CompareResult.LT
+        )
+        left = self._offsets[position - 1] if position > 0 else 0
+        if position < len(self._offsets):
+            return left, self._offsets[position]
+        return left, None
+
+    def get_right_window(self, investigation_step):
+        """
+        returns a pair of offsets that surrounds the end of the last line
+        which is not after InvestigationStep.RIGHT_BOUND.
+        None as the second element means the end of file.
+        """
+        position = self._find_first_sample(
+            lambda groups: investigation_step.compare_with_bound(
+                InvestigationStep.RIGHT_BOUND, groups
+            ) == CompareResult.GT
+        )
+        left = self._offsets[position - 1] if position > 0 else 0
+        if position < len(self._offsets):
+            return left, max(self._offsets[position] - 1, 0)
+        return left, None
+
+
+class KeyIndexStorage(object):
+    """
+    Keeps SparseKeyIndex for every searched log file in memory and persists it in JSON file,
+    so index is built only once per file and then extended only when data is appended to file.
+    Index files are kept in private index_dir, as described in IndexFiles.
+    """
+    INDEX_FILE_SUFFIX = '.whylog_index'
+
+    def __init__(self, index_dir=None, sampling_interval=IndexConsts.DEFAULT_SAMPLING_INTERVAL):
+        """
+        :param index_dir: directory of index files, by default the whylog directory
+            in user's cache directory
+        """
+        self._index_files = IndexFiles(
+            index_dir or IndexConsts.get_default_index_dir(), self.INDEX_FILE_SUFFIX
+        )
+        self._sampling_interval = sampling_interval
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def __reduce__(self):
+        # indexes kept in memory are not sent to other processes with searchers,
+        # they are loaded there from index files. Every process has its own default storage.
+        if self is DEFAULT_INDEX_STORAGE:
+            return get_default_index_storage, ()
+        return KeyIndexStorage, (self._index_files.index_dir, self._sampling_interval)
+
+    def get_index(self, file_path, super_parser, budget=None):
+        """
+        returns index of actual version of file.
+        If file was only appended since the index was built, index is extended
+        by sampling appended data, otherwise it is built from scratch.
+        :param budget: InvestigationBudget charged with sampling. If it is exhausted
+            before the whole file is sampled, the returned index is incomplete
+            and it is neither kept nor saved.
+        """
+        parser_signature = self._create_parser_signature(super_parser)
+        file_stat = os.stat(file_path)
+        with self._lock:
+            index = self._indexes.get(file_path)
+        if index is None or index.parser_signature != parser_signature:
+            index = self._load_index(file_path)
+            if index is None or index.parser_signature != parser_signature:
+                index = None
+        if index is not None and index.file_version.matches_stat(file_stat):
+            with self._lock:
+                self._indexes[file_path] = index
+            return index
+        with open(file_path, 'rb') as raw_file:
+            file_version = FileVersion.of_opened_file(raw_file)
+            if index is not None and index.file_version.is_appended_by(file_version, raw_file):
+                # index may be used by other threads, so the extended one is a copy
+                index = index.copy()
+            else:
+                index = SparseKeyIndex(parser_signature, self._sampling_interval)
+        if not self._extend_index(file_path, super_parser, index, file_version, budget):
+            return index
+        self._save_index(file_path, index)
+        with self._lock:
+            self._indexes[file_path] = index
+        return index
+
+    def _create_parser_signature(self, super_parser):
+        # signature is a string, so it is compared with signature loaded from index file
+        return json.dumps([self._sampling_interval, super_parser.serialize()], sort_keys=True)
+
+    @classmethod
+    def _extend_index(cls, file_path, super_parser, index, file_version, budget=None):
+        with open_log_file(file_path) as fd:
+            if not index.extend(fd, super_parser, ReadUtils.size_of_opened_file(fd), budget):
+                return False
+        index.file_version = file_version
+        return True
+
+    def _load_index(self, file_path):
+        return self._index_files.load(file_path, SparseKeyIndex.from_dao)
+
+    def _save_index(self, file_path, index):
+        self._index_files.save(file_path, index.serialize())
+
+
+def get_default_index_storage():
+    return DEFAULT_INDEX_STORAGE
+
+
+DEFAULT_INDEX_STORAGE = KeyIndexStorage()
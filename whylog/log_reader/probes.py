@@ -0,0 +1,95 @@
+from __future__ import division
+
+import math
+
+from whylog.converters import DELTA_CONVERTION_MAPPING
+
+
+class BisectionProbes(object):
+    """
+    Chooses offsets of lines compared with search range bound during binary search
+    of BacktrackSearcher. Always probes the middle of searched interval.
+    """
+
+    def __init__(self, investigation_step, bound):
+        self._investigation_step = investigation_step
+        self._bound = bound
+
+    def next_probe(self, left, right):
+        return (left + right) // 2
+
+    def update_left(self, groups):
+        """
+        remembers primary key groups of the line, which is just before new left offset
+        """
+        pass
+
+    def update_right(self, groups):
+        """
+        remembers primary key groups of the line, which is just after new right offset
+        """
+        pass
+
+
+class InterpolationProbes(BisectionProbes):
+    """
+    Estimates the offset of the first line with bound value basing on primary key values
+    of lines surrounding searched interval, assuming that these values grow uniformly in file.
+    When interpolation does not halve searched interval (e.g. keys are not uniform)
+    or primary key values cannot be projected to numbers (e.g. string keys),
+    the next probe is chosen by bisection.
+    """
+
+    def __init__(self, investigation_step, bound):
+        super(InterpolationProbes, self).__init__(investigation_step, bound)
+        self._left_groups = None
+        self._right_groups = None
+        self._bisection_limit = None
+
+    def _to_number(self, groups):
+        if not groups:
+            return None
+        group_type, group_value = groups[0]
+        converter = DELTA_CONVERTION_MAPPING.get(group_type)
+        if converter is None:
+            return None
+        return converter.to_number(group_value)
+
+    def update_left(self, groups):
+        # line without primary key does not change the estimation
+        if groups:
+            self._left_groups = groups
+
+    def update_right(self, groups):
+        if groups:
+            self._right_groups = groups
+
+    def next_probe(self, left, right):
+        bisection_limit, self._bisection_limit = self._bisection_limit, (right - left) // 2
+        if bisection_limit is not None and right - left > bisection_limit:
+            # previous estimation did not halve searched interval
+            self._bisection_limit = None
+            return super(InterpolationProbes, self).next_probe(left, right)
+        estimation = self._estimate(left, right)
+        if estimation is None:
+            return super(InterpolationProbes, self).next_probe(left, right)
+        # in BacktrackSearcher._find_right left offset points at the end of line,
+        # so probing it would return the line which is already known
+        return min(max(estimation, left + 1), right - 1)
+
+    def _estimate(self, left, right):
+        if not self._left_groups or not self._right_groups:
+            return None
+        group_type = self._left_groups[0][0]
+        bound_value = self._investigation_step.get_bound_value(self._bound, group_type)
+        if bound_value is None or self._right_groups[0][0] != group_type:
+            return None
+        left_number = self._to_number(self._left_groups)
+        right_number = self._to_number(self._right_groups)
+        bound_number = self._to_number([(group_type, bound_value)])
+        if None in (left_number, right_number, bound_number) or left_number >= right_number:
+            return None
+        ratio = (bound_number - left_number) / (right_number - left_number)
+        if math.isinf(ratio) or math.isnan(ratio):
+            return None
+        return left + int(ratio * (right - left))
@@ -4,6 +4,10 @@ from whylog.log_reader.exceptions import EmptyFile, OffsetBiggerThanFileSize
 
 
 class ReadUtils(object):
+    """
+    Reading lines from files opened in binary mode,
+    so all offsets are exact positions of bytes in file
+    """
     STANDARD_BUFFER_SIZE = 512
 
     @classmethod
@@ -22,7 +26,7 @@ class ReadUtils(object):
     @classmethod
     def _read_split_lines(cls, fd, position, buf_size):
         content = cls._read_content(fd, position, buf_size)
-        return content.split('\n')
+        return content.split(b'\n')
 
     @classmethod
     def _join_results(cls, first_part, second_part):
@@ -32,7 +36,7 @@ class ReadUtils(object):
             return second_part
         if not second_part:
             return first_part
-        return first_part[:-1] + ["".join((first_part[-1], second_part[0]))] + second_part[1:]
+        return first_part[:-1] + [b"".join((first_part[-1], second_part[0]))] + second_part[1:]
 
     @classmethod
     def _expand_after(cls, fd, position):
@@ -40,7 +44,7 @@ class ReadUtils(object):
         line = fd.readline()
         if not line:
             raise OffsetBiggerThanFileSize(position)
-        return line.rstrip('\n')
+        return line.rstrip(b'\n')
 
     @classmethod
     def _expand_before(cls, fd, position, buf_size):
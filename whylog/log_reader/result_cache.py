@@ -0,0 +1,118 @@
+import os
+import threading
+import weakref
+from collections import OrderedDict
+
+import six
+
+from whylog.log_reader.const import CacheConsts
+
+
+class ResultCacheEntry(object):
+    def __init__(self, log_types, files_state, results):
+        self.log_types = log_types
+        self.files_state = files_state
+        self.results = results
+
+
+class ResultCache(object):
+    """
+    Size-bounded cache of results of investigations with LRU eviction.
+    Results are keyed by effect line and temporary assignment of files to log types.
+    They are valid only for the config and its revision, for which they were computed,
+    and as long as the set of files of investigated log types and (inode, size, mtime)
+    of these files do not change.
+    Results of investigations, which searched files on other hosts, are not cached.
+    Config is referenced weakly, because id of garbage collected config
+    may be reused by other config.
+    """
+
+    def __init__(self, max_size=CacheConsts.DEFAULT_MAX_RESULTS_COUNT):
+        self._max_size = max_size
+        self._entries = OrderedDict()
+        self._config_ref = None
+        self._config_revision = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # lock and weak reference cannot be pickled, it happens when log reader is sent
+        # to other process, and results are valid only for config of this process
+        return {'_max_size': self._max_size}
+
+    def __setstate__(self, state):
+        self.__init__(state['_max_size'])
+
+    def __len__(self):
+        return len(self._entries)
+
+    @classmethod
+    def _create_key(cls, front_input, tmp_assign_to_log_type):
+        line_source = front_input.line_source
+        assigned_files = tuple(
+            sorted(
+                (log_type.name, tuple((source.host, source.path) for source in line_sources))
+                for log_type, line_sources in six.iteritems(tmp_assign_to_log_type)
+            )
+        )  # yapf: disable
+        return (
+            front_input.offset, front_input.line_content, line_source.host, line_source.path,
+            assigned_files
+        )
+
+    @classmethod
+    def get_files_state(cls, log_types, tmp_assign_to_log_type):
+        """
+        returns sorted tuple of (path, inode, size, mtime) of all files of log types,
+        or None if some of them are on other hosts
+        """
+        files_state = set()
+        for log_type in log_types:
+            for host, path, _ in log_type.files_to_parse(tmp_assign_to_log_type.get(log_type)):
+                if host != 'localhost':
+                    return None
+                file_stat = os.stat(path)
+                files_state.add((path, file_stat.st_ino, file_stat.st_size, file_stat.st_mtime))
+        return tuple(sorted(files_state))
+
+    def _validate_config_version(self, config):
+        # all results are dropped when config changes
+        cached_config = None if self._config_ref is None else self._config_ref()
+        if cached_config is not config or self._config_revision != config.revision:
+            self._entries.clear()
+            self._config_ref = weakref.ref(config)
+            self._config_revision = config.revision
+
+    def get(self, config, front_input, tmp_assign_to_log_type):
+        """
+        returns cached list of InvestigationResults or None if there is no valid one
+        """
+        key = self._create_key(front_input, tmp_assign_to_log_type)
+        with self._lock:
+            self._validate_config_version(config)
+            entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        try:
+            files_state = self.get_files_state(entry.log_types, tmp_assign_to_log_type)
+        except (IOError, OSError):
+            return None
+        if files_state != entry.files_state:
+            return None
+        with self._lock:
+            # the most recently used entry is moved to the end
+            self._entries[key] = entry
+        return list(entry.results)
+
+    def put(self, config, front_input, tmp_assign_to_log_type, log_types, files_state, results):
+        """
+        :param files_state: state of files of investigated log types taken before investigation
+        """
+        if files_state is None:
+            return
+        key = self._create_key(front_input, tmp_assign_to_log_type)
+        with self._lock:
+            self._validate_config_version(config)
+            self._entries.pop(key, None)
+            self._entries[key] = ResultCacheEntry(log_types, files_state, list(results))
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
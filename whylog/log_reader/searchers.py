@@ -1,3 +1,6 @@
+import mmap
+import os
+import tempfile
 from abc import ABCMeta, abstractmethod
 from collections import defaultdict
 from os import SEEK_SET
@@ -6,98 +9,199 @@ import six
 
 from whylog.config.investigation_plan import InvestigationStep, LineSource
 from whylog.config.utils import CompareResult
+from whylog.investigation_stats import InvestigationStats
+from whylog.log_reader.block_cache import CachedFile
+from whylog.log_reader.compressed_files import has_random_access, is_compressed, open_log_file
 from whylog.log_reader.const import BufsizeConsts
+from whylog.log_reader.file_metadata import DEFAULT_FILE_METADATA_CACHE
+from whylog.log_reader.key_index import DEFAULT_INDEX_STORAGE
+from whylog.log_reader.probes import BisectionProbes, InterpolationProbes
 from whylog.log_reader.read_utils import ReadUtils
 
 
 @six.add_metaclass(ABCMeta)
 class AbstractSearcher(object):
     @abstractmethod
-    def search(self, original_front_input):
+    def search(self, original_front_input, budget=None):
         """
         transfer investigation to searcher
+        :param budget: InvestigationBudget, search is stopped when it is exhausted
         """
         pass
 
-
-class IndexSearcher(AbstractSearcher):
-    def search(self, original_front_input):
-        pass
-
-
-class DatabaseSearcher(AbstractSearcher):
-    def search(self, original_front_input):
-        pass
+    @classmethod
+    def _merge_clues(cls, collector, clues_from_line):
+        for parser_name, clue in six.iteritems(clues_from_line):
+            collector[parser_name].append(clue)
 
 
 class BacktrackSearcher(AbstractSearcher):
-    def __init__(self, file_path, investigation_step, super_parser):
+    def __init__(
+        self,
+        file_path,
+        investigation_step,
+        super_parser,
+        use_mmap=False,
+        file_metadata_cache=None,
+        block_cache=None,
+        use_interpolation=False
+    ):
+        """
+        :param block_cache: BlockCache used by all reads of searcher, except memory mapped ones.
+            The process-wide default one is used when it is not specified.
+        :param use_interpolation: if True, search range bounds are found by interpolation search
+            on primary key values instead of bisection
+        """
         self._file_path = file_path
         self._investigation_step = investigation_step
         self._super_parser = super_parser
+        self._use_mmap = use_mmap
+        self._file_metadata_cache = file_metadata_cache or DEFAULT_FILE_METADATA_CACHE
+        self._block_cache = block_cache
+        self._use_interpolation = use_interpolation
 
-    def _find_left(self, opened_file):
-        left = 0
-        right = ReadUtils.size_of_opened_file(opened_file)
-        while left + 1 < right:
-            curr = (left + right) // 2
-            line, line_begin, line_end = ReadUtils.get_line_containing_offset(
-                opened_file, curr, ReadUtils.STANDARD_BUFFER_SIZE
+    def _get_groups_of_line_containing(self, opened_file, offset, budget=None):
+        line, line_begin, line_end = ReadUtils.get_line_containing_offset(
+            opened_file, offset, ReadUtils.STANDARD_BUFFER_SIZE
+        )
+        if budget is not None:
+            budget.consume(len(line) + 1)
+        groups = self._super_parser.get_ordered_groups_from_bytes(line)
+        assert len(groups) <= 1
+        return groups, line_begin, line_end
+
+    def _create_probes(self, opened_file, bound, left, right, budget=None):
+        if not self._use_interpolation:
+            return BisectionProbes(self._investigation_step, bound)
+        probes = InterpolationProbes(self._investigation_step, bound)
+        if left + 1 < right:
+            # keys of lines at both ends of searched interval are the base of the first estimation
+            probes.update_left(self._get_groups_of_line_containing(opened_file, left, budget)[0])
+            probes.update_right(
+                self._get_groups_of_line_containing(opened_file, right - 1, budget)[0]
+            )
+        return probes
+
+    def _find_left(self, opened_file, left=0, right=None, budget=None):
+        """
+        returns the offset of the first line which is not before the left bound
+        of investigation step, searching between left and right offsets.
+        Lines read by probes are charged to budget, and the returned offset is not exact
+        when it is exhausted.
+        """
+        if right is None:
+            right = ReadUtils.size_of_opened_file(opened_file)
+        probes = self._create_probes(
+            opened_file, InvestigationStep.LEFT_BOUND, left, right, budget
+        )
+        stats = InvestigationStats.get_active()
+        while left + 1 < right and not self._is_exhausted(budget):
+            curr = probes.next_probe(left, right)
+            if stats is not None:
+                stats.bisection_probes += 1
+            groups, line_begin, line_end = self._get_groups_of_line_containing(
+                opened_file, curr, budget
             )
-            groups = self._super_parser.get_ordered_groups(line)
-            assert len(groups) <= 1
             if self._investigation_step.compare_with_bound(
                 InvestigationStep.LEFT_BOUND, groups
             ) == CompareResult.LT:
                 # omit actual line and go right
                 left = line_end + 1
+                probes.update_left(groups)
             else:
                 # going left, omit actual line, but maybe it will be returned
                 right = line_begin
+                probes.update_right(groups)
         return right
 
-    def _find_right(self, opened_file):
-        left = 0
-        right = ReadUtils.size_of_opened_file(opened_file)
-        while left + 1 < right:
-            curr = (left + right) // 2
-            line, line_begin, line_end = ReadUtils.get_line_containing_offset(
-                opened_file, curr, ReadUtils.STANDARD_BUFFER_SIZE
+    def _find_right(self, opened_file, left=0, right=None, budget=None):
+        """
+        returns the offset of the end of the last line which is not after the right bound
+        of investigation step, searching between left and right offsets.
+        Budget is charged like in _find_left.
+        """
+        if right is None:
+            right = ReadUtils.size_of_opened_file(opened_file)
+        probes = self._create_probes(
+            opened_file, InvestigationStep.RIGHT_BOUND, left, right, budget
+        )
+        stats = InvestigationStats.get_active()
+        while left + 1 < right and not self._is_exhausted(budget):
+            curr = probes.next_probe(left, right)
+            if stats is not None:
+                stats.bisection_probes += 1
+            groups, line_begin, line_end = self._get_groups_of_line_containing(
+                opened_file, curr, budget
             )
-            groups = self._super_parser.get_ordered_groups(line)
-            assert len(groups) <= 1
             if self._investigation_step.compare_with_bound(InvestigationStep.RIGHT_BOUND, groups)\
                     in [CompareResult.LT, CompareResult.EQ]:
                 # go to the end of current line, maybe it will be returned
                 left = line_end
+                probes.update_left(groups)
             else:
                 # going left, current line is not interesting
                 right = line_begin - 1
-        if right == 0:
+                probes.update_right(groups)
+        if right <= 0:
             return 0
         _, _, end_offset = ReadUtils.get_line_containing_offset(
             opened_file, right - 1, ReadUtils.STANDARD_BUFFER_SIZE
         )
         return end_offset + 1
 
-    def _find_offsets_range(self, original_front_input):
+    def _open_file(self):
+        return CachedFile(self._file_path, self._block_cache)
+
+    def _find_offsets_range(self, original_front_input, budget=None):
         """
         returns a pair of offsets between whose the investigation
         in file should be provided
         """
-        with open(self._file_path) as fd:
-            left_bound = self._find_left(fd)
+        if not has_random_access(self._file_path):
+            return self._scan_offsets_range(original_front_input, budget)
+        with self._open_file() as fd:
+            left_bound = self._find_left(fd, budget=budget)
             if original_front_input.line_source.path == self._file_path:
                 # TODO checking if host is also the same
                 right_bound = original_front_input.offset
             else:
-                right_bound = self._find_right(fd)
+                right_bound = self._find_right(fd, budget=budget)
         return left_bound, right_bound
 
-    @classmethod
-    def _merge_clues(cls, collector, clues_from_line):
-        for parser_name, clue in six.iteritems(clues_from_line):
-            collector[parser_name].append(clue)
+    def _scan_offsets_range(self, original_front_input, budget=None):
+        """
+        finds the same offsets as _find_offsets_range, but by sequential read of file,
+        because every probe of bisection would decompress compressed file
+        without random access from the beginning of stream
+        """
+        if original_front_input.line_source.path == self._file_path:
+            right_limit = original_front_input.offset
+        else:
+            right_limit = None
+        left_bound = None
+        offset = 0
+        with open_log_file(self._file_path) as fd:
+            for line in iter(fd.readline, b''):
+                if right_limit is not None and offset >= right_limit:
+                    break
+                if budget is not None and not budget.consume(len(line)):
+                    break
+                groups = self._super_parser.get_ordered_groups_from_bytes(line.rstrip(b'\n'))
+                if groups:
+                    if self._investigation_step.compare_with_bound(
+                        InvestigationStep.RIGHT_BOUND, groups
+                    ) == CompareResult.GT:
+                        break
+                    if left_bound is None and self._investigation_step.compare_with_bound(
+                        InvestigationStep.LEFT_BOUND, groups
+                    ) != CompareResult.LT:
+                        left_bound = offset
+                offset += len(line)
+        if right_limit is not None:
+            offset = right_limit
+        if left_bound is None:
+            return offset, offset
+        return left_bound, offset
 
     @classmethod
     def _decrease_actual_offset_properly(cls, actual_offset, drop_string):
@@ -109,43 +213,261 @@ class BacktrackSearcher(AbstractSearcher):
         lines in reverse order and offsets corresponding to them,
         beginning with the specified offset
         """
-        with open(self._file_path) as fh:
-            fh.seek(offset)
-            total_size = remaining_size = fh.tell()
-            reverse_offset = 0
-            actual_offset = offset
-            truncated = None
+        with self._open_file() as fh:
+            for line, actual_offset in self._reverse_from_offset_of_opened_file(
+                fh, offset, buf_size
+            ):
+                yield line, actual_offset
+
+    def _reverse_from_offset_of_opened_file(self, fh, offset, buf_size):
+        fh.seek(offset)
+        total_size = remaining_size = fh.tell()
+        reverse_offset = 0
+        actual_offset = offset
+        truncated = None
+        while remaining_size > 0:
+            reverse_offset = min(total_size, reverse_offset + buf_size)
+            fh.seek(total_size - reverse_offset, SEEK_SET)
+            buffer_ = fh.read(min(remaining_size, buf_size))
+            lines = buffer_.split(b'\n')
+            remaining_size -= buf_size
+            if truncated is not None:
+                if buffer_[-1:] != b'\n':
+                    lines[-1] += truncated
+                else:
+                    actual_offset = self._decrease_actual_offset_properly(
+                        actual_offset, truncated
+                    )
+                    yield truncated, actual_offset
+            truncated = lines[0]
+            for line in reversed(lines[1:]):
+                if len(line):
+                    actual_offset = self._decrease_actual_offset_properly(actual_offset, line)
+                    yield line, actual_offset
+        if truncated:
+            actual_offset = self._decrease_actual_offset_properly(actual_offset, truncated)
+            yield truncated, actual_offset
+
+    def _reverse_from_decompressed_copy(self, offset, stop_offset):
+        """
+        a generator that returns the same pairs as _reverse_from_offset for compressed file
+        without random access. Content between stop_offset and offset is decompressed once
+        to temporary file, which is read backwards instead of the compressed file.
+        """
+        with open_log_file(self._file_path) as fd, tempfile.TemporaryFile() as copy:
+            fd.seek(stop_offset)
+            remaining_size = offset - stop_offset
             while remaining_size > 0:
-                reverse_offset = min(total_size, reverse_offset + buf_size)
-                fh.seek(total_size - reverse_offset, SEEK_SET)
-                buffer_ = fh.read(min(remaining_size, buf_size))
-                lines = buffer_.split('\n')
-                remaining_size -= buf_size
-                if truncated is not None:
-                    if buffer_[-1] is not '\n':
-                        lines[-1] += truncated
-                    else:
-                        actual_offset = self._decrease_actual_offset_properly(
-                            actual_offset, truncated
-                        )
-                        yield truncated, actual_offset
-                truncated = lines[0]
-                for line in reversed(lines[1:]):
-                    if len(line):
-                        actual_offset = self._decrease_actual_offset_properly(actual_offset, line)
-                        yield line, actual_offset
-            if truncated:
-                actual_offset = self._decrease_actual_offset_properly(actual_offset, truncated)
-                yield truncated, actual_offset
-
-    def search(self, original_front_input):
+                data = fd.read(min(remaining_size, BufsizeConsts.STANDARD_BUF_SIZE))
+                if not data:
+                    break
+                copy.write(data)
+                remaining_size -= len(data)
+            for line, actual_offset in self._reverse_from_offset_of_opened_file(
+                copy, offset - stop_offset, BufsizeConsts.STANDARD_BUF_SIZE
+            ):
+                yield line, actual_offset + stop_offset
+
+    def _reverse_from_offset_mmap(self, offset, stop_offset=0):
+        """
+        a generator that returns the same pairs as _reverse_from_offset, but walks
+        backwards over memory mapped file, so lines are neither split nor stitched together.
+        Line is copied from mapped file only if it begins at stop_offset or after it.
+        """
+        for mapped_file, line_begin, line_end in self._reverse_line_bounds_mmap(
+            offset, stop_offset
+        ):
+            yield mapped_file[line_begin:line_end], line_begin
+
+    def _reverse_examined_lines_mmap(self, offset, stop_offset):
+        """
+        works like _reverse_examined_lines, but line, which contains no literal required
+        by parsers of investigation step, is rejected in memory mapped file, so it is not copied
+        """
+        for mapped_file, line_begin, line_end in self._reverse_line_bounds_mmap(
+            offset, stop_offset
+        ):
+            if self._investigation_step.may_match_range(mapped_file, line_begin, line_end):
+                yield mapped_file[line_begin:line_end], line_begin, line_end - line_begin
+            else:
+                yield None, line_begin, line_end - line_begin
+
+    def _reverse_line_bounds_mmap(self, offset, stop_offset):
+        """
+        a generator that returns triples of memory mapped file, offset of line beginning
+        and offset of line end for non empty lines from offset backwards to stop_offset
+        """
+        if offset == 0 or os.path.getsize(self._file_path) == 0:
+            return
+        with open(self._file_path, 'rb') as fh:
+            mapped_file = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                line_end = offset
+                while line_end > 0:
+                    line_begin = mapped_file.rfind(b'\n', 0, line_end) + 1
+                    if line_begin < stop_offset:
+                        return
+                    if line_begin < line_end:
+                        yield mapped_file, line_begin, line_end
+                    line_end = line_begin - 1
+            finally:
+                mapped_file.close()
+
+    def _reverse_lines_in_range(self, left_bound, right_bound):
+        if not is_compressed(self._file_path):
+            if self._use_mmap:
+                return self._reverse_from_offset_mmap(right_bound, left_bound)
+        elif not has_random_access(self._file_path):
+            return self._reverse_from_decompressed_copy(right_bound, left_bound)
+        # decompressed content of compressed file cannot be memory mapped
+        return self._reverse_from_offset(right_bound)
+
+    def _reverse_examined_lines(self, left_bound, right_bound):
+        """
+        a generator that returns triples of line, its offset and its length in bytes
+        for lines in range, in reverse order. Line is None if it was rejected
+        without being read, because it certainly contains no clues.
+        """
+        if self._use_mmap and not is_compressed(self._file_path):
+            return self._reverse_examined_lines_mmap(right_bound, left_bound)
+        return (
+            (line, actual_offset, len(line))
+            for line, actual_offset in self._reverse_lines_in_range(left_bound, right_bound)
+        )
+
+    def _may_contain_clues(self, budget=None):
+        """
+        checks basing on cached primary keys of the first and the last line of file,
+        whether file can contain any line from the search range.
+        File is opened here only if its actual version is not cached yet.
+        """
+        metadata = self._file_metadata_cache.get_metadata(
+            self._file_path, self._super_parser, budget
+        )
+        return metadata.may_intersect(self._investigation_step)
+
+    @classmethod
+    def _is_exhausted(cls, budget):
+        return budget is not None and budget.is_exhausted()
+
+    def search(self, original_front_input, budget=None):
         clues = defaultdict(list)
-        left_bound, right_bound = self._find_offsets_range(original_front_input)
-        for line, actual_offset in self._reverse_from_offset(right_bound):
+        if self._is_exhausted(budget):
+            return clues
+        stats = InvestigationStats.get_active()
+        if not self._may_contain_clues(budget):
+            if stats is not None:
+                stats.files_skipped += 1
+            return clues
+        if self._is_exhausted(budget):
+            return clues
+        left_bound, right_bound = self._find_offsets_range(original_front_input, budget)
+        if self._is_exhausted(budget):
+            return clues
+        for line, actual_offset, line_length in self._reverse_examined_lines(
+            left_bound, right_bound
+        ):
             if actual_offset < left_bound:
                 return clues
+            if budget is not None and not budget.consume(line_length + 1):
+                return clues
+            if stats is not None:
+                stats.lines_scanned += 1
+                stats.bytes_read += line_length + 1
+            if line is None:
+                continue
             # TODO: remove mock
             line_source = LineSource('localhost', self._file_path)
-            clues_from_line = self._investigation_step.get_clues(line, actual_offset, line_source)
+            clues_from_line = self._investigation_step.get_clues_from_bytes(
+                line, actual_offset, line_source
+            )
             self._merge_clues(clues, clues_from_line)
         return clues
+
+
+class IndexSearcher(BacktrackSearcher):
+    """
+    BacktrackSearcher which narrows binary search of search range bounds to small windows
+    found in SparseKeyIndex of searched file, so only a few reads are necessary to find them.
+    """
+
+    def __init__(
+        self,
+        file_path,
+        investigation_step,
+        super_parser,
+        index_storage=None,
+        use_mmap=False,
+        file_metadata_cache=None,
+        block_cache=None,
+        use_interpolation=False
+    ):
+        super(IndexSearcher, self).__init__(
+            file_path, investigation_step, super_parser, use_mmap, file_metadata_cache,
+            block_cache, use_interpolation
+        )
+        self._index_storage = index_storage or DEFAULT_INDEX_STORAGE
+        self._index = None
+
+    def _get_index(self, budget=None):
+        if self._index is None:
+            self._index = self._index_storage.get_index(
+                self._file_path, self._super_parser, budget
+            )
+        return self._index
+
+    def _find_left(self, opened_file, left=0, right=None, budget=None):
+        left, right = self._get_index(budget).get_left_window(self._investigation_step)
+        return super(IndexSearcher, self)._find_left(opened_file, left, right, budget)
+
+    def _find_right(self, opened_file, left=0, right=None, budget=None):
+        left, right = self._get_index(budget).get_right_window(self._investigation_step)
+        return super(IndexSearcher, self)._find_right(opened_file, left, right, budget)
+
+
+class DatabaseSearcher(AbstractSearcher):
+    """
+    Finds clues in ClueDatabase instead of scanning log file.
+    Files which were not ingested, changed after ingestion or were not parsed
+    by all parsers of investigation step are searched by BacktrackSearcher.
+    It should be created by partial, e.g. partial(DatabaseSearcher, clue_database=database).
+    """
+
+    def __init__(self, file_path, investigation_step, super_parser, clue_database):
+        self._file_path = file_path
+        self._investigation_step = investigation_step
+        self._super_parser = super_parser
+        self._clue_database = clue_database
+
+    def search(self, original_front_input, budget=None):
+        file_id = self._clue_database.get_ingested_file_id(
+            self._file_path, self._investigation_step.parser_names
+        )
+        if file_id is None:
+            return BacktrackSearcher(
+                self._file_path, self._investigation_step, self._super_parser
+            ).search(original_front_input, budget)
+        key_range = self._clue_database.get_key_range(self._investigation_step, self._super_parser)
+        offset_limit = None
+        if original_front_input.line_source.path == self._file_path:
+            offset_limit = original_front_input.offset
+        # TODO: remove mock
+        line_source = LineSource('localhost', self._file_path)
+        clues = defaultdict(list)
+        stats = InvestigationStats.get_active()
+        for parser_name in self._investigation_step.parser_names:
+            for line_offset, raw_groups, line in self._clue_database.find_clues_rows(
+                file_id, parser_name, key_range, offset_limit
+            ):
+                if budget is not None and not budget.consume(len(line) + 1):
+                    return clues
+                if stats is not None:
+                    stats.lines_scanned += 1
+                    stats.bytes_read += len(line) + 1
+                self._merge_clues(
+                    clues,
+                    self._investigation_step.get_clues_from_parsers_groups(
+                        {parser_name: raw_groups}, line, line_offset, line_source
+                    )
+                )
+        return clues
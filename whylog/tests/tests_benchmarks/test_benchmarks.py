@@ -0,0 +1,77 @@
+import os.path
+import shutil
+import tempfile
+from unittest import TestCase
+
+from whylog.benchmarks import (
+    BenchmarkResult, BenchmarkSuite, BenchmarkWorkload, SyntheticLogGenerator
+)
+from whylog.benchmarks.generators import LOG_TYPE_NAME
+from whylog.config.parser_subset import ConcatenatedRegexParser
+from whylog.log_reader.file_metadata import DEFAULT_FILE_METADATA_CACHE
+
+
+class TestBenchmarks(TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_generated_log_is_deterministic(self):
+        generator = SyntheticLogGenerator(seed=7, lines_count=2000, lines_per_second=10)
+        lines = list(generator.iter_lines())
+        assert lines == list(SyntheticLogGenerator(7, 2000, 10).iter_lines())
+        assert lines != list(SyntheticLogGenerator(8, 2000, 10).iter_lines())
+        assert len(lines) == 2000
+        # lines are ordered by time
+        assert lines == sorted(lines, key=lambda line: line[0][:19])
+        assert lines[-1][0].startswith('2016-01-01 00:03:19 ')
+
+    def test_parsers_match_generated_lines(self):
+        generator = SyntheticLogGenerator(lines_count=3000, hit_ratio=0.1, effect_ratio=0.01)
+        workload = BenchmarkWorkload(self.test_dir, generator)
+        parser = ConcatenatedRegexParser(workload.config.get_parsers_of_log_type(LOG_TYPE_NAME))
+        matched_parsers = [
+            parser.get_extracted_parsers_params(line) for line, _ in generator.iter_lines()
+        ]
+        effects_count = len(workload.effect_front_inputs)
+        assert effects_count == sum('effect' in params for params in matched_parsers)
+        assert 0 < effects_count < sum(bool(params) for params in matched_parsers)
+        front_input = workload.effect_front_inputs[0]
+        with open(workload.log_path, 'rb') as log_file:
+            log_file.seek(front_input.offset)
+            assert log_file.readline().decode('utf-8') == front_input.line_content + '\n'
+
+    def test_latency_percentiles(self):
+        result = BenchmarkResult('test', [0.4, 0.1, 0.3, 0.2], 2, 10, 0, None)
+        assert result.get_latency_percentile(50) == 0.2
+        assert result.get_latency_percentile(99) == 0.4
+        assert abs(result.items_per_second - 20) < 1e-9
+        assert result.bytes_per_second is None
+
+    def test_suite(self):
+        workload = BenchmarkWorkload(
+            self.test_dir, SyntheticLogGenerator(lines_count=1000, effect_ratio=0.01)
+        )
+        results = BenchmarkSuite(workload, rounds=1, investigations_count=2).run_all()
+        assert [result.name for result in results] == [
+            'ReadUtils.get_line_containing_offset', 'ConcatenatedRegexParser',
+            'BacktrackSearcher.search (cold caches)', 'BacktrackSearcher.search (warm caches)',
+            'Verifier.constraints_and', 'LogReader.get_causes'
+        ]
+        for result in results:
+            assert result.latencies
+            assert all(latency >= 0 for latency in result.latencies)
+        assert len(results[-1].latencies) == 2
+        assert os.path.isfile(workload.log_path)
+
+    def test_searcher_benchmark_does_not_use_default_caches(self):
+        workload = BenchmarkWorkload(
+            self.test_dir, SyntheticLogGenerator(lines_count=1000, effect_ratio=0.01)
+        )
+        suite = BenchmarkSuite(workload, rounds=2, investigations_count=2)
+        for cold_caches in (True, False):
+            result = suite.benchmark_backtrack_searcher(cold_caches)
+            assert len(result.latencies) == 2 * result.items_count
+        assert workload.log_path not in DEFAULT_FILE_METADATA_CACHE._metadata
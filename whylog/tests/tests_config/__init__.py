@@ -1,5 +1,6 @@
 import os.path
 import shutil
+import tempfile
 from unittest import TestCase
 
 import six
@@ -114,7 +115,9 @@ class TestBasic(TestCase):
 
         path_config = ['whylog', 'tests', 'tests_config', 'test_files', '.whylog', 'config.yaml']
         path = os.path.join(*path_config)
-        cls.config = SettingsFactorySelector.load_settings(path)['config']
+        cls.snapshot_dir = tempfile.mkdtemp()
+        snapshot_path = os.path.join(cls.snapshot_dir, YamlFileNames.config_snapshot)
+        cls.config = SettingsFactorySelector.load_settings(path, snapshot_path)['config']
 
     def test_simple_transform(self):
         rule = RegexRuleFactory.create_from_intent(self.user_intent)
@@ -173,6 +176,11 @@ class TestBasic(TestCase):
         ordered = [parser.name for parser in added_rule.get_causes_parsers()]
         ordered.sort()
         assert ordered == ["connectionerror", "datamigration"]
+        parsers, _ = config._find_matching_parsers(
+            "2016-04-12 23:54:43 Data is missing at comp2. Loss = 150 GB. Host name: host2",
+            'default'
+        )
+        assert [parser.name for parser in parsers] == ['lostdata']
 
     def test_log_type_rename(self):
         whylog_dir = SettingsFactorySelector._attach_whylog_dir(os.getcwd())
@@ -216,6 +224,7 @@ class TestBasic(TestCase):
 
     @classmethod
     def tearDownClass(cls):
+        shutil.rmtree(cls.snapshot_dir)
         # remove .test_directory if test test_add_new_rule_to_empty_config failed
         test_whylog_dir = SettingsFactorySelector._attach_whylog_dir(os.getcwd())
         if os.path.isdir(test_whylog_dir):
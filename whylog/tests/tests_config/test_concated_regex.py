@@ -6,7 +6,8 @@ import six
 from whylog.assistant.const import AssistantType
 from whylog.assistant.pattern_match import ParamGroup
 from whylog.config.parser_subset import ConcatenatedRegexParser
-from whylog.config.parsers import RegexParserFactory
+from whylog.config.parsers import RegexParser, RegexParserFactory
+from whylog.config.super_parser import RegexSuperParser
 from whylog.teacher.user_intent import UserParserIntent
 
 # convertions
@@ -206,3 +207,82 @@ class TestConcatedRegexParser(TestCase):
         )
 
         self.is_three_lost_data_parsers_matched(concatenated)
+
+    def test_matching_not_decoded_lines(self):
+        concatenated = ConcatenatedRegexParser(
+            [
+                self.connection_error, self.data_migration, self.lost_data, self.root_cause,
+                self.lost_data_date, self.lost_data_suffix
+            ]
+        )
+
+        for line in [
+            "aaaaa", self.connection_error_line, self.data_migration_line, self.lost_data_line,
+            self.root_cause_line
+        ]:
+            assert concatenated.get_extracted_parsers_params_from_bytes(
+                line.encode('utf-8')
+            ) == concatenated.get_extracted_parsers_params(line)
+            assert concatenated.convert_parsers_groups_from_matched_bytes(line.encode('utf-8')) == \
+                concatenated.convert_parsers_groups_from_matched_line(line)
+
+    def test_matching_not_decoded_non_ascii_lines(self):
+        failure_parser = RegexParser(
+            'failure', 'line', u"^(\\w+) failed on (\\S+)$", [], 'default', {}
+        )
+        code_parser = RegexParser('code', 'line', u"^.{6} failed on ([^ ]{4})", [], 'default', {})
+        super_parser = RegexSuperParser(u"^(\\w+) ", [1], {})
+        line = u'za\u017c\u00f3\u0142\u0107 failed on h\u00f3st'
+        expected_params = {
+            'failure': (u'za\u017c\u00f3\u0142\u0107', u'h\u00f3st'),
+            'code': (u'h\u00f3st', ),
+        }
+
+        for parsers in ([failure_parser, code_parser], [failure_parser], [code_parser]):
+            concatenated = ConcatenatedRegexParser(parsers)
+            assert concatenated.get_extracted_parsers_params_from_bytes(line.encode('utf-8')) == \
+                dict((parser.name, expected_params[parser.name]) for parser in parsers)
+        assert failure_parser.get_regex_params_from_bytes(line.encode('utf-8')) == \
+            expected_params['failure']
+        assert super_parser.get_ordered_groups_from_bytes(line.encode('utf-8')) == [
+            ('string', u'za\u017c\u00f3\u0142\u0107')
+        ]
+
+    def test_matching_parsers_in_order_of_parsers(self):
+        parser_list = [
+            self.lost_data_suffix, self.dummy_parser, self.lost_data_date, self.connection_error,
+            self.lost_data
+        ]
+        concatenated = ConcatenatedRegexParser(parser_list)
+
+        matching_parsers = concatenated.get_matching_parsers(self.lost_data_line)
+        assert [parser.name for parser, _ in matching_parsers] == [
+            self.lost_data_suffix.name, self.lost_data_date.name, self.lost_data.name
+        ]
+        assert dict(
+            (parser.name, groups) for parser, groups in matching_parsers
+        ) == concatenated.get_extracted_parsers_params(self.lost_data_line)
+        assert concatenated.get_matching_parsers("aaaaa") == []
+
+    def test_parsers_which_cannot_be_concatenated(self):
+        parser_list = [
+            RegexParser('repeated', 'line', r'^(\w+) \1$', [], 'default', {}),
+            RegexParser('host_down', 'line', r'^(?P<host>\w+) down$', [], 'default', {}),
+            RegexParser('disk_full', 'line', r'^(?:disk|drive) (\w+) full$', [], 'default', {}),
+            RegexParser('host_state', 'line', r'^(?P<host>\w+) (down|up)$', [], 'default', {}),
+            RegexParser('error', 'line', r'(?i)^error (\d+)$', [], 'default', {}),
+            RegexParser('two_words', 'line', r'^(\w+) (\w+)$', [], 'default', {}),
+        ]
+        concatenated = ConcatenatedRegexParser(parser_list)
+        for line in ["node1 node1", "node1 down", "ERROR 42", "drive sda full", "a b c"]:
+            expected_params = [
+                (parser, parser.get_regex_params(line))
+                for parser in parser_list if parser.get_regex_params(line) is not None
+            ]
+            assert concatenated.get_matching_parsers(line) == expected_params
+            assert concatenated.get_extracted_parsers_params(line) == dict(
+                (parser.name, params) for parser, params in expected_params
+            )
+        assert [parser.name for parser, _ in concatenated.get_matching_parsers("node1 down")] == [
+            'host_down', 'host_state', 'two_words'
+        ]
@@ -0,0 +1,96 @@
+import os.path
+import shutil
+import tempfile
+from unittest import TestCase
+
+from mock import patch
+
+from whylog.config import SettingsFactorySelector
+from whylog.config.config_snapshot import ConfigSnapshot
+from whylog.config.consts import YamlFileNames
+from whylog.config.yaml_config import YamlConfig
+
+PARSER = """---
+name: disk_full
+regex_str: ^(\\d\\d\\d\\d-\\d\\d-\\d\\d \\d\\d:\\d\\d:\\d\\d) disk (\\w+) is full$
+primary_key_groups: [1]
+log_type: default
+convertions: {1: date}
+line_content: 2016-01-01 10:00:00 disk sda is full
+"""
+
+SETTINGS = """---
+parsers_path: %(dir)s/parsers.yaml
+rules_path: %(dir)s/rules.yaml
+log_types_path: %(dir)s/log_types.yaml
+pattern_assistant: regex
+config_type: yaml
+"""
+
+
+class TestConfigSnapshot(TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.config_paths = [
+            os.path.join(self.test_dir, file_name)
+            for file_name in (
+                YamlFileNames.parsers, YamlFileNames.rules, YamlFileNames.default_log_types
+            )
+        ]  # yapf: disable
+        for path in self.config_paths:
+            open(path, 'w').close()
+        self.snapshot_path = os.path.join(self.test_dir, YamlFileNames.config_snapshot)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _write_parser(self):
+        with open(self.config_paths[0], 'w') as parsers_file:
+            parsers_file.write(PARSER)
+
+    def test_snapshot_keyed_by_config_files(self):
+        snapshot = ConfigSnapshot(self.snapshot_path, self.config_paths)
+        key = snapshot.compute_key()
+        assert snapshot.load(key) is None
+        snapshot.save(key, {'state': 1})
+        assert snapshot.load(snapshot.compute_key()) == {'state': 1}
+        self._write_parser()
+        assert snapshot.load(snapshot.compute_key()) is None
+        with open(self.snapshot_path, 'wb') as snapshot_file:
+            snapshot_file.write(b'corrupted')
+        assert snapshot.load(key) is None
+
+    def test_config_loaded_from_snapshot(self):
+        self._write_parser()
+        config = YamlConfig(*self.config_paths, snapshot_path=self.snapshot_path)
+        assert os.path.isfile(self.snapshot_path)
+        # snapshot is JSON readable only by its owner
+        assert os.stat(self.snapshot_path).st_mode & 0o077 == 0
+        with patch.object(YamlConfig, '_load_file_with_config') as load_file_mock:
+            loaded_config = YamlConfig(*self.config_paths, snapshot_path=self.snapshot_path)
+        # YAML files are not parsed again
+        assert not load_file_mock.called
+        assert sorted(loaded_config._parsers) == ['disk_full']
+        assert loaded_config.get_parsers_of_log_type('default')[0].regex_str == \
+            config.get_parsers_of_log_type('default')[0].regex_str
+        assert loaded_config._parser_name_generator is not None
+
+        with open(self.config_paths[0], 'a') as parsers_file:
+            parsers_file.write(PARSER.replace('disk_full', 'disk_is_full'))
+        changed_config = YamlConfig(*self.config_paths, snapshot_path=self.snapshot_path)
+        assert sorted(changed_config._parsers) == ['disk_full', 'disk_is_full']
+
+    def test_snapshot_next_to_settings(self):
+        settings_path = os.path.join(self.test_dir, YamlFileNames.settings)
+        with open(settings_path, 'w') as settings_file:
+            settings_file.write(SETTINGS % {'dir': self.test_dir})
+        SettingsFactorySelector.load_settings(settings_path)
+        assert os.path.isfile(self.snapshot_path)
+
+    def test_snapshot_of_other_user_is_not_loaded(self):
+        snapshot = ConfigSnapshot(self.snapshot_path, self.config_paths)
+        key = snapshot.compute_key()
+        snapshot.save(key, {'state': 1})
+        with patch.object(os, 'getuid', return_value=os.getuid() + 1):
+            assert snapshot.load(key) is None
+        assert snapshot.load(key) == {'state': 1}
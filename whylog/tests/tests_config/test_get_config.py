@@ -15,6 +15,7 @@ class TestBasic(TestRemovingSettings):
         assert os.path.isdir(predicted_dir_path)
         assert config._parsers_path == os.path.join(predicted_dir_path, YamlFileNames.parsers)
         assert sorted(os.listdir(predicted_dir_path)) == [
+            YamlFileNames.config_snapshot,
             YamlFileNames.default_log_types,
             YamlFileNames.parsers,
             YamlFileNames.rules,
@@ -0,0 +1,49 @@
+from unittest import TestCase
+
+from whylog.config.literal_prefilter import LiteralPrefilter
+from whylog.config.parser_subset import ConcatenatedRegexParser
+from whylog.config.parsers import RegexParser
+
+
+class TestLiteralPrefilter(TestCase):
+    def test_extract_required_literal(self):
+        date_regex = "^(\d\d\d\d-\d\d-\d\d \d\d:\d\d:\d\d) "
+        cases = [
+            (date_regex + "Connection error occurred on (.*)\. Host name: (.*)$",
+             " Connection error occurred on "),
+            (date_regex + "Data (is missing|was lost)", " Data "),
+            ("^(root cause)+$", "root cause"),
+            ("^(?:ab)*c(de)?f$", "c"),
+            ("^(\d+) visible effect$", " visible effect"),
+            ("^\d+ [a-z]+$", " "),
+        ]  # yapf: disable
+        for regex_str, literal in cases:
+            assert LiteralPrefilter.extract_required_literal(regex_str) == literal
+        for regex_str in ["^(\d+)$", "(?i)root cause", "^(a|b)$", "^(x)*$", "^[("]:
+            assert LiteralPrefilter.extract_required_literal(regex_str) is None
+
+    def test_prefilter_of_parsers(self):
+        parsers = [
+            RegexParser(name, 'line', regex_str, [], 'default', {})
+            for name, regex_str in [
+                ('disk_full', "^(\d+) disk (\w+) is full$"),
+                ('disk', "^(\d+) disk (\w+)"),
+                ('error', "^(\d+) error: (.*)$"),
+            ]
+        ]  # yapf: disable
+        prefilter = LiteralPrefilter.create(parsers)
+        assert sorted(prefilter.literals) == [" disk ", " error: ", " is full"]
+        assert not prefilter.may_match(b"1 request served", True)
+        assert prefilter.may_match(b"1 error: timeout", True)
+        parser_subset = ConcatenatedRegexParser(parsers)
+        assert parser_subset.get_extracted_parsers_params("1 request served") == {}
+        assert parser_subset.get_extracted_parsers_params("1 disk sda is full") == {
+            'disk_full': ('1', 'sda'),
+            'disk': ('1', 'sda'),
+        }
+        # literals are not extracted from all regexes, so all lines are matched by regexes
+        parsers.append(RegexParser('number', 'line', "^(\d+)$", [], 'default', {}))
+        assert LiteralPrefilter.create(parsers) is None
+        assert ConcatenatedRegexParser(parsers).get_extracted_parsers_params("12") == {
+            'number': ('12', )
+        }
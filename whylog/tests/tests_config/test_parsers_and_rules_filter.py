@@ -6,6 +6,7 @@ from unittest import TestCase
 import six
 
 from whylog.config import YamlConfig
+from whylog.config.log_type import LogType
 from whylog.front.utils import FrontInput
 from whylog.tests.utils import ConfigPathFactory
 
@@ -122,3 +123,30 @@ class TestBasic(TestCase):
         assert clue.regex_parameters == (datetime(2015, 12, 3, 12, 11), 'alfa21', '567.02', '101')
         assert clue.line_offset == offset
         assert clue.line_prefix_content == self.lost_data_line
+
+    def test_investigation_plan_parts_are_memoized(self):
+        config = YamlConfig(*ConfigPathFactory.get_path_to_config_files(
+            os.path.join(*path_test_files), False
+        ))  # yapf: disable
+        config._log_types['hydra'] = LogType('hydra', [])
+        # renaming is not saved, so config files are not changed
+        config._save_renamed_log_type = lambda old_name, new_name: None
+        effect_log_type = LogType('filesystem', [])
+        earlier_line = self.lost_data_line.replace('23:54:43', '23:50:00')
+        plans = [
+            config.create_investigation_plan(FrontInput(0, line, None), effect_log_type)
+            for line in (self.lost_data_line, earlier_line)
+        ]
+        steps = [plan.investigation_steps_with_log_types[0][0] for plan in plans]
+        assert steps[0]._parser_subset is steps[1]._parser_subset
+        assert steps[0]._search_ranges != steps[1]._search_ranges
+        assert plans[0].suspected_rules == plans[1].suspected_rules
+        assert plans[0].suspected_rules is not plans[1].suspected_rules
+
+        config.rename_log_type('hydra', 'hydra_cluster')
+        plan = config.create_investigation_plan(
+            FrontInput(0, self.lost_data_line, None), effect_log_type
+        )
+        step, step_log_type = plan.investigation_steps_with_log_types[0]
+        assert step._parser_subset is not steps[0]._parser_subset
+        assert step_log_type.name == 'hydra_cluster'
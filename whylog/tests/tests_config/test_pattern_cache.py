@@ -0,0 +1,89 @@
+import pickle
+import re
+from unittest import TestCase
+
+from whylog.config.parser_subset import ConcatenatedRegexParser
+from whylog.config.parsers import RegexParser, RegexParserFactory
+from whylog.config.pattern_cache import SHARED_PATTERN_CACHE
+from whylog.config.super_parser import RegexSuperParser
+from whylog.config.utils import regex
+from whylog.teacher.user_intent import UserParserIntent
+
+DISK_REGEX = "^(\d+) disk (\w+) is full$"
+ERROR_REGEX = "^(\d+) error: (.*)$"
+
+
+class TestPatternCache(TestCase):
+    def setUp(self):
+        SHARED_PATTERN_CACHE.clear()
+
+    def tearDown(self):
+        SHARED_PATTERN_CACHE.enabled = False
+        SHARED_PATTERN_CACHE.clear()
+
+    def _create_parsers(self):
+        return [
+            RegexParser('disk', 'line', DISK_REGEX, [], 'default', {}),
+            RegexParser('error', 'line', ERROR_REGEX, [], 'default', {}),
+        ]
+
+    def test_lazy_compilation(self):
+        parser = RegexParser('disk', 'line', DISK_REGEX, [], 'default', {})
+        super_parser = RegexSuperParser("^(\d+)", [1], {1: 'int'})
+        assert parser._regex is None
+        assert super_parser._regex is None
+        assert parser.get_regex_params_from_bytes(b"1 disk sda is full") == ('1', 'sda')
+        assert parser._regex is not None
+        assert super_parser.get_ordered_groups("12 error") == [('int', 12)]
+        assert super_parser.serialize()['regex_str'] == "^(\d+)"
+
+        unpickled_parser = pickle.loads(pickle.dumps(parser))
+        assert unpickled_parser._regex is None
+        assert unpickled_parser.get_regex_params("1 disk sdb is full") == ('1', 'sdb')
+        assert len(SHARED_PATTERN_CACHE) == 0
+
+    def test_malformed_regex(self):
+        serialized_parser = self._create_parsers()[0].serialize()
+        serialized_parser['regex_str'] = "^(\d+) disk (\w+ is full$"
+        # regexes loaded from config are not checked until the first use
+        parser = RegexParserFactory.from_dao(serialized_parser)
+        with self.assertRaises(regex.error):
+            parser.get_regex_params("1 disk sda is full")
+        super_parser = RegexSuperParser("^(\d+", [1], {1: 'int'})
+        with self.assertRaises(re.error):
+            super_parser.get_ordered_groups("12 error")
+        # regex given by user is checked on creation
+        parser_intent = UserParserIntent(
+            'regex', 'disk', serialized_parser['regex_str'], 'default', [1], {},
+            "1 disk sda is full", None, None
+        )
+        with self.assertRaises(regex.error):
+            RegexParserFactory.create_from_intent(parser_intent)
+        with self.assertRaises(re.error):
+            super_parser.check_regex()
+
+    def test_shared_cache(self):
+        SHARED_PATTERN_CACHE.enabled = True
+        first_parsers = self._create_parsers()
+        second_parsers = self._create_parsers()
+        assert first_parsers[0].regex is second_parsers[0].regex
+        assert first_parsers[0].regex is not first_parsers[1].regex
+        first_subset = ConcatenatedRegexParser(first_parsers)
+        second_subset = ConcatenatedRegexParser(second_parsers)
+        assert first_subset.get_extracted_parsers_params("1 error: disk sda is full") == {
+            'error': ('1', 'disk sda is full')
+        }
+        assert second_subset.get_extracted_parsers_params("2 disk sda is full") == {
+            'disk': ('2', 'sda')
+        }
+        # concatenated regexes of the same parsers are compiled once
+        assert all(
+            first_regex is second_regex
+            for first_regex, second_regex in zip(
+                first_subset._get_compiled_regexes(),
+                second_subset._get_compiled_regexes()
+            )
+        )  # yapf: disable
+        patterns_count = len(SHARED_PATTERN_CACHE)
+        ConcatenatedRegexParser(self._create_parsers()).get_extracted_parsers_params("3 error: x")
+        assert len(SHARED_PATTERN_CACHE) == patterns_count
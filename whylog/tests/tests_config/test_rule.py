@@ -196,6 +196,26 @@ class TestBasic(TestCase):
         results = rule.constraints_check(clues, effect_clues_dict)
         assert not results
 
+    def test_and_rule_when_some_cause_has_no_clues(self):
+        rule = Rule(
+            [self.cause_a, self.cause_b], self.effect, [
+                {
+                    'clues_groups': [[0, 1], [1, 1], [2, 1]],
+                    'name': 'identical',
+                    'params': {}
+                }
+            ], Rule.LINKAGE_AND
+        )  # yapf: disable
+        effect_clues_dict = {'effect': Clue((42,), '42 dinners', 1420, self.line_source)}
+        # cause_b was not searched at all, e.g. because budget of investigation was exhausted
+        clues = {
+            'cause_a': [
+                Clue((42,), '42 carrots', 420, self.line_source),
+            ]
+        }  # yapf: disable
+        results = rule.constraints_check(clues, effect_clues_dict)
+        assert not results
+
     def test_one_matched_line_when_two_occurrences_requested(self):
         rule = Rule(
             [self.cause_a, self.cause_a], self.effect, [
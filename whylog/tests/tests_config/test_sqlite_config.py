@@ -0,0 +1,186 @@
+import os.path
+import shutil
+import sqlite3
+import tempfile
+import threading
+from contextlib import closing
+from unittest import TestCase
+
+from whylog.assistant.const import AssistantType
+from whylog.assistant.pattern_match import ParamGroup
+from whylog.config import SettingsFactorySelector
+from whylog.config.consts import YamlFileNames
+from whylog.config.filename_matchers import WildCardFilenameMatcher
+from whylog.config.log_type import LogType
+from whylog.config.settings_factory import SQLiteSettingsFactory
+from whylog.config.sqlite_config import SQLiteConfig
+from whylog.config.super_parser import RegexSuperParser
+from whylog.teacher.user_intent import UserConstraintIntent, UserParserIntent, UserRuleIntent
+
+DATE_REGEX = "\\d\\d\\d\\d-\\d\\d-\\d\\d \\d\\d:\\d\\d:\\d\\d"
+
+
+def create_parser_intent(name, content):
+    return UserParserIntent(
+        AssistantType.REGEX,
+        name,
+        "^(%s) %s on (\\w+)$" % (DATE_REGEX, content),
+        'default',
+        [1],
+        {1: ParamGroup("2016-01-01 10:00:00", 'date'), 2: ParamGroup("node1", 'string')},
+        "2016-01-01 10:00:00 %s on node1" % (content, ),
+        line_offset=None,
+        line_resource_location=None
+    )
+
+
+def create_rule_intent(cause_name, effect_name):
+    parsers = {
+        0: create_parser_intent(cause_name, cause_name.replace('_', ' ')),
+        1: create_parser_intent(effect_name, effect_name.replace('_', ' ')),
+    }
+    return UserRuleIntent(1, parsers, [UserConstraintIntent('identical', [[0, 2], [1, 2]])])
+
+
+class TestSQLiteConfig(TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.database_path = os.path.join(self.test_dir, 'config.sqlite')
+        super_parser = RegexSuperParser("^(%s).*" % (DATE_REGEX, ), [1], {1: 'date'})
+        self.matcher = WildCardFilenameMatcher('localhost', '/tmp/*.log', 'default', super_parser)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _count_rows(self, table):
+        with closing(sqlite3.connect(self.database_path)) as connection:
+            return connection.execute('SELECT COUNT(*) FROM %s' % (table, )).fetchone()[0]
+
+    def test_changes_are_saved(self):
+        config = SQLiteConfig(self.database_path)
+        config.add_log_type(LogType('default', [self.matcher]))
+        config.add_rule(create_rule_intent('disk_full', 'write_failed'))
+        config.add_rule(create_rule_intent('network_down', 'write_failed'))
+
+        loaded_config = SQLiteConfig(self.database_path)
+        assert sorted(loaded_config._parsers) == ['disk_full', 'network_down', 'write_failed']
+        assert loaded_config._parsers['disk_full'].convertions == {1: 'date', 2: 'string'}
+        assert [
+            matcher.serialize() for matcher in loaded_config._log_types['default'].filename_matchers
+        ] == [self.matcher.serialize()]
+        rules = loaded_config._rules.get('write_failed')
+        assert [rule.get_causes_parsers()[0].name for rule in rules] == [
+            'disk_full', 'network_down'
+        ]
+        assert loaded_config._rules.get('disk_full') is None
+
+    def test_rename_log_type(self):
+        config = SQLiteConfig(self.database_path)
+        config.add_log_type(LogType('default', [self.matcher]))
+        config.add_rule(create_rule_intent('disk_full', 'write_failed'))
+        config.rename_log_type('default', 'storage')
+
+        loaded_config = SQLiteConfig(self.database_path)
+        assert sorted(loaded_config._log_types) == ['storage']
+        assert loaded_config._log_types['storage'].filename_matchers[0].log_type_name == 'storage'
+        assert sorted(
+            parser.name for parser in loaded_config.get_parsers_of_log_type('storage')
+        ) == ['disk_full', 'write_failed']
+        assert self._count_rows('matchers') == 1
+
+    def test_failed_rename_does_not_change_config(self):
+        config = SQLiteConfig(self.database_path)
+        config.add_log_type(LogType('default', [self.matcher]))
+        config.add_rule(create_rule_intent('disk_full', 'write_failed'))
+        revision = config.revision
+
+        def failing_save(matcher_definition):
+            raise sqlite3.OperationalError('disk I/O error')
+
+        config._save_filename_matcher_definition = failing_save
+        with self.assertRaises(sqlite3.OperationalError):
+            config.rename_log_type('default', 'storage')
+        assert sorted(config._log_types) == ['default']
+        assert config._log_types['default'].filename_matchers[0].log_type_name == 'default'
+        assert sorted(parser.log_type for parser in config._parsers.values()) == [
+            'default', 'default'
+        ]
+        assert config.revision == revision
+        loaded_config = SQLiteConfig(self.database_path)
+        assert sorted(loaded_config._log_types) == ['default']
+        assert self._count_rows('matchers') == 1
+
+    def test_transaction_is_not_shared_with_other_threads(self):
+        config = SQLiteConfig(self.database_path)
+        config.add_rule(create_rule_intent('disk_full', 'write_failed'))
+        connections = []
+        with config._transaction() as connection:
+            thread = threading.Thread(target=lambda: connections.append(config._connection))
+            thread.start()
+            thread.join()
+            assert config._connection is connection
+        assert connections == [None]
+        assert config._connection is None
+
+    def test_failed_change_is_rolled_back(self):
+        config = SQLiteConfig(self.database_path)
+        config.add_rule(create_rule_intent('disk_full', 'write_failed'))
+        original_save = config._save_parsers_definition
+
+        def failing_save(parser_definitions):
+            original_save(parser_definitions)
+            raise sqlite3.OperationalError('disk I/O error')
+
+        config._save_parsers_definition = failing_save
+        with self.assertRaises(sqlite3.OperationalError):
+            config.add_rule(create_rule_intent('network_down', 'read_failed'))
+        assert self._count_rows('rules') == 1
+        assert self._count_rows('parsers') == 2
+        assert sorted(SQLiteConfig(self.database_path)._parsers) == ['disk_full', 'write_failed']
+        # config in memory is not changed by rolled back transaction
+        assert sorted(config._parsers) == ['disk_full', 'write_failed']
+        assert config._rules.get('read_failed') is None
+
+    def test_parsers_added_concurrently(self):
+        configs = [SQLiteConfig(self.database_path), SQLiteConfig(self.database_path)]
+        errors = []
+
+        def add_rules(config, number):
+            try:
+                for rule_number in range(5):
+                    effect_name = 'write_failed_%d_%d' % (number, rule_number)
+                    config.add_rule(create_rule_intent('disk_full', effect_name))
+            except Exception as error:
+                errors.append(error)
+
+        threads = [
+            threading.Thread(target=add_rules, args=(config, number))
+            for number, config in enumerate(configs)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+        assert self._count_rows('rules') == 10
+        # parser added by the other config is not shared, it gets a free name
+        assert self._count_rows('parsers') == 12
+        loaded_parsers = SQLiteConfig(self.database_path)._parsers
+        assert sorted(name for name in loaded_parsers if name.startswith('disk_full')) == [
+            'disk_full', 'disk_full1'
+        ]
+        for number, config in enumerate(configs):
+            # parsers saved before the last change of config are loaded to its memory
+            assert set(config._parsers) <= set(loaded_parsers)
+            assert 'write_failed_%d_4' % (number, ) in config._parsers
+            assert len(config._rules.get('write_failed_%d_4' % (number, ))) == 1
+
+    def test_settings_with_sqlite_config(self):
+        settings_path = SQLiteSettingsFactory.create_new_settings_dir(
+            self.test_dir, '.whylog', 'settings.yaml'
+        )
+        config = SettingsFactorySelector.load_settings(settings_path)['config']
+        assert config._database_path == os.path.join(
+            self.test_dir, '.whylog', YamlFileNames.sqlite_config
+        )
+        assert sorted(config._log_types) == ['default']
@@ -1,4 +1,7 @@
 import os.path
+import shutil
+import tempfile
+from functools import partial
 from unittest import TestCase
 
 import six
@@ -12,6 +15,10 @@ from whylog.config.parser_name_generator import ParserNameGenerator
 from whylog.constraints.verifier import InvestigationResult
 from whylog.front.utils import FrontInput
 from whylog.log_reader import LogReader
+from whylog.log_reader.clue_database import ClueDatabase
+from whylog.log_reader.executors import ProcessSearchExecutor, ThreadSearchExecutor
+from whylog.log_reader.key_index import KeyIndexStorage
+from whylog.log_reader.searchers import BacktrackSearcher, DatabaseSearcher, IndexSearcher
 from whylog.tests.tests_log_reader.constants import TestPaths
 from whylog.tests.utils import ConfigPathFactory
 
@@ -112,6 +119,74 @@ class TestBasic(TestCase):
 
     @generate(*test_names)
     def test_one(self, test_name):
+        self._run_investigation(test_name, LogReader)
+
+    @generate(*test_names)
+    def test_one_with_index_searcher(self, test_name):
+        index_dir = tempfile.mkdtemp()
+        try:
+            index_searcher = partial(IndexSearcher, index_storage=KeyIndexStorage(index_dir))
+            self._run_investigation(test_name, partial(LogReader, searcher_factory=index_searcher))
+        finally:
+            shutil.rmtree(index_dir)
+
+    @generate(*test_names)
+    def test_one_with_mmap(self, test_name):
+        mmap_searcher = partial(BacktrackSearcher, use_mmap=True)
+        self._run_investigation(test_name, partial(LogReader, searcher_factory=mmap_searcher))
+
+    @generate(*test_names)
+    def test_one_with_parallel_search_in_files(self, test_name):
+        for executor in (ThreadSearchExecutor(2), ProcessSearchExecutor(2)):
+            try:
+                self._run_investigation(test_name, partial(LogReader, file_executor=executor))
+            finally:
+                executor.close()
+
+    @generate(*test_names)
+    def test_one_with_concurrent_steps(self, test_name):
+        step_executor = ProcessSearchExecutor(2)
+        file_executor = ThreadSearchExecutor(2)
+        try:
+            self._run_investigation(
+                test_name,
+                partial(LogReader, file_executor=file_executor, step_executor=step_executor)
+            )
+        finally:
+            step_executor.close()
+            file_executor.close()
+
+    @generate(*test_names)
+    def test_one_with_iter_causes(self, test_name):
+        step_executor = ThreadSearchExecutor(2)
+        try:
+            self._run_investigation(
+                test_name, partial(LogReader, step_executor=step_executor), streaming=True
+            )
+        finally:
+            step_executor.close()
+
+    @generate(*test_names)
+    def test_one_with_database_searcher(self, test_name):
+        database_dir = tempfile.mkdtemp()
+        try:
+            clue_database = ClueDatabase(os.path.join(database_dir, 'clues.sqlite'))
+            database_searcher = partial(DatabaseSearcher, clue_database=clue_database)
+            self._run_investigation(
+                test_name,
+                partial(LogReader, searcher_factory=database_searcher),
+                prepare_config=clue_database.ingest
+            )
+        finally:
+            shutil.rmtree(database_dir)
+
+    @generate(*test_names)
+    def test_one_with_batch(self, test_name):
+        self._run_investigation(test_name, LogReader, batch=True)
+
+    def _run_investigation(
+        self, test_name, log_reader_factory, streaming=False, prepare_config=None, batch=False
+    ):
         input_path, original_log_file, path, result_log_file, results_yaml_file = self._prepare_files_path(
             test_name
         )
@@ -121,16 +196,40 @@ class TestBasic(TestCase):
 
         # preparing Whylog structures, normally prepared by Front
         whylog_config = YamlConfig(*ConfigPathFactory.get_path_to_config_files(path))
-        log_reader = LogReader(whylog_config)
+        if prepare_config is not None:
+            prepare_config(whylog_config)
+        log_reader = log_reader_factory(whylog_config)
         effect_line = FrontInput(
             effect_line_offset, line_content,
             LineSource('localhost', os.path.join(path, self._get_starting_file_name(input_path)))
         )
 
-        results = log_reader.get_causes(effect_line)
+        if streaming:
+            results = list(log_reader.iter_causes(effect_line))
+        elif batch:
+            results = self._get_causes_of_all_lines(log_reader, effect_line)
+        else:
+            results = log_reader.get_causes(effect_line)
         expected_results = self._investigation_results_from_yaml(results_yaml_file, result_log_file)
         self._check_results(results, expected_results)
 
+    def _get_causes_of_all_lines(self, log_reader, effect_line):
+        """
+        investigates all lines of effect file in one batch, and checks that their results
+        are the same as results of separate investigations
+        """
+        line_source = effect_line.line_source
+        front_inputs = []
+        offset = 0
+        for line in open(line_source.path):
+            front_inputs.append(FrontInput(offset, line.rstrip('\n'), line_source))
+            offset += len(line)
+        batch_results = log_reader.get_causes_batch(front_inputs)
+        assert len(batch_results) == len(front_inputs)
+        for front_input, results in six.moves.zip(front_inputs, batch_results):
+            assert results == log_reader.get_causes(front_input)
+        return batch_results[front_inputs.index(effect_line)]
+
     @generate(*test_names)
     def test_temporary_file_assign_to_logtype(self, test_name):
         input_path, original_log_file, path, result_log_file, results_yaml_file = self._prepare_files_path(
@@ -171,4 +270,7 @@ class TestBasic(TestCase):
         whylog_config._parsers_grouped_by_log_type[
             "default"
         ] = whylog_config._parsers_grouped_by_log_type.pop("test_log_type")
+        whylog_config._effect_parsers_by_log_type[
+            "default"
+        ] = whylog_config._effect_parsers_by_log_type.pop("test_log_type")
         return whylog_config
@@ -12,7 +12,8 @@ class AFewLinesLogParams(object):
         returns: line content, beginning offset, ending offset
         """
         assert 0 <= offset < cls.NUMBER_OF_LINES * cls.SINGLE_LINE_LENGTH
-        return ('aaa-%d-bbb' % (offset // 10)), (offset // 10) * 10, (offset // 10) * 10 + 9
+        line = ('aaa-%d-bbb' % (offset // 10)).encode('utf-8')
+        return line, (offset // 10) * 10, (offset // 10) * 10 + 9
 
 
 class TestPaths(object):
@@ -22,3 +23,15 @@ class TestPaths(object):
     def get_file_path(cls, filename):
         prefix_path = os.path.join(*TestPaths.path_test_files)
         return os.path.join(prefix_path, filename)
+
+
+# log types file with single log type, which files are matched by path pattern
+LOG_TYPES_TEMPLATE = """log_type_name: test_log_type
+matcher_class_name: WildCardFilenameMatcher
+host_pattern: localhost
+path_pattern: %s
+super_parser:
+  regex_str: '^(\\d\\d\\d\\d-\\d\\d-\\d\\d \\d\\d:\\d\\d:\\d\\d).*'
+  group_order: [1]
+  convertions: {1: date}
+"""
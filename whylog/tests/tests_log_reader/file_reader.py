@@ -5,6 +5,10 @@ import six
 
 
 class DataGeneratorLogSource(object):
+    """
+    Imitates log file opened in binary mode
+    """
+
     def __init__(
         self,
         start_time,
@@ -35,7 +39,7 @@ class DataGeneratorLogSource(object):
             current_line_time.strftime(self._datetime_format),
             (self._line_padding - len(current_line_time_str) - 1) * "r"
         )
-        return current_line
+        return current_line.encode('utf-8')
 
     def _line_lying_on_offset(self, offset):
         line_no = self._deduce_line_no(offset)
@@ -63,7 +67,7 @@ class DataGeneratorLogSource(object):
             last_line_position = self._position_in_line(self._position + size)
             last_line_fragment = self._get_line(last_line_no)[:last_line_position]
             lines_between = self._get_all_lines_between(first_line_no, last_line_no)
-            content = "".join(
+            content = b"".join(
                 itertools.chain(
                     (first_line_fragment,), lines_between, (last_line_fragment,)
                 )
@@ -0,0 +1,151 @@
+import os.path
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from unittest import TestCase
+
+import six
+
+from whylog.config.filename_matchers import WildCardFilenameMatcher
+from whylog.config.investigation_plan import InvestigationStep, LineSource
+from whylog.config.log_type import LogType
+from whylog.config.parser_subset import ConcatenatedRegexParser
+from whylog.config.parsers import RegexParser
+from whylog.config.super_parser import RegexSuperParser
+from whylog.front.utils import FrontInput
+from whylog.log_reader import SearchHandler
+from whylog.log_reader.agent import AgentRegistry, RemoteSearcher, SearchAgent
+from whylog.log_reader.exceptions import AgentError
+from whylog.log_reader.searchers import BacktrackSearcher
+
+
+class TestSearchAgent(TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.start_date = datetime(2016, 1, 1)
+        self.log_path = os.path.join(self.test_dir, 'node.log')
+        with open(self.log_path, 'w') as log_file:
+            for i in six.moves.range(300):
+                date = self.start_date + timedelta(seconds=i)
+                log_file.write('%s %s request %s %s\n' % (date, ('GET', 'POST')[i % 2], i, i / 4.0))
+        self.super_parser = RegexSuperParser(
+            '^(\d\d\d\d-\d\d-\d\d \d\d:\d\d:\d\d).*', [1], {1: 'date'}
+        )
+        self.parsers = [
+            RegexParser(
+                name, 'line', '^(\d\d\d\d-\d\d-\d\d \d\d:\d\d:\d\d) %s request (\d+) (.*)$' %
+                (method,), [1], 'default', {1: 'date', 2: 'int', 3: 'float'}
+            ) for name, method in [('get', 'GET'), ('post', 'POST')]
+        ]
+        self.step = InvestigationStep(
+            ConcatenatedRegexParser(self.parsers), {
+                'date': {
+                    InvestigationStep.LEFT_BOUND: self.start_date + timedelta(seconds=100),
+                    InvestigationStep.RIGHT_BOUND: self.start_date + timedelta(seconds=250)
+                }
+            }
+        )
+        self.agent = SearchAgent(
+            'secret token', allowed_path_patterns=[os.path.join(self.test_dir, '*.log')]
+        )
+        self.agent.start()
+        self.agent_registry = AgentRegistry({'node-1': self.agent.address}, 'secret token')
+
+    def tearDown(self):
+        self.agent.shutdown()
+        shutil.rmtree(self.test_dir)
+
+    def _create_remote_searcher(self, path):
+        return RemoteSearcher(
+            'node-1', path, self.step, self.super_parser, self.agent_registry.get_client('node-1')
+        )
+
+    def test_same_clues_as_in_backtrack_searcher(self):
+        with open(self.log_path, 'rb') as log_file:
+            effect_offset = sum(len(log_file.readline()) for _ in six.moves.range(200))
+        # effect line is in searched file only if it comes from the same host
+        for host, local_path in [('node-1', self.log_path), ('localhost', 'other.log')]:
+            front_input = FrontInput(effect_offset, 'line', LineSource(host, self.log_path))
+            remote_clues = self._create_remote_searcher(self.log_path).search(front_input)
+            local_input = FrontInput(effect_offset, 'line', LineSource('localhost', local_path))
+            local_clues = BacktrackSearcher(self.log_path, self.step, self.super_parser).search(
+                local_input
+            )
+            assert remote_clues
+            assert sorted(remote_clues) == sorted(local_clues)
+            for parser_name, clues in six.iteritems(local_clues):
+                for clue in clues:
+                    clue.line_source = LineSource('node-1', self.log_path)
+                assert remote_clues[parser_name] == clues
+
+    def test_not_allowed_path(self):
+        other_path = os.path.join(self.test_dir, 'secret.txt')
+        with open(other_path, 'w') as other_file:
+            other_file.write('secret\n')
+        front_input = FrontInput(0, 'line', LineSource('localhost', 'other.log'))
+        self.assertRaises(AgentError, self._create_remote_searcher(other_path).search, front_input)
+        assert self.agent_registry.get_client('node-1').list_files(
+            os.path.join(self.test_dir, '*')
+        ) == [self.log_path]
+
+    def test_paths_are_matched_after_resolving_links(self):
+        secret_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, secret_dir)
+        secret_path = os.path.join(secret_dir, 'secret.log')
+        with open(secret_path, 'w') as secret_file:
+            secret_file.write('secret\n')
+        link_path = os.path.join(self.test_dir, 'link.log')
+        os.symlink(secret_path, link_path)
+        sub_dir = os.path.join(self.test_dir, 'sub')
+        os.mkdir(sub_dir)
+        nested_path = os.path.join(sub_dir, 'nested.log')
+        shutil.copy(self.log_path, nested_path)
+        front_input = FrontInput(0, 'line', LineSource('localhost', 'other.log'))
+        escaping_path = os.path.join(
+            self.test_dir, '..', os.path.basename(secret_dir), 'secret.log'
+        )
+        for path in (link_path, nested_path, escaping_path):
+            self.assertRaises(AgentError, self._create_remote_searcher(path).search, front_input)
+        assert self._create_remote_searcher(
+            os.path.join(sub_dir, '..', 'node.log')
+        ).search(front_input)
+
+    def test_no_files_served_by_default(self):
+        agent = SearchAgent('secret token')
+        self.addCleanup(agent.shutdown)
+        assert agent.list_files(os.path.join(self.test_dir, '*')) == []
+        self.assertRaises(AgentError, agent.search, self.log_path, None, None, None)
+
+    def test_requests_without_shared_token_are_rejected(self):
+        front_input = FrontInput(0, 'line', LineSource('localhost', 'other.log'))
+        for token in ('other token', ''):
+            client = AgentRegistry({'node-1': self.agent.address}, token).get_client('node-1')
+            self.assertRaises(AgentError, client.list_files, os.path.join(self.test_dir, '*'))
+            searcher = RemoteSearcher('node-1', self.log_path, self.step, self.super_parser, client)
+            self.assertRaises(AgentError, searcher.search, front_input)
+        self.assertRaises(
+            AgentError, self.agent.handle_request, {
+                'method': 'list_files',
+                'params': {
+                    'path_pattern': self.log_path
+                }
+            }
+        )
+        self.assertRaises(AgentError, SearchAgent, '')
+
+    def test_search_handler_with_remote_hosts(self):
+        matcher = WildCardFilenameMatcher(
+            'node-*', os.path.join(self.test_dir, '*.log'), 'default', self.super_parser
+        )
+        log_type = LogType('default', [matcher])
+        assert list(log_type.files_to_parse(agent_registry=self.agent_registry)) == [
+            ('node-1', self.log_path, self.super_parser)
+        ]
+        front_input = FrontInput(0, 'line', LineSource('localhost', 'other.log'))
+        clues = SearchHandler(self.step, log_type, agent_registry=self.agent_registry).investigate(
+            front_input
+        )
+        assert sorted(clues) == ['get', 'post']
+        self.assertRaises(
+            NotImplementedError, SearchHandler(self.step, log_type).investigate, front_input
+        )
@@ -1,12 +1,27 @@
+# -*- coding: utf-8 -*-
+import mmap
 import os.path
+import tempfile
 from unittest import TestCase
 
 import six
+from mock import patch
 
+from whylog.config.investigation_plan import InvestigationStep
+from whylog.config.parser_subset import ConcatenatedRegexParser
+from whylog.config.parsers import RegexParser
 from whylog.log_reader import searchers
 from whylog.tests.tests_log_reader.constants import AFewLinesLogParams, TestPaths
 
 
+class RecordingMmap(mmap.mmap):
+    slices = []
+
+    def __getitem__(self, key):
+        self.slices.append((key.start, key.stop))
+        return super(RecordingMmap, self).__getitem__(key)
+
+
 class TestBacktrackSearcher(TestCase):
     def _count_lines_in_file(self, file_path):
         return sum(1 for line in open(file_path))
@@ -23,11 +38,11 @@ class TestBacktrackSearcher(TestCase):
         return line_num * AFewLinesLogParams.SINGLE_LINE_LENGTH
 
     def _read_all_lines_from_file(self, file_path):
-        with open(file_path) as f:
+        with open(file_path, 'rb') as f:
             return f.read().splitlines()
 
     def _read_last_n_lines_from_file(self, file_path, how_many_lines):
-        with open(file_path) as f:
+        with open(file_path, 'rb') as f:
             return f.read().splitlines()[:how_many_lines]
 
     def _verify_lines(self, lines_normally, lines_reversed):
@@ -80,3 +95,65 @@ class TestBacktrackSearcher(TestCase):
         log_file_path = TestPaths.get_file_path(AFewLinesLogParams.FILE_NAME)
         offset = 0
         self._run_reverse_and_check_results(log_file_path, [offset], 0)
+
+    def test_mmap_reverse_like_buffered_reverse(self):
+        log_file_path = TestPaths.get_file_path(AFewLinesLogParams.FILE_NAME)
+        backtracker = searchers.BacktrackSearcher(log_file_path, None, None, use_mmap=True)
+        for offset in [0, self._get_sample_offset(7), os.path.getsize(log_file_path)]:
+            assert list(backtracker._reverse_from_offset_mmap(offset)) == \
+                   list(backtracker._reverse_from_offset(offset))
+
+    def test_mmap_reverse_stops_before_stop_offset(self):
+        log_file_path = TestPaths.get_file_path(AFewLinesLogParams.FILE_NAME)
+        backtracker = searchers.BacktrackSearcher(log_file_path, None, None, use_mmap=True)
+        data_reversed = list(
+            backtracker._reverse_from_offset_mmap(
+                self._get_sample_offset(7), self._get_sample_offset(4)
+            )
+        )
+        assert [offset for _, offset in data_reversed] == [
+            self._get_sample_offset(line_num) for line_num in (6, 5, 4)
+        ]
+
+    def test_offsets_of_lines_with_multibyte_characters(self):
+        lines = [u'zażółć gęślą jaźń', u'aaa-1-bbb', u'środa 11:00', u'aaa-3-bbb']
+        descriptor, log_file_path = tempfile.mkstemp()
+        with os.fdopen(descriptor, 'wb') as log_file:
+            log_file.write(u'\n'.join(lines).encode('utf-8') + b'\n')
+        try:
+            expected_offsets = [0]
+            for line in lines[:-1]:
+                expected_offsets.append(expected_offsets[-1] + len(line.encode('utf-8')) + 1)
+            for use_mmap in (False, True):
+                backtracker = searchers.BacktrackSearcher(log_file_path, None, None, use_mmap)
+                data_reversed = list(
+                    backtracker._reverse_lines_in_range(0, os.path.getsize(log_file_path))
+                )
+                assert [line.decode('utf-8') for line, _ in data_reversed] == lines[::-1]
+                assert [offset for _, offset in data_reversed] == expected_offsets[::-1]
+        finally:
+            os.remove(log_file_path)
+
+    def test_mmap_does_not_copy_lines_without_required_literal(self):
+        lines = [b'1 disk sda is full', b'2 request served', b'3 disk sdb is full', b'4 idle']
+        descriptor, log_file_path = tempfile.mkstemp()
+        with os.fdopen(descriptor, 'wb') as log_file:
+            log_file.write(b'\n'.join(lines) + b'\n')
+        parser = RegexParser('disk_full', 'line', r'^(\d+) disk (\w+) is full$', [], 'default', {})
+        step = InvestigationStep(ConcatenatedRegexParser([parser]), {})
+        file_size = os.path.getsize(log_file_path)
+        try:
+            backtracker = searchers.BacktrackSearcher(log_file_path, step, None, use_mmap=True)
+            RecordingMmap.slices = []
+            with patch.object(searchers.mmap, 'mmap', RecordingMmap):
+                examined_lines = list(backtracker._reverse_examined_lines(0, file_size))
+            assert examined_lines == [
+                (None, 55, 6),
+                (lines[2], 36, 18),
+                (None, 19, 16),
+                (lines[0], 0, 18),
+            ]  # yapf: disable
+            # only lines containing ' disk ' were copied from mapped file
+            assert RecordingMmap.slices == [(36, 54), (0, 18)]
+        finally:
+            os.remove(log_file_path)
@@ -0,0 +1,95 @@
+import os.path
+from datetime import datetime, timedelta
+
+import six
+import yaml
+
+from whylog.config.consts import YamlFileNames
+from whylog.config.investigation_plan import LineSource
+from whylog.front.utils import FrontInput
+from whylog.investigation_stats import InvestigationStats
+from whylog.log_reader import LogReader
+from whylog.tests.tests_log_reader.utils import TemporaryConfigTestCase
+
+
+class TestBatchInvestigation(TemporaryConfigTestCase):
+    def setUp(self):
+        super(TestBatchInvestigation, self).setUp()
+        self._copy_config('003_match_time_range', 'node_*.log')
+        self.log_path = os.path.join(self.test_dir, 'node_1.log')
+        self._write_log(self.log_path)
+        self.config = self._create_config()
+
+    def _write_log(self, log_path, cause_suffix=''):
+        start_date = datetime(2015, 12, 3, 12, 8, 0)
+        with open(log_path, 'w') as log_file:
+            for i in six.moves.range(100):
+                message = ('root cause', 'visible effect', 'other line')[i % 3 % 2 + i % 5 // 4]
+                if message == 'root cause':
+                    message += cause_suffix
+                log_file.write('%s %s\n' % (start_date + timedelta(seconds=i // 2), message))
+
+    def _get_effect_inputs(self, log_path):
+        line_source = LineSource('localhost', log_path)
+        front_inputs = []
+        offset = 0
+        for line in open(log_path):
+            if 'visible effect' in line:
+                front_inputs.append(FrontInput(offset, line.rstrip('\n'), line_source))
+            offset += len(line)
+        return front_inputs
+
+    def _check_batch_results(self, front_inputs):
+        log_reader = LogReader(self.config)
+        batch_results = log_reader.get_causes_batch(front_inputs)
+        assert len(batch_results) == len(front_inputs)
+        for front_input, results in six.moves.zip(front_inputs, batch_results):
+            assert results == log_reader.get_causes(front_input)
+        return batch_results
+
+    def _get_stats_of_batch(self, front_inputs):
+        stats = InvestigationStats()
+        with stats.activated():
+            LogReader(self.config).get_causes_batch(front_inputs)
+        return stats
+
+    def test_same_results_as_separate_investigations(self):
+        batch_results = self._check_batch_results(self._get_effect_inputs(self.log_path))
+        assert sum(1 for results in batch_results if results) > 1
+
+    def test_inputs_from_files_of_the_same_log_type(self):
+        other_log_path = os.path.join(self.test_dir, 'node_2.log')
+        self._write_log(other_log_path)
+        front_inputs = [
+            self._get_effect_inputs(log_path)[0] for log_path in (self.log_path, other_log_path)
+        ]
+        assert all(self._check_batch_results(front_inputs))
+        # both files are searched once for both inputs
+        assert self._get_stats_of_batch(front_inputs).files_considered == 2
+
+    def test_disjoint_ranges_are_searched_separately(self):
+        effect_inputs = self._get_effect_inputs(self.log_path)
+        front_inputs = [effect_inputs[0], effect_inputs[-1]]
+        self._check_batch_results(front_inputs)
+        separate_lines_scanned = sum(
+            self._get_stats_of_batch([front_input]).lines_scanned for front_input in front_inputs
+        )
+        assert self._get_stats_of_batch(front_inputs).lines_scanned == separate_lines_scanned
+
+    def test_clues_selected_by_primary_key_of_super_parser(self):
+        # primary key of cause parser is not the key of line, by which files are searched
+        self._write_log(os.path.join(self.test_dir, 'node_2.log'), ' of 2015-12-03 13:00:00')
+        parsers_path = os.path.join(self.test_dir, YamlFileNames.parsers)
+        with open(parsers_path) as parsers_file:
+            parsers = list(yaml.safe_load_all(parsers_file))
+        for parser in parsers:
+            if parser['name'] == 'cause':
+                parser['regex_str'] += ' of (.*)$'
+                parser['primary_key_groups'] = [2]
+                parser['convertions'][2] = 'date'
+        with open(parsers_path, 'w') as parsers_file:
+            yaml.safe_dump_all(parsers, parsers_file, explicit_start=True)
+        self.config = self._create_config()
+        assert self.config._parsers['cause'].primary_key_groups == [2]
+        batch_results = self._check_batch_results(self._get_effect_inputs(self.log_path))
+        assert sum(1 for results in batch_results if results) > 1
@@ -0,0 +1,78 @@
+import os.path
+import random
+import shutil
+import tempfile
+from unittest import TestCase
+
+import six
+from six.moves import cPickle as pickle
+
+from whylog.log_reader.block_cache import DEFAULT_BLOCK_CACHE, BlockCache, CachedFile
+
+
+class TestBlockCache(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.test_dir = tempfile.mkdtemp()
+        cls.content = b''.join(
+            ('line number %s %s\n' % (i, 'x' * (i % 17))).encode('utf-8')
+            for i in six.moves.range(1000)
+        )  # yapf: disable
+        cls.log_path = os.path.join(cls.test_dir, 'node.log')
+        with open(cls.log_path, 'wb') as log_file:
+            log_file.write(cls.content)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.test_dir)
+
+    def test_reads_like_from_file(self):
+        random.seed(3)
+        block_cache = BlockCache(max_size=1000, block_size=100)
+        with CachedFile(self.log_path, block_cache) as fd:
+            for _ in six.moves.range(300):
+                offset = random.randint(0, len(self.content) + 10)
+                size = random.randint(0, 700)
+                fd.seek(offset)
+                assert fd.read(size) == self.content[offset:offset + size]
+                fd.seek(offset)
+                line = fd.readline()
+                end = self.content.find(b'\n', offset)
+                assert line == self.content[offset:end + 1 if end != -1 else len(self.content)]
+        assert len(block_cache) <= 10
+
+    def test_repeated_reads_served_from_cache(self):
+        block_cache = BlockCache(block_size=128)
+        loaded_blocks = []
+        original_load_block = CachedFile._load_block
+
+        def counting_load_block(cached_file, offset, size):
+            loaded_blocks.append(offset)
+            return original_load_block(cached_file, offset, size)
+
+        for _ in six.moves.range(3):
+            with CachedFile(self.log_path, block_cache) as fd:
+                fd._load_block = six.create_bound_method(counting_load_block, fd)
+                fd.seek(1000)
+                assert fd.read(500) == self.content[1000:1500]
+        assert sorted(loaded_blocks) == [896, 1024, 1152, 1280, 1408]
+
+    def test_blocks_dropped_after_file_change(self):
+        log_path = os.path.join(self.test_dir, 'growing.log')
+        shutil.copy(self.log_path, log_path)
+        block_cache = BlockCache(block_size=128)
+        with CachedFile(log_path, block_cache) as fd:
+            fd.read()
+        assert len(block_cache) > 0
+        with open(log_path, 'wb') as log_file:
+            log_file.write(b'new content\n')
+        with CachedFile(log_path, block_cache) as fd:
+            assert fd.read() == b'new content\n'
+        assert len(block_cache) == 1
+
+    def test_default_cache_is_shared_after_pickling(self):
+        assert pickle.loads(pickle.dumps(DEFAULT_BLOCK_CACHE)) is DEFAULT_BLOCK_CACHE
+        block_cache = BlockCache(max_size=1000, block_size=100)
+        unpickled_cache = pickle.loads(pickle.dumps(block_cache))
+        assert unpickled_cache.block_size == 100
+        assert len(unpickled_cache) == 0
@@ -0,0 +1,160 @@
+import os.path
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from unittest import TestCase
+
+import six
+
+from whylog.config.investigation_plan import InvestigationStep, LineSource
+from whylog.config.super_parser import RegexSuperParser
+from whylog.front.utils import FrontInput
+from whylog.log_reader import LogReader
+from whylog.log_reader.budget import InvestigationBudget
+from whylog.log_reader.file_metadata import FileMetadataCache
+from whylog.log_reader.key_index import KeyIndexStorage
+from whylog.log_reader.result_cache import ResultCache
+from whylog.log_reader.searchers import IndexSearcher
+from whylog.tests.tests_log_reader.utils import TemporaryConfigTestCase
+
+PARSERS = """name: request_failed
+regex_str: ^(\\d\\d\\d\\d-\\d\\d-\\d\\d \\d\\d:\\d\\d:\\d\\d) request failed$
+primary_key_groups: [1]
+log_type: test_log_type
+convertions: {1: date}
+line_content: line
+---
+name: app_error
+regex_str: ^(\\d\\d\\d\\d-\\d\\d-\\d\\d \\d\\d:\\d\\d:\\d\\d) app error$
+primary_key_groups: [1]
+log_type: test_log_type
+convertions: {1: date}
+line_content: line
+"""
+
+RULES = """causes: [app_error]
+effect: request_failed
+constraints:
+- clues_groups:
+  - [1, 1]
+  - [0, 1]
+  name: time_delta
+  params: {max_delta: 1}
+linkage: AND
+"""
+
+EFFECT_LINE = '2016-01-01 10:00:02 request failed'
+LOG_LINES = ['2016-01-01 10:00:01 app error'] + [
+    '2016-01-01 10:00:01 request served'
+] * 10 + [EFFECT_LINE]  # yapf: disable
+
+
+class TestInvestigationBudget(TemporaryConfigTestCase):
+    def setUp(self):
+        super(TestInvestigationBudget, self).setUp()
+        self._write_logs({'node.log': LOG_LINES})
+        self._write_config(PARSERS, RULES, 'node.log')
+        self.config = self._create_config()
+        self.front_input = self._create_front_input('node.log', len(LOG_LINES) - 1)
+
+    def test_consume(self):
+        budget = InvestigationBudget(max_bytes=10, max_lines=3)
+        assert budget.consume(4)
+        assert budget.consume(4)
+        assert budget.serialize_remaining() == {'timeout': None, 'max_bytes': 2, 'max_lines': 1}
+        assert not budget.consume(4)
+        assert budget.is_exhausted()
+        assert InvestigationBudget(timeout=0).consume(1) is False
+
+    def test_unlimited_budget(self):
+        log_reader = LogReader(self.config)
+        results = log_reader.get_causes(self.front_input, budget=InvestigationBudget())
+        assert not results.is_partial
+        assert results == log_reader.get_causes(self.front_input)
+        assert len(results) == 1
+
+    def test_exhausted_budget(self):
+        budget = InvestigationBudget(max_lines=5)
+        results = LogReader(self.config).get_causes(self.front_input, budget=budget)
+        assert results.is_partial
+        assert results.cut_short_steps == ['test_log_type']
+        # cause is at the beginning of file, which is searched backwards
+        assert results == []
+        assert budget.lines_examined < len(LOG_LINES)
+
+        results = LogReader(self.config).get_causes(
+            self.front_input, budget=InvestigationBudget(timeout=0)
+        )
+        assert results.is_partial
+        assert results == []
+
+    def test_partial_results_are_not_cached(self):
+        log_reader = LogReader(self.config, result_cache=ResultCache())
+        budget = InvestigationBudget(max_bytes=1)
+        assert log_reader.get_causes(self.front_input, budget=budget).is_partial
+        assert len(log_reader.get_causes(self.front_input)) == 1
+        cached_results = log_reader.get_causes(self.front_input, budget=InvestigationBudget())
+        assert not cached_results.is_partial
+        assert len(cached_results) == 1
+
+
+class TestBudgetOfSearchPreparation(TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.index_dir = os.path.join(self.test_dir, 'indexes')
+        self.log_path = os.path.join(self.test_dir, 'node.log')
+        self.start_date = datetime(2016, 1, 1)
+        with open(self.log_path, 'w') as log_file:
+            # there are no lines between 500 and 600 seconds
+            for seconds in list(six.moves.range(500)) + list(six.moves.range(600, 1100)):
+                date = self.start_date + timedelta(seconds=seconds)
+                log_file.write('%s request served\n' % (date, ))
+        self.super_parser = RegexSuperParser(
+            '^(\\d\\d\\d\\d-\\d\\d-\\d\\d \\d\\d:\\d\\d:\\d\\d).*', [1], {1: 'date'}
+        )
+        step = InvestigationStep(
+            None, {
+                'date': {
+                    InvestigationStep.LEFT_BOUND: self.start_date + timedelta(seconds=520),
+                    InvestigationStep.RIGHT_BOUND: self.start_date + timedelta(seconds=530)
+                }
+            }
+        )
+        self.index_storage = KeyIndexStorage(self.index_dir, sampling_interval=1024)
+        self.metadata_cache = FileMetadataCache()
+        self.searcher = IndexSearcher(
+            self.log_path, step, self.super_parser, self.index_storage,
+            file_metadata_cache=self.metadata_cache
+        )
+        self.front_input = FrontInput(
+            0, 'effect', LineSource('localhost', os.path.join(self.test_dir, 'other.log'))
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_search_preparation_is_charged(self):
+        # no line is in search range, so only reads of metadata, index and probes are charged
+        budget = InvestigationBudget()
+        assert self.searcher.search(self.front_input, budget) == {}
+        assert budget.lines_examined > 0
+        assert budget.bytes_read > 0
+        assert len(self.index_storage._indexes) == 1
+        assert len(self.metadata_cache._metadata) == 1
+
+    def test_incomplete_index_is_not_kept(self):
+        budget = InvestigationBudget(max_lines=10)
+        assert self.searcher.search(self.front_input, budget) == {}
+        assert budget.is_exhausted()
+        assert len(self.metadata_cache._metadata) == 1
+        assert self.index_storage._indexes == {}
+        assert not os.path.exists(self.index_dir)
+        index = self.index_storage.get_index(self.log_path, self.super_parser)
+        assert index.indexed_size == os.path.getsize(self.log_path)
+
+    def test_metadata_read_within_exhausted_budget_is_not_kept(self):
+        budget = InvestigationBudget(max_lines=1)
+        assert self.searcher.search(self.front_input, budget) == {}
+        assert budget.is_exhausted()
+        assert self.metadata_cache._metadata == {}
+        assert self.index_storage._indexes == {}
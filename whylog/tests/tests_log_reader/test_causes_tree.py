@@ -0,0 +1,100 @@
+from whylog.log_reader import LogReader
+from whylog.log_reader.executors import ThreadSearchExecutor
+from whylog.log_reader.searchers import BacktrackSearcher
+from whylog.tests.tests_log_reader.utils import TemporaryConfigTestCase
+
+PARSER_TEMPLATE = """name: %s
+regex_str: ^(\\d\\d\\d\\d-\\d\\d-\\d\\d \\d\\d:\\d\\d:\\d\\d) %s$
+primary_key_groups: [1]
+log_type: test_log_type
+convertions: {1: date}
+line_content: line
+"""
+
+RULE_TEMPLATE = """causes: [%s]
+effect: %s
+constraints:
+- clues_groups:
+  - [1, 1]
+  - [0, 1]
+  name: time_delta
+  params: {max_delta: 1}
+linkage: AND
+"""
+
+LOGS_CONTENT = {
+    'balancer.log': ['2016-01-01 10:00:02 request failed'],
+    'app.log': [
+        '2016-01-01 09:00:00 app error 0',
+        '2016-01-01 10:00:01 app error 1',
+        '2016-01-01 10:00:01 app error 2',
+    ],
+    'db.log': ['2016-01-01 10:00:00 disk full'],
+}  # yapf: disable
+
+
+class TestCausesTree(TemporaryConfigTestCase):
+    def setUp(self):
+        super(TestCausesTree, self).setUp()
+        self._write_logs(LOGS_CONTENT)
+        self._write_config(
+            '---\n'.join(
+                [
+                    PARSER_TEMPLATE % ('request_failed', 'request failed'),
+                    PARSER_TEMPLATE % ('app_error', 'app error (\\d+)'),
+                    PARSER_TEMPLATE % ('disk_full', 'disk full'),
+                ]
+            ),
+            '---\n'.join(
+                [
+                    RULE_TEMPLATE % ('app_error', 'request_failed'),
+                    RULE_TEMPLATE % ('disk_full', 'app_error'),
+                ]
+            ),
+        )
+        self.config = self._create_config()
+        self.searches_count = 0
+
+    def _create_searcher(self, file_path, investigation_step, super_parser):
+        self.searches_count += 1
+        return BacktrackSearcher(file_path, investigation_step, super_parser)
+
+    def test_chain_of_causes(self):
+        branch_executor = ThreadSearchExecutor(2)
+        try:
+            log_reader = LogReader(
+                self.config,
+                searcher_factory=self._create_searcher,
+                branch_executor=branch_executor
+            )
+            tree = log_reader.get_causes_tree(self._create_front_input('balancer.log', 0))
+        finally:
+            branch_executor.close()
+        assert tree.is_investigated
+        # file is searched backwards, so later lines are found first
+        assert [child.front_input for child in tree.children] == [
+            self._create_front_input('app.log', 2), self._create_front_input('app.log', 1)
+        ]
+        first_app_error, second_app_error = tree.children
+        # the same cause of both app errors is investigated once
+        assert len(first_app_error.children) == 1
+        assert first_app_error.children == second_app_error.children
+        disk_full = first_app_error.children[0]
+        assert disk_full.front_input == self._create_front_input('db.log', 0)
+        assert disk_full.is_investigated
+        assert disk_full.investigation_results == []
+        assert disk_full.children == []
+        # both app errors are investigated by one search in every file
+        assert self.searches_count == 2 * len(LOGS_CONTENT)
+
+    def test_limits(self):
+        log_reader = LogReader(self.config)
+        tree = log_reader.get_causes_tree(
+            self._create_front_input('balancer.log', 0), max_depth=1, max_fan_out=1
+        )
+        assert len(tree.investigation_results) == 2
+        assert [child.front_input for child in tree.children] == [
+            self._create_front_input('app.log', 2)
+        ]
+        assert not tree.children[0].is_investigated
+        assert tree.children[0].children == []
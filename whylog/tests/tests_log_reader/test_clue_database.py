@@ -0,0 +1,93 @@
+import os.path
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from unittest import TestCase
+
+import six
+
+from whylog.config.investigation_plan import InvestigationStep, LineSource
+from whylog.config.parser_subset import ConcatenatedRegexParser
+from whylog.config.parsers import RegexParser
+from whylog.config.super_parser import RegexSuperParser
+from whylog.front.utils import FrontInput
+from whylog.log_reader.clue_database import ClueDatabase
+from whylog.log_reader.searchers import BacktrackSearcher, DatabaseSearcher
+
+
+class TestClueDatabase(TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.start_date = datetime(2016, 1, 1)
+        self.log_path = os.path.join(self.test_dir, 'node.log')
+        with open(self.log_path, 'w') as log_file:
+            for i in six.moves.range(300):
+                date = self.start_date + timedelta(seconds=i)
+                log_file.write('%s %s request %s\n' % (date, ('GET', 'POST')[i % 2], i))
+        self.super_parser = RegexSuperParser(
+            '^(\d\d\d\d-\d\d-\d\d \d\d:\d\d:\d\d).*', [1], {1: 'date'}
+        )
+        self.parsers = [
+            RegexParser(
+                name, 'line', '^(\d\d\d\d-\d\d-\d\d \d\d:\d\d:\d\d) %s request (\d+)$' % (method,),
+                [1], 'default', {1: 'date', 2: 'int'}
+            ) for name, method in [('get', 'GET'), ('post', 'POST')]
+        ]
+        self.clue_database = ClueDatabase(os.path.join(self.test_dir, 'clues.sqlite'))
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _create_investigation_step(self, parsers, left, right):
+        return InvestigationStep(
+            ConcatenatedRegexParser(parsers), {
+                'date': {
+                    InvestigationStep.LEFT_BOUND: self.start_date + timedelta(seconds=left),
+                    InvestigationStep.RIGHT_BOUND: self.start_date + timedelta(seconds=right)
+                }
+            }
+        )
+
+    def _search(self, searcher_class, step, front_input, **kwargs):
+        clues = searcher_class(self.log_path, step, self.super_parser, **kwargs).search(front_input)
+        return dict(clues)
+
+    def test_same_clues_as_in_backtrack_searcher(self):
+        self.clue_database.ingest_file(
+            self.log_path, ConcatenatedRegexParser(self.parsers), self.super_parser
+        )
+        other_file_input = FrontInput(0, 'line', LineSource('localhost', 'other.log'))
+        with open(self.log_path, 'rb') as log_file:
+            effect_offset = sum(len(log_file.readline()) for _ in six.moves.range(200))
+        same_file_input = FrontInput(effect_offset, 'line', LineSource('localhost', self.log_path))
+        for front_input in (other_file_input, same_file_input):
+            step = self._create_investigation_step(self.parsers, 100, 250)
+            database_clues = self._search(
+                DatabaseSearcher, step, front_input, clue_database=self.clue_database
+            )
+            assert database_clues
+            assert database_clues == self._search(BacktrackSearcher, step, front_input)
+
+    def test_changed_file_is_not_ingested(self):
+        parser_names = [parser.name for parser in self.parsers]
+        self.clue_database.ingest_file(
+            self.log_path, ConcatenatedRegexParser(self.parsers[:1]), self.super_parser
+        )
+        assert self.clue_database.get_ingested_file_id(self.log_path, parser_names[:1]) is not None
+        # file was not ingested by all parsers
+        assert self.clue_database.get_ingested_file_id(self.log_path, parser_names) is None
+        with open(self.log_path, 'a') as log_file:
+            log_file.write('%s GET request 300\n' % (self.start_date + timedelta(seconds=300),))
+        assert self.clue_database.get_ingested_file_id(self.log_path, parser_names[:1]) is None
+
+    def test_clues_inserted_in_chunks(self):
+        self.clue_database.INSERT_CHUNK_SIZE = 7
+        self.clue_database.ingest_file(
+            self.log_path, ConcatenatedRegexParser(self.parsers), self.super_parser
+        )
+        file_id = self.clue_database.get_ingested_file_id(
+            self.log_path, [parser.name for parser in self.parsers]
+        )
+        for parser_name in ('get', 'post'):
+            rows = self.clue_database.find_clues_rows(file_id, parser_name, (None, None), None)
+            assert len(rows) == 150
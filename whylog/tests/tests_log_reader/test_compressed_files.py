@@ -0,0 +1,199 @@
+import bz2
+import gzip
+import io
+import os.path
+import random
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from unittest import TestCase
+
+import six
+from mock import patch
+
+from whylog.config.investigation_plan import InvestigationStep, LineSource
+from whylog.config.super_parser import RegexSuperParser
+from whylog.front.utils import FrontInput
+from whylog.log_reader import compressed_files
+from whylog.log_reader.compressed_files import (
+    CheckpointIndexStorage, SeekableDecompressedFile, has_random_access, is_compressed, lzma
+)
+from whylog.log_reader.key_index import KeyIndexStorage
+from whylog.log_reader.read_utils import ReadUtils
+from whylog.log_reader.searchers import BacktrackSearcher, IndexSearcher
+
+
+class TestSeekableDecompressedFile(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.test_dir = tempfile.mkdtemp()
+        cls.start_date = datetime(2016, 1, 1)
+        cls.content = b''.join(
+            (
+                '%s line number %s %s\n' %
+                (cls.start_date + timedelta(seconds=i // 3), i, 'x' * (i % 13))
+            ).encode('utf-8') for i in six.moves.range(3000)
+        )  # yapf: disable
+        cls.log_path = os.path.join(cls.test_dir, 'node.log')
+        with open(cls.log_path, 'wb') as log_file:
+            log_file.write(cls.content)
+        cls.compressed_paths = [cls._compress(gzip.open, '.gz'), cls._compress(bz2.BZ2File, '.bz2')]
+        if lzma is not None:
+            cls.compressed_paths.append(cls._compress(lzma.LZMAFile, '.xz'))
+        cls.super_parser = RegexSuperParser(
+            '^(\d\d\d\d-\d\d-\d\d \d\d:\d\d:\d\d).*', [1], {1: 'date'}
+        )
+
+    @classmethod
+    def _compress(cls, open_function, extension):
+        compressed_path = cls.log_path + extension
+        compressed_file = open_function(compressed_path, 'wb')
+        try:
+            compressed_file.write(cls.content)
+        finally:
+            compressed_file.close()
+        return compressed_path
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.test_dir)
+
+    def test_is_compressed(self):
+        assert not is_compressed(self.log_path)
+        assert all(is_compressed(path) for path in self.compressed_paths)
+
+    def test_random_reads(self):
+        random.seed(7)
+        storage = CheckpointIndexStorage(1000, self.test_dir)
+        for path in self.compressed_paths:
+            with SeekableDecompressedFile(path, storage) as fd:
+                assert ReadUtils.size_of_opened_file(fd) == len(self.content)
+                for _ in six.moves.range(200):
+                    offset = random.randint(0, len(self.content) + 10)
+                    size = random.randint(0, 5000)
+                    fd.seek(offset)
+                    assert fd.read(size) == self.content[offset:offset + size]
+                    assert fd.tell() == min(offset + size, len(self.content))
+
+    def test_checkpoints_of_gzip_file(self):
+        storage = CheckpointIndexStorage(1000, self.test_dir)
+        with SeekableDecompressedFile(self.compressed_paths[0], storage) as fd:
+            fd.seek(len(self.content) // 2)
+            line = fd.readline()
+            assert line.endswith(b'\n')
+            assert line in self.content
+            assert len(fd._index) > 1
+        with SeekableDecompressedFile(self.compressed_paths[1], storage) as fd:
+            # state of bz2 decompressor cannot be copied
+            assert len(fd._index) == 1
+
+    def test_concatenated_gzip_members(self):
+        path = os.path.join(self.test_dir, 'concatenated.log.gz')
+        middle = len(self.content) // 3
+        for part in (self.content[:middle], self.content[middle:]):
+            with gzip.open(path, 'ab') as compressed_file:
+                compressed_file.write(part)
+        with SeekableDecompressedFile(path, CheckpointIndexStorage(1000, self.test_dir)) as fd:
+            assert fd.read() == self.content
+            fd.seek(middle - 5)
+            assert fd.read(10) == self.content[middle - 5:middle + 5]
+
+    def test_decompressed_file_has_no_file_descriptor(self):
+        storage = CheckpointIndexStorage(1000, self.test_dir)
+        with SeekableDecompressedFile(self.compressed_paths[0], storage) as fd:
+            with self.assertRaises(io.UnsupportedOperation):
+                fd.fileno()
+
+    def test_checkpoints_at_beginnings_of_bz2_streams(self):
+        path = os.path.join(self.test_dir, 'streams.log.bz2')
+        with open(path, 'wb') as compressed_file:
+            for begin in six.moves.range(0, len(self.content), 15000):
+                compressed_file.write(bz2.compress(self.content[begin:begin + 15000]))
+        storage = CheckpointIndexStorage(20000, self.test_dir)
+        with SeekableDecompressedFile(path, storage) as fd:
+            assert len(fd._index) > 1
+            assert fd.has_random_access()
+            fd.seek(len(self.content) // 2)
+            assert fd.read(100) == self.content[len(self.content) // 2:][:100]
+        with SeekableDecompressedFile(self.compressed_paths[1], storage) as fd:
+            assert len(fd._index) == 1
+            assert not fd.has_random_access()
+
+    def test_index_is_persisted_in_index_dir(self):
+        index_dir = os.path.join(self.test_dir, 'checkpoints')
+        with SeekableDecompressedFile(
+            self.compressed_paths[0], CheckpointIndexStorage(1000, index_dir)
+        ) as fd:
+            checkpoints_count = len(fd._index)
+        assert len(os.listdir(index_dir)) == 1
+
+        def failing_build(*args):
+            raise AssertionError('index should be loaded from index file')
+
+        storage = CheckpointIndexStorage(1000, index_dir)
+        storage._build_index = failing_build
+        with SeekableDecompressedFile(self.compressed_paths[0], storage) as fd:
+            # copies of gzip decompressor are not saved, they are added again by reads
+            assert len(fd._index) == 1
+            assert fd.has_random_access()
+            fd.seek(len(self.content) - 10)
+            assert fd.read() == self.content[-10:]
+            assert len(fd._index) == checkpoints_count
+
+    def _create_step(self):
+        return InvestigationStep(
+            None, {
+                'date': {
+                    InvestigationStep.LEFT_BOUND: self.start_date + timedelta(seconds=100),
+                    InvestigationStep.RIGHT_BOUND: self.start_date + timedelta(seconds=400)
+                }
+            }
+        )
+
+    def test_search_in_compressed_file(self):
+        step = self._create_step()
+        expected_lines = list(
+            BacktrackSearcher(self.log_path, step, self.super_parser)._reverse_from_offset(
+                len(self.content)
+            )
+        )
+        with open(self.log_path, 'rb') as fd:
+            searcher = BacktrackSearcher(self.log_path, step, self.super_parser)
+            expected_bounds = searcher._find_left(fd), searcher._find_right(fd)
+        storage = CheckpointIndexStorage(1000, self.test_dir)
+        for path in self.compressed_paths:
+            for searcher in (
+                BacktrackSearcher(path, step, self.super_parser, use_mmap=True),
+                IndexSearcher(path, step, self.super_parser, KeyIndexStorage(self.test_dir, 1000))
+            ):
+                with patch.object(compressed_files, 'DEFAULT_CHECKPOINT_STORAGE', storage):
+                    with SeekableDecompressedFile(path) as fd:
+                        assert (searcher._find_left(fd),
+                                searcher._find_right(fd)) == expected_bounds
+                    assert list(searcher._reverse_lines_in_range(0, len(self.content))) == \
+                        expected_lines
+
+    def test_search_in_compressed_file_without_random_access(self):
+        step = self._create_step()
+        with open(self.log_path, 'rb') as fd:
+            searcher = BacktrackSearcher(self.log_path, step, self.super_parser)
+            left_bound, right_bound = searcher._find_left(fd), searcher._find_right(fd)
+        expected_lines = [
+            (line, offset)
+            for line, offset in searcher._reverse_from_offset(right_bound) if offset >= left_bound
+        ]
+        storage = CheckpointIndexStorage(1000, self.test_dir)
+        path = self.compressed_paths[1]
+        with patch.object(compressed_files, 'DEFAULT_CHECKPOINT_STORAGE', storage):
+            assert not has_random_access(path)
+            searcher = BacktrackSearcher(path, step, self.super_parser)
+            other_file_input = FrontInput(0, 'line', LineSource('localhost', self.log_path))
+            assert searcher._find_offsets_range(other_file_input) == (left_bound, right_bound)
+            lines = [
+                (line, offset)
+                for line, offset in searcher._reverse_lines_in_range(left_bound, right_bound)
+                if offset >= left_bound
+            ]
+            assert lines == expected_lines
+            same_file_input = FrontInput(left_bound + 100, 'line', LineSource('localhost', path))
+            assert searcher._find_offsets_range(same_file_input) == (left_bound, left_bound + 100)
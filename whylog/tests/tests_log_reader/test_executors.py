@@ -0,0 +1,88 @@
+import threading
+from unittest import TestCase
+
+from six.moves import cPickle as pickle
+
+from whylog.log_reader.executors import (
+    ProcessSearchExecutor, SerialSearchExecutor, ThreadSearchExecutor
+)
+
+
+def square(number):
+    return number * number
+
+
+def squares_with_nested_executor(executor):
+    return executor.map(square, range(4))
+
+
+class TestSearchExecutors(TestCase):
+    def test_results_in_order_of_tasks(self):
+        tasks = list(range(20))
+        expected_results = [square(number) for number in tasks]
+        for executor in (SerialSearchExecutor(), ThreadSearchExecutor(3), ProcessSearchExecutor(3)):
+            try:
+                assert executor.map(square, iter(tasks)) == expected_results
+                # pool is reused by the next calls
+                assert executor.map(square, tasks[:5]) == expected_results[:5]
+            finally:
+                executor.close()
+
+    def test_no_tasks(self):
+        executor = ThreadSearchExecutor(2)
+        assert executor.map(square, []) == []
+        executor.close()
+
+    def test_nested_executor_in_processes_pool(self):
+        outer_executor = ProcessSearchExecutor(2)
+        inner_executor = ProcessSearchExecutor(2)
+        try:
+            inner_executor.map(square, range(4))
+            # executor with already created pool can be sent to other process
+            pickle.dumps(inner_executor)
+            assert outer_executor.map(
+                squares_with_nested_executor, [inner_executor, inner_executor]
+            ) == [[0, 1, 4, 9]] * 2
+        finally:
+            outer_executor.close()
+            inner_executor.close()
+
+    def test_nested_calls_of_the_same_threads_executor(self):
+        executor = ThreadSearchExecutor(2)
+        try:
+            # all workers would wait for nested tasks, which could not be run by any of them
+            assert executor.map(squares_with_nested_executor, [executor] * 4) == \
+                [[0, 1, 4, 9]] * 4
+            assert len(executor._get_pool()._pool) == 2
+        finally:
+            executor.close()
+
+    def test_pool_created_once_by_many_threads(self):
+        executor = ThreadSearchExecutor(2)
+        created_pools = []
+        original_create_pool = executor._create_pool
+
+        def create_pool():
+            pool = original_create_pool()
+            created_pools.append(pool)
+            return pool
+
+        executor._create_pool = create_pool
+        threads = [threading.Thread(target=executor.map, args=(square, range(4))) for _ in range(8)]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert len(created_pools) == 1
+        finally:
+            executor.close()
+
+    def test_imap_unordered(self):
+        tasks = list(range(20))
+        expected_results = [square(number) for number in tasks]
+        for executor in (SerialSearchExecutor(), ThreadSearchExecutor(3), ProcessSearchExecutor(3)):
+            try:
+                assert sorted(executor.imap_unordered(square, tasks)) == expected_results
+            finally:
+                executor.close()
@@ -0,0 +1,105 @@
+import os.path
+import pickle
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from unittest import TestCase
+
+import six
+
+from whylog.config.investigation_plan import InvestigationStep
+from whylog.config.super_parser import RegexSuperParser
+from whylog.log_reader.file_metadata import DEFAULT_FILE_METADATA_CACHE, FileMetadataCache
+from whylog.log_reader.searchers import BacktrackSearcher
+
+
+class TestFileMetadata(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.test_dir = tempfile.mkdtemp()
+        cls.start_date = datetime(2016, 1, 1)
+        cls.super_parser = RegexSuperParser(
+            '^(\d\d\d\d-\d\d-\d\d \d\d:\d\d:\d\d).*', [1], {1: 'date'}
+        )
+        # rotated log series, every file contains one hour of logs
+        cls.log_paths = []
+        for hour in six.moves.range(3):
+            log_path = os.path.join(cls.test_dir, 'node.log.%s' % (hour,))
+            with open(log_path, 'w') as log_file:
+                log_file.write('not keyed header\n')
+                for minute in six.moves.range(60):
+                    date = cls.start_date + timedelta(hours=hour, minutes=minute)
+                    log_file.write('%s some message\n' % (date,))
+                log_file.write('not keyed footer\n')
+            cls.log_paths.append(log_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.test_dir)
+
+    def _create_investigation_step(self, left, right):
+        return InvestigationStep(
+            None, {
+                'date': {
+                    InvestigationStep.LEFT_BOUND: self.start_date + timedelta(minutes=left),
+                    InvestigationStep.RIGHT_BOUND: self.start_date + timedelta(minutes=right)
+                }
+            }
+        )
+
+    def test_first_and_last_groups(self):
+        metadata = FileMetadataCache().get_metadata(self.log_paths[1], self.super_parser)
+        assert metadata.first_groups == [('date', self.start_date + timedelta(minutes=60))]
+        assert metadata.last_groups == [('date', self.start_date + timedelta(minutes=119))]
+
+    def test_files_outside_search_range_are_skipped(self):
+        cache = FileMetadataCache()
+        for (left_minutes, right_minutes), expected_intersections in [
+            ((70, 80), [False, True, False]),
+            ((59, 60), [True, True, False]),
+            ((119, 500), [False, True, True]),
+            ((-10, -1), [False, False, False]),
+        ]:  # yapf: disable
+            step = self._create_investigation_step(left_minutes, right_minutes)
+            assert [
+                cache.get_metadata(log_path, self.super_parser).may_intersect(step)
+                for log_path in self.log_paths
+            ] == expected_intersections
+            for log_path, may_intersect in six.moves.zip(self.log_paths, expected_intersections):
+                searcher = BacktrackSearcher(
+                    log_path, step, self.super_parser, file_metadata_cache=cache
+                )
+                assert searcher._may_contain_clues() == may_intersect
+
+    def test_metadata_is_refreshed_after_file_change(self):
+        log_path = os.path.join(self.test_dir, 'growing.log')
+        shutil.copy(self.log_paths[0], log_path)
+        cache = FileMetadataCache()
+        step = self._create_investigation_step(100, 110)
+        assert not cache.get_metadata(log_path, self.super_parser).may_intersect(step)
+        with open(log_path, 'a') as log_file:
+            log_file.write('%s appended message\n' % (self.start_date + timedelta(minutes=105),))
+        assert cache.get_metadata(log_path, self.super_parser).may_intersect(step)
+
+    def test_file_without_keyed_lines_is_not_skipped(self):
+        log_path = os.path.join(self.test_dir, 'not_keyed.log')
+        with open(log_path, 'w') as log_file:
+            log_file.write('first\nsecond\n')
+        metadata = FileMetadataCache().get_metadata(log_path, self.super_parser)
+        assert metadata.first_groups is None and metadata.last_groups is None
+        assert metadata.may_intersect(self._create_investigation_step(0, 10))
+
+    def test_cached_metadata_is_not_pickled_with_searcher(self):
+        cache = FileMetadataCache()
+        searcher = BacktrackSearcher(
+            self.log_paths[0], self._create_investigation_step(0, 10), self.super_parser,
+            file_metadata_cache=cache
+        )
+        cache.get_metadata(self.log_paths[0], self.super_parser)
+        pickled_size = len(pickle.dumps(searcher))
+        for log_path in self.log_paths:
+            cache.get_metadata(log_path, self.super_parser)
+        assert len(pickle.dumps(searcher)) == pickled_size
+        assert len(pickle.loads(pickle.dumps(cache))._metadata) == 0
+        assert pickle.loads(pickle.dumps(DEFAULT_FILE_METADATA_CACHE)) is \
+            DEFAULT_FILE_METADATA_CACHE
@@ -0,0 +1,115 @@
+import os.path
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from unittest import TestCase
+
+import six
+
+from whylog.config.filename_matchers import WildCardFilenameMatcher
+from whylog.config.log_type import LogType
+from whylog.config.super_parser import RegexSuperParser
+from whylog.log_reader.file_metadata import FileMetadataCache
+from whylog.log_reader.follower import FileChange, LogFollower
+from whylog.log_reader.key_index import KeyIndexStorage, SparseKeyIndex
+
+
+class LogTypesConfig(object):
+    def __init__(self, log_types):
+        self._log_types = log_types
+
+    def get_all_log_types(self):
+        return iter(self._log_types)
+
+
+class TestLogFollower(TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.log_dir = os.path.join(self.test_dir, 'logs')
+        os.mkdir(self.log_dir)
+        self.log_path = os.path.join(self.log_dir, 'node.log')
+        self.start_date = datetime(2016, 1, 1)
+        self.lines_count = 0
+        self.super_parser = RegexSuperParser(
+            '^(\d\d\d\d-\d\d-\d\d \d\d:\d\d:\d\d).*', [1], {1: 'date'}
+        )
+        matcher = WildCardFilenameMatcher(
+            'localhost', os.path.join(self.log_dir, '*.log'), 'default', self.super_parser
+        )
+        self.config = LogTypesConfig([LogType('default', [matcher])])
+        self.cursors_path = os.path.join(self.test_dir, 'cursors.json')
+        self.index_storage = KeyIndexStorage(self.test_dir, sampling_interval=200)
+        self.metadata_cache = FileMetadataCache()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _create_follower(self):
+        return LogFollower(
+            self.config, self.cursors_path, self.index_storage, self.metadata_cache
+        )
+
+    def _write_lines(self, count, mode='a'):
+        with open(self.log_path, mode) as log_file:
+            for _ in six.moves.range(count):
+                date = self.start_date + timedelta(seconds=self.lines_count)
+                log_file.write('%s line number %s\n' % (date, self.lines_count))
+                self.lines_count += 1
+        return os.path.getsize(self.log_path)
+
+    def _get_last_date(self):
+        metadata = self.metadata_cache.get_metadata(self.log_path, self.super_parser)
+        return metadata.last_groups[0][1]
+
+    def test_appended_file(self):
+        follower = self._create_follower()
+        size = self._write_lines(50)
+        changes = follower.poll()
+        assert changes == [FileChange(self.log_path, FileChange.NEW, 0, size)]
+        assert not changes[0] != FileChange(self.log_path, FileChange.NEW, 0, size)
+        assert changes[0] != FileChange(self.log_path, FileChange.APPENDED, 0, size)
+        assert follower.poll() == []
+        index_length = len(self.index_storage.get_index(self.log_path, self.super_parser))
+
+        extended_from = []
+        original_extend = SparseKeyIndex.extend
+
+        def recording_extend(index, fd, super_parser, file_size, budget=None):
+            extended_from.append(index._next_sample_offset)
+            return original_extend(index, fd, super_parser, file_size, budget)
+
+        SparseKeyIndex.extend = recording_extend
+        try:
+            new_size = self._write_lines(50)
+            assert follower.poll() == [
+                FileChange(self.log_path, FileChange.APPENDED, size, new_size)
+            ]
+        finally:
+            SparseKeyIndex.extend = original_extend
+        # only appended part was sampled
+        assert len(extended_from) == 1 and extended_from[0] >= size
+        assert len(self.index_storage.get_index(self.log_path, self.super_parser)) > index_length
+        assert self._get_last_date() == self.start_date + timedelta(seconds=99)
+
+    def test_truncated_and_rotated_file(self):
+        follower = self._create_follower()
+        self._write_lines(50)
+        follower.poll()
+        size = self._write_lines(10, 'w')
+        assert follower.poll()[0].change_type == FileChange.TRUNCATED
+        assert self._get_last_date() == self.start_date + timedelta(seconds=59)
+
+        os.rename(self.log_path, os.path.join(self.test_dir, 'node.log.1'))
+        new_size = self._write_lines(5)
+        assert follower.poll() == [FileChange(self.log_path, FileChange.ROTATED, size, new_size)]
+        assert self._get_last_date() == self.start_date + timedelta(seconds=64)
+
+    def test_cursors_are_persisted(self):
+        size = self._write_lines(50)
+        self._create_follower().poll()
+        follower = self._create_follower()
+        assert follower.get_cursor(self.log_path).size == size
+        assert follower.poll() == []
+        os.remove(self.log_path)
+        follower.poll()
+        assert self._create_follower().get_cursor(self.log_path) is None
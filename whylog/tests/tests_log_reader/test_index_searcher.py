@@ -0,0 +1,99 @@
+import json
+import os.path
+import pickle
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from unittest import TestCase
+
+import six
+
+from whylog.config.investigation_plan import InvestigationStep
+from whylog.config.super_parser import RegexSuperParser
+from whylog.log_reader.key_index import DEFAULT_INDEX_STORAGE, KeyIndexStorage
+from whylog.log_reader.searchers import BacktrackSearcher, IndexSearcher
+
+
+class TestIndexSearcher(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.test_dir = tempfile.mkdtemp()
+        cls.log_path = os.path.join(cls.test_dir, 'node.log')
+        cls.start_date = datetime(2016, 1, 1)
+        cls.number_of_lines = 2000
+        with open(cls.log_path, 'w') as log_file:
+            for i in six.moves.range(cls.number_of_lines):
+                # every date is repeated in three lines
+                date = cls.start_date + timedelta(seconds=i // 3)
+                log_file.write('%s line number %s %s\n' % (date, i, 'x' * (i % 13)))
+        cls.super_parser = RegexSuperParser(
+            '^(\d\d\d\d-\d\d-\d\d \d\d:\d\d:\d\d).*', [1], {1: 'date'}
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.test_dir)
+
+    def _create_investigation_step(self, left_seconds, right_seconds):
+        return InvestigationStep(
+            None, {
+                'date': {
+                    InvestigationStep.LEFT_BOUND: self.start_date + timedelta(seconds=left_seconds),
+                    InvestigationStep.RIGHT_BOUND: self.start_date + timedelta(seconds=right_seconds)
+                }
+            }
+        )
+
+    def _find_bounds(self, searcher):
+        with open(self.log_path, 'rb') as fd:
+            return searcher._find_left(fd), searcher._find_right(fd)
+
+    def test_bounds_like_in_backtrack_searcher(self):
+        storage = KeyIndexStorage(self.test_dir, sampling_interval=300)
+        for left_seconds, right_seconds in [(-5, -1), (0, 0), (3, 17), (100, 400), (660, 900)]:
+            step = self._create_investigation_step(left_seconds, right_seconds)
+            index_searcher = IndexSearcher(self.log_path, step, self.super_parser, storage)
+            backtrack_searcher = BacktrackSearcher(self.log_path, step, self.super_parser)
+            assert self._find_bounds(index_searcher) == self._find_bounds(backtrack_searcher)
+
+    def test_index_is_persisted_in_index_dir(self):
+        index_dir = os.path.join(tempfile.mkdtemp(dir=self.test_dir), 'indexes')
+        files_in_log_dir = sorted(os.listdir(self.test_dir))
+        index = KeyIndexStorage(index_dir, sampling_interval=1024).get_index(
+            self.log_path, self.super_parser
+        )
+        assert len(os.listdir(index_dir)) == 1
+        assert sorted(os.listdir(self.test_dir)) == files_in_log_dir
+        assert 1 < len(index) <= os.path.getsize(self.log_path) // 1024 + 1
+
+        index_file_path = os.path.join(index_dir, os.listdir(index_dir)[0])
+        with open(index_file_path) as index_file:
+            assert json.load(index_file)['file_path'] == os.path.realpath(self.log_path)
+        reloaded_index = KeyIndexStorage(index_dir, sampling_interval=1024)._load_index(
+            self.log_path
+        )
+        assert reloaded_index.file_signature == index.file_signature
+        assert reloaded_index._groups == index._groups
+        assert reloaded_index._offsets == index._offsets
+
+        with open(index_file_path, 'w') as index_file:
+            index_file.write('corrupted')
+        assert KeyIndexStorage(index_dir)._load_index(self.log_path) is None
+
+    def test_indexes_are_not_pickled_with_searcher(self):
+        index_dir = os.path.join(tempfile.mkdtemp(dir=self.test_dir), 'indexes')
+        storage = KeyIndexStorage(index_dir, sampling_interval=1024)
+        searcher = IndexSearcher(
+            self.log_path, self._create_investigation_step(3, 17), self.super_parser, storage
+        )
+        pickled_size = len(pickle.dumps(searcher))
+        index = storage.get_index(self.log_path, self.super_parser)
+        assert len(pickle.dumps(searcher)) == pickled_size
+
+        unpickled_storage = pickle.loads(pickle.dumps(storage))
+        assert unpickled_storage._indexes == {}
+        # index is loaded from index file in process which received storage
+        loaded_index = unpickled_storage.get_index(self.log_path, self.super_parser)
+        assert loaded_index._offsets == index._offsets
+        assert len(os.listdir(index_dir)) == 1
+        assert pickle.loads(pickle.dumps(DEFAULT_INDEX_STORAGE)) is DEFAULT_INDEX_STORAGE
@@ -0,0 +1,106 @@
+import json
+import os.path
+
+from whylog.investigation_stats import InvestigationStats
+from whylog.log_reader import LogReader
+from whylog.log_reader.executors import ThreadSearchExecutor
+from whylog.tests.tests_log_reader.utils import TemporaryConfigTestCase
+
+PARSERS = """name: request_failed
+regex_str: ^(\\d\\d\\d\\d-\\d\\d-\\d\\d \\d\\d:\\d\\d:\\d\\d) request failed$
+primary_key_groups: [1]
+log_type: test_log_type
+convertions: {1: date}
+line_content: line
+---
+name: app_error
+regex_str: ^(\\d\\d\\d\\d-\\d\\d-\\d\\d \\d\\d:\\d\\d:\\d\\d) app error (\\d+)$
+primary_key_groups: [1]
+log_type: test_log_type
+convertions: {1: date, 2: int}
+line_content: line
+"""
+
+RULES = """causes: [app_error]
+effect: request_failed
+constraints:
+- clues_groups:
+  - [1, 1]
+  - [0, 1]
+  name: time_delta
+  params: {max_delta: 1}
+linkage: AND
+"""
+
+EFFECT_LINE = '2016-01-01 10:00:02 request failed'
+LOGS_CONTENT = {
+    'node.log': [
+        '2016-01-01 09:00:00 app error 1',
+        '2016-01-01 10:00:01 app error 2',
+        '2016-01-01 10:00:01 request served',
+        EFFECT_LINE,
+    ],
+    'other.log': [
+        '2016-01-01 10:00:01 app error 3',
+        '2016-01-01 10:00:02 request served',
+    ],
+    'old.log': ['2015-01-01 10:00:00 app error 4'],
+}  # yapf: disable
+
+
+class TestInvestigationStats(TemporaryConfigTestCase):
+    def setUp(self):
+        super(TestInvestigationStats, self).setUp()
+        self._write_logs(LOGS_CONTENT)
+        self._write_config(PARSERS, RULES)
+        self.config = self._create_config()
+        self.front_input = self._create_front_input('node.log', len(LOGS_CONTENT['node.log']) - 1)
+
+    def test_counters(self):
+        stats = InvestigationStats()
+        results = LogReader(self.config).get_causes(self.front_input, stats=stats)
+        assert len(results) == 2
+        assert InvestigationStats.get_active() is None
+        assert stats.plan_creation_time > 0
+        assert stats.files_considered == 3
+        # keys of old.log are before the search range
+        assert stats.files_skipped == 1
+        assert stats.bisection_probes > 0
+        # lines in the search range, which in node.log ends before the effect
+        scanned_lines = LOGS_CONTENT['node.log'][1:-1] + LOGS_CONTENT['other.log']
+        assert stats.lines_scanned == len(scanned_lines)
+        assert stats.bytes_read == sum(len(line) + 1 for line in scanned_lines)
+        # lines without literals of app_error parser are not matched by regexes
+        assert stats.regex_attempts == {'app_error': 2}
+        assert stats.regex_hits == {'app_error': 2}
+        # date of the effect and two groups of every clue are converted
+        assert stats.converter_calls == 5
+        assert stats.verifier_combinations == 2
+        assert stats.constraint_checks == 2
+
+    def test_stats_of_workers_are_merged(self):
+        serial_stats = InvestigationStats()
+        LogReader(self.config).get_causes(self.front_input, stats=serial_stats)
+        executor = ThreadSearchExecutor(2)
+        try:
+            threads_stats = InvestigationStats()
+            LogReader(self.config, file_executor=executor).get_causes(
+                self.front_input, stats=threads_stats
+            )
+        finally:
+            executor.close()
+        serial_counters = serial_stats.serialize()
+        threads_counters = threads_stats.serialize()
+        del serial_counters['plan_creation_time']
+        del threads_counters['plan_creation_time']
+        assert serial_counters == threads_counters
+
+    def test_dump_json(self):
+        stats = InvestigationStats()
+        with stats.activated():
+            LogReader(self.config).get_causes(self.front_input)
+        json_path = os.path.join(self.test_dir, 'stats.json')
+        stats.dump_json(json_path)
+        with open(json_path) as json_file:
+            assert json.load(json_file) == stats.serialize()
+        assert stats.serialize()['regex_hits'] == {'app_error': 2}
@@ -0,0 +1,87 @@
+import os.path
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from unittest import TestCase
+
+import six
+
+from whylog.config.investigation_plan import InvestigationStep
+from whylog.config.super_parser import RegexSuperParser
+from whylog.log_reader.searchers import BacktrackSearcher
+
+
+class CountingSearcher(BacktrackSearcher):
+    def __init__(self, *args, **kwargs):
+        super(CountingSearcher, self).__init__(*args, **kwargs)
+        self.probes_count = 0
+
+    def _get_groups_of_line_containing(self, opened_file, offset, budget=None):
+        self.probes_count += 1
+        return super(CountingSearcher, self)._get_groups_of_line_containing(
+            opened_file, offset, budget
+        )
+
+
+class TestInterpolationSearch(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.test_dir = tempfile.mkdtemp()
+        cls.start_date = datetime(2016, 1, 1)
+        cls.uniform_log_path = os.path.join(cls.test_dir, 'uniform.log')
+        cls.skewed_log_path = os.path.join(cls.test_dir, 'skewed.log')
+        with open(cls.uniform_log_path, 'w') as log_file:
+            for i in six.moves.range(20000):
+                date = cls.start_date + timedelta(seconds=i)
+                log_file.write('%s line number %s %s\n' % (date, i, 'x' * (i % 7)))
+        with open(cls.skewed_log_path, 'w') as log_file:
+            for i in six.moves.range(5000):
+                # lines are very dense at the beginning of file and sparse at its end
+                date = cls.start_date + timedelta(seconds=(i // 100)**3)
+                log_file.write('%s line number %s\n' % (date, i))
+        cls.super_parser = RegexSuperParser(
+            '^(\d\d\d\d-\d\d-\d\d \d\d:\d\d:\d\d).*', [1], {1: 'date'}
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.test_dir)
+
+    def _create_investigation_step(self, left, right):
+        return InvestigationStep(
+            None, {
+                'date': {
+                    InvestigationStep.LEFT_BOUND: self.start_date + timedelta(seconds=left),
+                    InvestigationStep.RIGHT_BOUND: self.start_date + timedelta(seconds=right)
+                }
+            }
+        )
+
+    def _find_bounds(self, searcher, log_path):
+        with open(log_path, 'rb') as fd:
+            return searcher._find_left(fd), searcher._find_right(fd)
+
+    def _compare_with_bisection(self, log_path, ranges):
+        interpolation_probes_count = bisection_probes_count = 0
+        for left_seconds, right_seconds in ranges:
+            step = self._create_investigation_step(left_seconds, right_seconds)
+            interpolation_searcher = CountingSearcher(
+                log_path, step, self.super_parser, use_interpolation=True
+            )
+            bisection_searcher = CountingSearcher(log_path, step, self.super_parser)
+            assert self._find_bounds(interpolation_searcher, log_path) == \
+                self._find_bounds(bisection_searcher, log_path)
+            interpolation_probes_count += interpolation_searcher.probes_count
+            bisection_probes_count += bisection_searcher.probes_count
+        return interpolation_probes_count, bisection_probes_count
+
+    def test_uniform_keys(self):
+        interpolation_probes_count, bisection_probes_count = self._compare_with_bisection(
+            self.uniform_log_path, [(-5, -1), (0, 0), (3, 17), (1000, 4000), (19990, 30000)]
+        )
+        assert interpolation_probes_count * 2 <= bisection_probes_count
+
+    def test_skewed_keys(self):
+        self._compare_with_bisection(
+            self.skewed_log_path, [(-5, -1), (0, 0), (3, 17), (1000, 4000), (50000, 200000)]
+        )
@@ -44,22 +44,22 @@ class TestLogsReading(TestCase):
         cls.dummy_date = datetime(1410, 7, 15)
 
     def test_getting_line_by_offset_huge(self):
-        with open(TestPaths.get_file_path(AFewLinesLogParams.FILE_NAME)) as fh:
+        with open(TestPaths.get_file_path(AFewLinesLogParams.FILE_NAME), 'rb') as fh:
             for j in six.moves.range(1, 120, 7):
                 for i in six.moves.range(100):
                     assert ReadUtils.get_line_containing_offset(fh, i, j) == \
                            AFewLinesLogParams.get_line_with_borders(i)
 
     def test_getting_line_by_offset_basic(self):
-        with open(TestPaths.get_file_path(AFewLinesLogParams.FILE_NAME)) as fh:
+        with open(TestPaths.get_file_path(AFewLinesLogParams.FILE_NAME), 'rb') as fh:
             read_line = ReadUtils._read_entire_line(fh, 2, 10)
-            assert read_line == ('aaa-0-bbb', 0, 9)
+            assert read_line == (b'aaa-0-bbb', 0, 9)
             read_line = ReadUtils._read_entire_line(fh, 2, 200)
-            assert read_line == ('aaa-0-bbb', 0, 9)
+            assert read_line == (b'aaa-0-bbb', 0, 9)
             read_line = ReadUtils._read_entire_line(fh, 42, 10)
-            assert read_line == ('aaa-4-bbb', 40, 49)
+            assert read_line == (b'aaa-4-bbb', 40, 49)
             read_line = ReadUtils._read_entire_line(fh, 99, 10)
-            assert read_line == ('aaa-9-bbb', 90, 99)
+            assert read_line == (b'aaa-9-bbb', 90, 99)
 
     def test_bisect_line_finding(self):
         secs = 3
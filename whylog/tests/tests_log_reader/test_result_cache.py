@@ -0,0 +1,91 @@
+import os.path
+import pickle
+import shutil
+
+from whylog.config import YamlConfig
+from whylog.config.investigation_plan import LineSource
+from whylog.front.utils import FrontInput
+from whylog.log_reader import LogReader
+from whylog.log_reader.result_cache import ResultCache
+from whylog.log_reader.searchers import BacktrackSearcher
+from whylog.tests.tests_log_reader.constants import TestPaths
+from whylog.tests.tests_log_reader.utils import TemporaryConfigTestCase
+
+
+class TestResultCache(TemporaryConfigTestCase):
+    def setUp(self):
+        super(TestResultCache, self).setUp()
+        self._copy_config('003_match_time_range')
+        self.log_path = os.path.join(self.test_dir, 'node_1.log')
+        log_path = TestPaths.get_file_path(os.path.join('003_match_time_range', 'node_1.log'))
+        shutil.copy(log_path, self.log_path)
+        self.config = self._create_config()
+        self.searched_files = []
+        self.log_reader = LogReader(
+            self.config, searcher_factory=self._create_searcher, result_cache=ResultCache(1)
+        )
+        effect_offset = len(
+            '2015-12-03 12:08:07 root cause - fake\n'
+            '2015-12-03 12:08:08 root cause\n'
+        )
+        self.effect_line = FrontInput(
+            effect_offset, '2015-12-03 12:08:09 visible effect',
+            LineSource('localhost', self.log_path)
+        )
+
+    def _create_searcher(self, file_path, investigation_step, super_parser):
+        self.searched_files.append(file_path)
+        return BacktrackSearcher(file_path, investigation_step, super_parser)
+
+    def _get_causes_and_searches_count(self, front_input):
+        searches_count = len(self.searched_files)
+        causes = self.log_reader.get_causes(front_input)
+        return causes, len(self.searched_files) - searches_count
+
+    def test_repeated_investigation(self):
+        causes, searches_count = self._get_causes_and_searches_count(self.effect_line)
+        assert len(causes) == 1
+        assert searches_count == 1
+        assert self._get_causes_and_searches_count(self.effect_line) == (causes, 0)
+
+    def test_invalidation_after_change_of_file(self):
+        causes, _ = self._get_causes_and_searches_count(self.effect_line)
+        with open(os.path.join(self.test_dir, 'node_2.log'), 'w') as new_file:
+            new_file.write('2015-12-03 12:08:08 root cause\n')
+        # new file matched by log type is searched too
+        causes_after_change, searches_count = self._get_causes_and_searches_count(self.effect_line)
+        assert searches_count == 2
+        assert len(causes_after_change) == len(causes) + 1
+        assert self._get_causes_and_searches_count(self.effect_line)[1] == 0
+
+    def test_invalidation_after_change_of_config(self):
+        self._get_causes_and_searches_count(self.effect_line)
+        self.config.rename_log_type('test_log_type', 'renamed_log_type')
+        assert self._get_causes_and_searches_count(self.effect_line)[1] == 1
+
+    def test_eviction(self):
+        other_line = FrontInput(
+            0, '2015-12-03 12:08:07 root cause - fake', self.effect_line.line_source
+        )
+        self._get_causes_and_searches_count(self.effect_line)
+        self._get_causes_and_searches_count(other_line)
+        # cache keeps results of one investigation
+        assert self._get_causes_and_searches_count(self.effect_line)[1] == 1
+
+    def test_results_of_other_config_are_dropped(self):
+        self._get_causes_and_searches_count(self.effect_line)
+        other_config = YamlConfig(*self.config_paths)
+        assert other_config.revision == self.config.revision
+        self.log_reader.config = other_config
+        assert self._get_causes_and_searches_count(self.effect_line)[1] == 1
+
+    def test_pickled_cache(self):
+        self._get_causes_and_searches_count(self.effect_line)
+        result_cache = pickle.loads(pickle.dumps(self.log_reader._result_cache))
+        assert len(result_cache) == 0
+        self.log_reader = LogReader(
+            self.config, searcher_factory=self._create_searcher, result_cache=result_cache
+        )
+        causes, searches_count = self._get_causes_and_searches_count(self.effect_line)
+        assert len(causes) == 1 and searches_count == 1
+        assert self._get_causes_and_searches_count(self.effect_line) == (causes, 0)
@@ -0,0 +1,77 @@
+import os.path
+import shutil
+import tempfile
+from unittest import TestCase
+
+import six
+
+from whylog.config import YamlConfig
+from whylog.config.consts import YamlFileNames
+from whylog.config.investigation_plan import LineSource
+from whylog.front.utils import FrontInput
+from whylog.tests.tests_log_reader.constants import LOG_TYPES_TEMPLATE, TestPaths
+
+
+class TemporaryConfigTestCase(TestCase):
+    """
+    Test case with logs and YAML config of single log type written to temporary directory,
+    which is removed after every test
+    """
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self._logs_content = {}
+        self.config_paths = [
+            os.path.join(self.test_dir, file_name)
+            for file_name in (
+                YamlFileNames.parsers, YamlFileNames.rules, YamlFileNames.default_log_types
+            )
+        ]  # yapf: disable
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _write_logs(self, logs_content):
+        """
+        :param logs_content: dict of log file name to its lines
+        """
+        self._logs_content.update(logs_content)
+        for file_name, lines in six.iteritems(logs_content):
+            with open(os.path.join(self.test_dir, file_name), 'w') as log_file:
+                log_file.writelines(line + '\n' for line in lines)
+
+    def _write_config(self, parsers, rules, path_pattern='*.log'):
+        """
+        :param parsers: content of parsers file
+        :param rules: content of rules file
+        :param path_pattern: pattern of names of log files of log type in temporary directory
+        """
+        for path, content in zip(self.config_paths, (parsers, rules)):
+            with open(path, 'w') as config_file:
+                config_file.write(content)
+        self._write_log_types(path_pattern)
+
+    def _copy_config(self, test_files_dir, path_pattern='*.log'):
+        """
+        copies parsers and rules from directory of test files
+        """
+        config_dir = os.path.join(*(TestPaths.path_test_files + [test_files_dir]))
+        for file_name in (YamlFileNames.parsers, YamlFileNames.rules):
+            shutil.copy(os.path.join(config_dir, file_name), self.test_dir)
+        self._write_log_types(path_pattern)
+
+    def _write_log_types(self, path_pattern):
+        with open(self.config_paths[2], 'w') as log_types_file:
+            log_types_file.write(LOG_TYPES_TEMPLATE % (os.path.join(self.test_dir, path_pattern), ))
+
+    def _create_config(self):
+        return YamlConfig(*self.config_paths)
+
+    def _create_front_input(self, file_name, line_number):
+        """
+        returns front input of line with given number of log file written by _write_logs
+        """
+        lines = self._logs_content[file_name]
+        offset = sum(len(line) + 1 for line in lines[:line_number])
+        line_source = LineSource('localhost', os.path.join(self.test_dir, file_name))
+        return FrontInput(offset, lines[line_number], line_source)